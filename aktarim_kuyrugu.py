@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Arka Plan Dışa Aktarım Kuyruğu (analiz çağrıları dosya yazımını beklemeden döner)
+Geliştiren: Çağatay Elaman
+"""
+
+import os
+import queue
+import atexit
+import threading
+import pandas as pd
+from concurrent.futures import Future, wait
+
+import excel_aktarimi
+
+BICIMLER = ('xlsx', 'csv')
+
+class AktarimKuyrugu:
+    """Dışa aktarım işlerini kuyruğa alır, iş parçacıklarında toplu halde yazar.
+
+    `gonder` hemen bir Future döndürür (sonucu yazılan dosyanın yolu).
+    Sayfa tanımları DataFrame sütunlarını kopyalamadan tuttuğundan,
+    gönderilen veri yazım bitene kadar yerinde değiştirilmemelidir.
+    Program kapanırken bekleyen işler `bosalt` ile diske yazılır.
+    """
+
+    def __init__(self, is_parcacigi=2, toplu_boyut=8, motor=None, toplu_sonra=None):
+        self.toplu_boyut = toplu_boyut
+        self.motor = motor
+        # Her toplu yazımdan sonra başarılı yollarla çağrılır (örn. katalog kaydı)
+        self.toplu_sonra = toplu_sonra
+        self.kuyruk = queue.Queue()
+        self.kilit = threading.Lock()
+        self.bekleyenler = set()
+        self.kapali = False
+
+        self.isciler = [threading.Thread(target=self._calis, name=f"aktarim-{i}", daemon=True)
+                        for i in range(max(1, is_parcacigi))]
+        for isci in self.isciler:
+            isci.start()
+        atexit.register(self.kapat)
+
+    def gonder(self, yol, sayfalar, bicim='xlsx'):
+        """Aktarım işini kuyruğa ekle; yazım bitince tamamlanan Future döndür"""
+        if bicim not in BICIMLER:
+            raise ValueError(f"Geçersiz biçim: {bicim} ({'/'.join(BICIMLER)})")
+        if self.kapali:
+            raise RuntimeError("Aktarım kuyruğu kapatıldı")
+
+        gelecek = Future()
+        with self.kilit:
+            self.bekleyenler.add(gelecek)
+        gelecek.add_done_callback(self._tamamlandi)
+        self.kuyruk.put((yol, sayfalar, bicim, gelecek))
+        return gelecek
+
+    def _tamamlandi(self, gelecek):
+        with self.kilit:
+            self.bekleyenler.discard(gelecek)
+
+    def _toplu_al(self):
+        """Bir işi bekle, ardından kuyrukta hazır olanları toplu_boyut'a kadar ekle"""
+        isler = [self.kuyruk.get()]
+        # Durdurma işareti (None) partiyi bitirir; her işçi kendi işaretini alır
+        while isler[-1] is not None and len(isler) < self.toplu_boyut:
+            try:
+                isler.append(self.kuyruk.get_nowait())
+            except queue.Empty:
+                break
+        return isler
+
+    def _calis(self):
+        while True:
+            isler = self._toplu_al()
+            yazilanlar = []
+            durdur = False
+            for is_ in isler:
+                if is_ is None:
+                    durdur = True
+                    continue
+                yol, sayfalar, bicim, gelecek = is_
+                if not gelecek.set_running_or_notify_cancel():
+                    continue
+                try:
+                    self._yaz(yol, sayfalar, bicim)
+                    yazilanlar.append((yol, gelecek))
+                except Exception as e:
+                    print(f"❌ Aktarım hatası ({yol}): {e}")
+                    gelecek.set_exception(e)
+
+            # Toplu kayıt bitmeden Future tamamlanmaz; bekleyen çağıran katalogda dosyayı görür
+            if yazilanlar and self.toplu_sonra is not None:
+                try:
+                    self.toplu_sonra([yol for yol, _ in yazilanlar])
+                except Exception as e:
+                    print(f"⚠️ Aktarım sonrası işlem hatası: {e}")
+            for yol, gelecek in yazilanlar:
+                gelecek.set_result(yol)
+
+            for _ in isler:
+                self.kuyruk.task_done()
+            if durdur:
+                return
+
+    def _yaz(self, yol, sayfalar, bicim):
+        if bicim == 'xlsx':
+            excel_aktarimi.excel_yaz(yol, sayfalar, self.motor)
+            return
+        # csv: yalnızca ilk sayfa yazılır
+        sayfa = sayfalar[0]
+        klasor = os.path.dirname(yol)
+        if klasor and not os.path.exists(klasor):
+            os.makedirs(klasor, exist_ok=True)
+        gecici = yol + '.tmp'
+        pd.DataFrame(dict(zip(sayfa['sutunlar'], sayfa['diziler']))).to_csv(gecici, index=False)
+        os.replace(gecici, yol)
+
+    def bosalt(self, timeout=None):
+        """Bekleyen tüm işlerin bitmesini bekle; bitmeyen Future'ları döndür"""
+        with self.kilit:
+            bekleyenler = list(self.bekleyenler)
+        if not bekleyenler:
+            return set()
+        return wait(bekleyenler, timeout=timeout).not_done
+
+    def kapat(self, timeout=None):
+        """Bekleyen işleri yaz ve iş parçacıklarını durdur (atexit ile de çağrılır)"""
+        if self.kapali:
+            return
+        with self.kilit:
+            adet = len(self.bekleyenler)
+        if adet:
+            print(f"💾 {adet} bekleyen dışa aktarım yazılıyor...")
+        self.bosalt(timeout)
+        self.kapali = True
+        for _ in self.isciler:
+            self.kuyruk.put(None)
+        for isci in self.isciler:
+            isci.join(timeout)
@@ -0,0 +1,705 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Bar / Fiyat Akışı Üzerinde Olay Güdümlü Alarm Motoru
+Geliştiren: Çağatay Elaman
+"""
+
+import os
+import json
+import time
+import queue
+import argparse
+import threading
+import urllib.request
+import numpy as np
+from collections import deque
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+
+KURAL_DOSYASI = os.path.join('Finansal_Veriler', 'alarm_kurallari.json')
+ALARM_GUNLUGU = os.path.join('Finansal_Veriler', 'alarmlar.log')
+
+# Kurallarda kullanılabilecek alanlar (sembol başına son değerler)
+ALANLAR = ('close', 'volume', 'degisim', 'ma20', 'ma50', 'rsi', 'upper_band', 'lower_band', 'hacim_oran')
+# Düzey koşulları yalnızca yanlıştan doğruya geçişte, kesişimler kesişim anında tetiklenir
+KOSULLAR = ('>', '<', '>=', '<=', 'yukari_kesti', 'asagi_kesti')
+
+# method4_teknik_analiz sinyallerinin kural karşılıkları
+VARSAYILAN_KURALLAR = [
+    {'id': 'rsi_asiri_alim', 'sembol': '*', 'alan': 'rsi', 'kosul': '>', 'deger': 70,
+     'mesaj': "RSI > 70 (Aşırı alım bölgesi)"},
+    {'id': 'rsi_asiri_satim', 'sembol': '*', 'alan': 'rsi', 'kosul': '<', 'deger': 30,
+     'mesaj': "RSI < 30 (Aşırı satım bölgesi)"},
+    {'id': 'ma_yukari_kesisim', 'sembol': '*', 'alan': 'ma20', 'kosul': 'yukari_kesti', 'deger': 'ma50',
+     'mesaj': "20 günlük MA, 50 günlük MA'yı yukarı kesti (Yükseliş trendi)"},
+    {'id': 'ma_asagi_kesisim', 'sembol': '*', 'alan': 'ma20', 'kosul': 'asagi_kesti', 'deger': 'ma50',
+     'mesaj': "20 günlük MA, 50 günlük MA'yı aşağı kesti (Düşüş trendi)"}
+]
+
+def kurallari_oku(yol=KURAL_DOSYASI):
+    """Kayıtlı kurallar; dosya yoksa varsayılanlar"""
+    try:
+        with open(yol, encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return [dict(k) for k in VARSAYILAN_KURALLAR]
+
+def kurallari_yaz(kurallar, yol=KURAL_DOSYASI):
+    os.makedirs(os.path.dirname(yol) or '.', exist_ok=True)
+    # Birden çok web işçisi aynı anda yazabilir: geçici dosya süreç başına
+    gecici = f"{yol}.{os.getpid()}.tmp"
+    with open(gecici, 'w', encoding='utf-8') as f:
+        json.dump(kurallar, f, ensure_ascii=False, indent=1)
+    os.replace(gecici, yol)
+
+def sembol_normalle(symbol):
+    """İzleyicinin beslediği biçim: büyük harf, soneki olmayan sembole .IS (thyao -> THYAO.IS)"""
+    symbol = symbol.strip().upper()
+    if symbol == '*' or '.' in symbol or '=' in symbol or symbol.startswith('^'):
+        return symbol
+    return f"{symbol}.IS"
+
+def kural_dogrula(kural):
+    """Kuralı denetle ve varsayılanları doldur; hatalıysa ValueError"""
+    kural = dict(kural)
+    if kural.get('alan') not in ALANLAR:
+        raise ValueError(f"Geçersiz alan: {kural.get('alan')} ({', '.join(ALANLAR)})")
+    if kural.get('kosul') not in KOSULLAR:
+        raise ValueError(f"Geçersiz koşul: {kural.get('kosul')} ({', '.join(KOSULLAR)})")
+    deger = kural.get('deger')
+    if isinstance(deger, str) and deger not in ALANLAR:
+        try:
+            deger = float(deger)
+        except ValueError:
+            raise ValueError(f"Geçersiz karşılaştırma değeri: {deger}")
+    if deger is None:
+        raise ValueError("Karşılaştırma değeri gerekli")
+    kural['deger'] = deger
+    kural.setdefault('sembol', '*')
+    if not isinstance(kural['sembol'], str) or not kural['sembol'].strip():
+        raise ValueError(f"Geçersiz sembol: {kural['sembol']!r}")
+    # Kural sembolü izleyicinin beslediği sembolle aynı yazılmalı; yoksa ayrı bir satır hiç beslenmez
+    kural['sembol'] = sembol_normalle(kural['sembol'])
+    bekleme = kural.setdefault('bekleme', 3600)
+    try:
+        if isinstance(bekleme, bool):
+            raise ValueError
+        kural['bekleme'] = float(bekleme)
+    except (TypeError, ValueError):
+        raise ValueError(f"Geçersiz bekleme süresi: {bekleme!r}")
+    if not np.isfinite(kural['bekleme']) or kural['bekleme'] < 0:
+        raise ValueError(f"Bekleme süresi sıfır ya da pozitif olmalı: {bekleme!r}")
+    if 'mesaj' in kural and not isinstance(kural['mesaj'], str):
+        raise ValueError(f"Geçersiz mesaj: {kural['mesaj']!r}")
+    kural.setdefault('id', f"k{int(time.time() * 1000)}")
+    if not isinstance(kural['id'], str) or not kural['id']:
+        raise ValueError(f"Geçersiz kural kimliği: {kural['id']!r}")
+    return kural
+
+# --- Hedefler ---
+
+class DosyaHedefi:
+    """Alarmları JSON satırları olarak günlük dosyasına ekler"""
+
+    def __init__(self, yol=ALARM_GUNLUGU):
+        self.yol = yol
+        self.kilit = threading.Lock()
+        os.makedirs(os.path.dirname(yol) or '.', exist_ok=True)
+
+    def gonder(self, alarmlar):
+        with self.kilit, open(self.yol, 'a', encoding='utf-8') as f:
+            for alarm in alarmlar:
+                f.write(json.dumps(alarm, ensure_ascii=False) + '\n')
+
+class WebhookHedefi:
+    """Alarmları toplu JSON POST olarak gönderir; ağ çağrısı akışı bekletmez"""
+
+    def __init__(self, url, zaman_asimi=3.0):
+        self.url = url
+        self.zaman_asimi = zaman_asimi
+        self.havuz = ThreadPoolExecutor(max_workers=1, thread_name_prefix="alarm-webhook")
+
+    def _gonder(self, alarmlar):
+        istek = urllib.request.Request(self.url, data=json.dumps({'alerts': alarmlar}).encode('utf-8'),
+                                       headers={'Content-Type': 'application/json'})
+        try:
+            urllib.request.urlopen(istek, timeout=self.zaman_asimi).close()
+        except OSError as e:
+            print(f"⚠️  Webhook gönderilemedi ({self.url}): {e}")
+
+    def gonder(self, alarmlar):
+        self.havuz.submit(self._gonder, alarmlar)
+
+class SSEHedefi:
+    """Dashboard için Server-Sent Events yayını; her dinleyicinin sınırlı kuyruğu vardır"""
+
+    def __init__(self, kuyruk_boyutu=100):
+        self.kuyruk_boyutu = kuyruk_boyutu
+        self.dinleyiciler = set()
+        self.kilit = threading.Lock()
+
+    def gonder(self, alarmlar):
+        with self.kilit:
+            dinleyiciler = list(self.dinleyiciler)
+        for kuyruk in dinleyiciler:
+            for alarm in alarmlar:
+                try:
+                    kuyruk.put_nowait(alarm)
+                except queue.Full:
+                    # Yavaş istemci akışı bekletmez; en eski alarm atılır
+                    try:
+                        kuyruk.get_nowait()
+                        kuyruk.put_nowait(alarm)
+                    except (queue.Empty, queue.Full):
+                        pass
+
+    def dinle(self, nabiz=15.0):
+        """text/event-stream gövdesi üreten jeneratör"""
+        kuyruk = queue.Queue(self.kuyruk_boyutu)
+        with self.kilit:
+            self.dinleyiciler.add(kuyruk)
+        try:
+            yield "retry: 5000\n\n"
+            while True:
+                try:
+                    alarm = kuyruk.get(timeout=nabiz)
+                except queue.Empty:
+                    # Bağlantı canlı tutma
+                    yield ": nabiz\n\n"
+                    continue
+                yield f"event: alarm\ndata: {json.dumps(alarm, ensure_ascii=False)}\n\n"
+        finally:
+            with self.kilit:
+                self.dinleyiciler.discard(kuyruk)
+
+# --- Süreçler arası paylaşım ---
+
+class KuralDosyasi:
+    """Kural dosyasını değişiklik zamanına (mtime) göre yeniden okur; tüm süreçler aynı dosyayı izler"""
+
+    def __init__(self, yol=KURAL_DOSYASI):
+        self.yol = yol
+        self.surum = None
+        self.kurallar = None
+        self.kilit = threading.Lock()
+
+    def _mtime(self):
+        try:
+            return os.stat(self.yol).st_mtime_ns
+        except OSError:
+            return 0
+
+    def degisiklik(self):
+        """Dosya son okumadan beri değiştiyse yeni kurallar, değilse None"""
+        surum = self._mtime()
+        with self.kilit:
+            if surum == self.surum and self.kurallar is not None:
+                return None
+            self.surum, self.kurallar = surum, kurallari_oku(self.yol)
+            return self.kurallar
+
+    def oku(self):
+        self.degisiklik()
+        return self.kurallar
+
+    def yaz(self, kurallar):
+        with self.kilit:
+            kurallari_yaz(kurallar, self.yol)
+            self.surum, self.kurallar = self._mtime(), kurallar
+
+class GunlukYayini:
+    """Alarm günlüğünü izleyip yeni satırları hedeflere aktarır (tek izleyici süreç, çok okuyucu).
+
+    Kuralları değerlendiren tek süreç (alarm_motoru.py izle) alarmları günlüğe
+    yazar; web işçileri yalnızca bu aktarıcıyla SSE dinleyicilerine iletir,
+    böylece her işçi aynı alarmı yeniden üretmez.
+    """
+
+    def __init__(self, yol=ALARM_GUNLUGU, hedefler=(), kontrol_araligi=1.0, gecmis=200):
+        self.yol = yol
+        self.hedefler = list(hedefler)
+        self.kontrol_araligi = kontrol_araligi
+        self.son_alarmlar = deque(maxlen=gecmis)
+        self.konum = None
+        self._durdur = threading.Event()
+        self._is_parcacigi = None
+
+    def baslat(self):
+        if self._is_parcacigi is None:
+            self._is_parcacigi = threading.Thread(target=self._calis, name="alarm-gunlugu", daemon=True)
+            self._is_parcacigi.start()
+
+    def durdur(self):
+        self._durdur.set()
+
+    def _calis(self):
+        self.oku()
+        while not self._durdur.wait(self.kontrol_araligi):
+            try:
+                self.oku()
+            except Exception as e:
+                print(f"❌ Alarm günlüğü okunamadı: {e}")
+
+    def oku(self):
+        """Son okumadan beri eklenen tam satırları aktar; ilk çağrıda yalnızca geçmişi yükler"""
+        try:
+            boyut = os.path.getsize(self.yol)
+        except OSError:
+            return []
+        ilk = self.konum is None
+        if ilk:
+            # Açılışta dosyanın son kısmı geçmiş için okunur, dinleyicilere gönderilmez
+            self.konum = max(0, boyut - 256 * 1024)
+        elif boyut < self.konum:
+            # Günlük döndürüldü / kesildi
+            self.konum = 0
+        if boyut == self.konum:
+            return []
+
+        with open(self.yol, 'rb') as f:
+            f.seek(self.konum)
+            parca = f.read(boyut - self.konum)
+        son = parca.rfind(b'\n')
+        if son < 0:
+            return []
+        satirlar = parca[:son].split(b'\n')
+        if ilk and self.konum > 0:
+            satirlar = satirlar[1:]
+        self.konum += son + 1
+
+        alarmlar = []
+        for satir in satirlar:
+            try:
+                alarmlar.append(json.loads(satir))
+            except ValueError:
+                continue
+        self.son_alarmlar.extend(alarmlar)
+        if alarmlar and not ilk:
+            for hedef in self.hedefler:
+                hedef.gonder(alarmlar)
+        return alarmlar
+
+# --- Motor ---
+
+class AlarmMotoru:
+    """Abone sembollerin gösterge durumunu artımlı tutar ve kuralları vektörel değerlendirir.
+
+    Her sembol için son 51 kapanış ve 21 hacim satır başına halka dizide tutulur;
+    yeni bar diziyi kaydırır, aynı barın fiyat güncellemesi yalnızca son hücreyi
+    değiştirir. Göstergeler yalnızca güncellenen satırlar için bu pencerelerden
+    hesaplanır. Kurallar (kural, sembol) çiftlerine açılıp dizilere derlenir; bir
+    tik, çift sayısından bağımsız olarak birkaç dizi işlemiyle değerlendirilir.
+    """
+
+    FIYAT_PENCERESI = 51
+    HACIM_PENCERESI = 21
+
+    def __init__(self, kurallar=None, hedefler=(), dakika_limiti=120):
+        self.hedefler = list(hedefler)
+        self.dakika_limiti = dakika_limiti
+        self.semboller = []
+        self.satirlar = {}
+        self.fiyatlar = np.full((0, self.FIYAT_PENCERESI), np.nan)
+        self.hacimler = np.full((0, self.HACIM_PENCERESI), np.nan)
+        self.son_zaman = np.zeros(0, dtype=np.int64)
+        self.degerler = np.full((0, len(ALANLAR)), np.nan)
+        self.kurallar = []
+        self.son_alarmlar = deque(maxlen=200)
+        self.istatistik = {'tik': 0, 'tetik': 0, 'bastirilan': 0}
+        self._kova = (time.time(), 0)
+        self.kilit = threading.RLock()
+        self.kurallari_ayarla(kurallar if kurallar is not None else kurallari_oku())
+
+    # Semboller ve kurallar
+
+    def abone_ol(self, semboller):
+        with self.kilit:
+            yeniler = [s for s in semboller if s not in self.satirlar]
+            if not yeniler:
+                return
+            for s in yeniler:
+                self.satirlar[s] = len(self.semboller)
+                self.semboller.append(s)
+            k = len(yeniler)
+            self.fiyatlar = np.vstack([self.fiyatlar, np.full((k, self.FIYAT_PENCERESI), np.nan)])
+            self.hacimler = np.vstack([self.hacimler, np.full((k, self.HACIM_PENCERESI), np.nan)])
+            self.son_zaman = np.concatenate([self.son_zaman, np.zeros(k, dtype=np.int64)])
+            self.degerler = np.vstack([self.degerler, np.full((k, len(ALANLAR)), np.nan)])
+            self._derle()
+
+    def kurallari_ayarla(self, kurallar):
+        """Kuralları doğrula ve derle; biri bile hatalıysa motor önceki kurallarla kalır"""
+        yeni = [kural_dogrula(k) for k in kurallar]
+        with self.kilit:
+            self.abone_ol([k['sembol'] for k in yeni if k['sembol'] != '*'])
+            derlenmis = self._derlenmis(yeni)
+            self.kurallar = yeni
+            self.ciftler, self.aktif, self.son_tetik, self.son_bar = derlenmis
+
+    def _derle(self):
+        self.ciftler, self.aktif, self.son_tetik, self.son_bar = self._derlenmis(self.kurallar)
+
+    def _derlenmis(self, kurallar):
+        """Kuralları (kural, sembol) çiftlerinin dizilerine aç; önceki tetik durumu korunur.
+
+        Motor durumuna dokunmaz: (ciftler, aktif, son_tetik, son_bar) döndürür.
+        """
+        eski = {}
+        if getattr(self, 'ciftler', None) is not None:
+            for i, anahtar in enumerate(self.ciftler['anahtar']):
+                eski[anahtar] = (self.aktif[i], self.son_tetik[i], self.son_bar[i])
+
+        kural_no, satir = [], []
+        for i, kural in enumerate(kurallar):
+            hedefler = self.semboller if kural['sembol'] == '*' else [kural['sembol']]
+            for s in hedefler:
+                kural_no.append(i)
+                satir.append(self.satirlar[s])
+
+        kural_no = np.asarray(kural_no, dtype=np.int64)
+        karsi = [kurallar[i]['deger'] for i in kural_no]
+        ciftler = {
+            'kural': kural_no,
+            'satir': np.asarray(satir, dtype=np.int64),
+            'sol': np.asarray([ALANLAR.index(kurallar[i]['alan']) for i in kural_no], dtype=np.int64),
+            'kosul': np.asarray([KOSULLAR.index(kurallar[i]['kosul']) for i in kural_no], dtype=np.int64),
+            'sag_alan': np.asarray([ALANLAR.index(d) if isinstance(d, str) else -1 for d in karsi], dtype=np.int64),
+            'sag_deger': np.asarray([np.nan if isinstance(d, str) else float(d) for d in karsi]),
+            'bekleme': np.asarray([float(kurallar[i]['bekleme']) for i in kural_no]),
+            'anahtar': [(kurallar[i]['id'], self.semboller[s]) for i, s in zip(kural_no, satir)]
+        }
+        n = len(kural_no)
+        aktif = np.zeros(n, dtype=bool)
+        son_tetik = np.full(n, -np.inf)
+        son_bar = np.full(n, -1, dtype=np.int64)
+        for i, anahtar in enumerate(ciftler['anahtar']):
+            if anahtar in eski:
+                aktif[i], son_tetik[i], son_bar[i] = eski[anahtar]
+        return ciftler, aktif, son_tetik, son_bar
+
+    # Durum güncelleme
+
+    def _gostergeler(self, satirlar):
+        """Güncellenen satırların alan değerleri (gostergeler.py tanımlarıyla aynı)"""
+        p = self.fiyatlar[satirlar]
+        h = self.hacimler[satirlar]
+        son20 = p[:, -20:]
+        ma20 = son20.mean(axis=1)
+        std20 = son20.std(axis=1, ddof=1)
+        fark = np.diff(p[:, -15:], axis=1)
+        kazanc = np.maximum(fark, 0).mean(axis=1)
+        kayip = np.maximum(-fark, 0).mean(axis=1)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            rsi = 100 - 100 / (1 + kazanc / kayip)
+            degisim = p[:, -1] / p[:, -2] - 1
+            hacim_oran = h[:, -1] / h[:, :-1].mean(axis=1)
+        return np.column_stack([p[:, -1], h[:, -1], degisim, ma20, p[:, -50:].mean(axis=1), rsi,
+                                ma20 + 2 * std20, ma20 - 2 * std20, hacim_oran])
+
+    def isit(self, symbol, zaman, kapanis, hacim):
+        """Geçmiş barlarla durumu doldur; mevcut koşullar için alarm üretmez"""
+        with self.kilit:
+            self.abone_ol([symbol])
+            r = self.satirlar[symbol]
+            kapanis = np.asarray(kapanis, dtype=np.float64)[-self.FIYAT_PENCERESI:]
+            hacim = np.asarray(hacim, dtype=np.float64)[-self.HACIM_PENCERESI:]
+            self.fiyatlar[r] = np.nan
+            self.fiyatlar[r, -len(kapanis):] = kapanis
+            self.hacimler[r] = np.nan
+            self.hacimler[r, -len(hacim):] = hacim
+            self.son_zaman[r] = int(np.asarray(zaman)[-1])
+            satirlar = np.array([r])
+            self.degerler[satirlar] = self._gostergeler(satirlar)
+            self._degerlendir(satirlar, self.degerler.copy(), sessiz=True)
+
+    def isle(self, semboller, zaman, kapanis, hacim):
+        """Bir tik: sembol başına en fazla bir (zaman, kapanış, hacim); tetiklenen alarmları döndür.
+
+        Zaman son bardan büyükse yeni bar açılır, eşitse son bar güncellenir,
+        küçükse (geç gelen veri) yok sayılır.
+        """
+        with self.kilit:
+            self.abone_ol(semboller)
+            satirlar = np.fromiter((self.satirlar[s] for s in semboller), dtype=np.int64, count=len(semboller))
+            zaman = np.asarray(zaman, dtype=np.int64)
+            kapanis = np.asarray(kapanis, dtype=np.float64)
+            hacim = np.asarray(hacim, dtype=np.float64)
+
+            gecerli = zaman >= self.son_zaman[satirlar]
+            satirlar, zaman, kapanis, hacim = satirlar[gecerli], zaman[gecerli], kapanis[gecerli], hacim[gecerli]
+            if len(satirlar) == 0:
+                return []
+
+            yeni = satirlar[zaman > self.son_zaman[satirlar]]
+            self.fiyatlar[yeni, :-1] = self.fiyatlar[yeni, 1:]
+            self.hacimler[yeni, :-1] = self.hacimler[yeni, 1:]
+            self.fiyatlar[satirlar, -1] = kapanis
+            self.hacimler[satirlar, -1] = hacim
+            self.son_zaman[satirlar] = zaman
+
+            onceki = self.degerler.copy()
+            self.degerler[satirlar] = self._gostergeler(satirlar)
+            self.istatistik['tik'] += 1
+            return self._degerlendir(satirlar, onceki)
+
+    def _degerlendir(self, satirlar, onceki, sessiz=False):
+        c = self.ciftler
+        guncel = np.zeros(len(self.semboller), dtype=bool)
+        guncel[satirlar] = True
+        idx = np.flatnonzero(guncel[c['satir']])
+        if len(idx) == 0:
+            return []
+
+        satir, sol, kosul = c['satir'][idx], c['sol'][idx], c['kosul'][idx]
+        sag_alan = c['sag_alan'][idx]
+        sag_var = sag_alan >= 0
+        sag_sutun = np.where(sag_var, sag_alan, 0)
+
+        a = self.degerler[satir, sol]
+        b = np.where(sag_var, self.degerler[satir, sag_sutun], c['sag_deger'][idx])
+        a0 = onceki[satir, sol]
+        b0 = np.where(sag_var, onceki[satir, sag_sutun], c['sag_deger'][idx])
+
+        # NaN karşılaştırmaları yanlış döner: ısınmamış göstergeler tetiklemez
+        with np.errstate(invalid='ignore'):
+            sonuc = np.select(
+                [kosul == 0, kosul == 1, kosul == 2, kosul == 3, kosul == 4, kosul == 5],
+                [a > b, a < b, a >= b, a <= b, (a0 <= b0) & (a > b), (a0 >= b0) & (a < b)],
+                default=False)
+
+        kesisim = kosul >= 4
+        tetik = sonuc & (kesisim | ~self.aktif[idx])
+        self.aktif[idx] = sonuc
+        if sessiz:
+            return []
+
+        # Tekilleştirme: aynı bar için aynı çift bir kez; hız sınırı: çift başına bekleme süresi
+        simdi = time.time()
+        bar = self.son_zaman[satir]
+        tetik &= (bar != self.son_bar[idx]) & (simdi - self.son_tetik[idx] >= c['bekleme'][idx])
+        secilen = idx[tetik]
+        if len(secilen) == 0:
+            return []
+
+        # Genel hız sınırı (dakika başına), fazlası sayılıp atılır
+        bas, sayi = self._kova
+        if simdi - bas >= 60:
+            bas, sayi = simdi, 0
+        kalan = max(self.dakika_limiti - sayi, 0)
+        if len(secilen) > kalan:
+            self.istatistik['bastirilan'] += len(secilen) - kalan
+            secilen = secilen[:kalan]
+        self._kova = (bas, sayi + len(secilen))
+        if len(secilen) == 0:
+            return []
+
+        self.son_tetik[secilen] = simdi
+        self.son_bar[secilen] = self.son_zaman[c['satir'][secilen]]
+        alarmlar = [self._alarm(i) for i in secilen]
+        self.istatistik['tetik'] += len(alarmlar)
+        self.son_alarmlar.extend(alarmlar)
+        for hedef in self.hedefler:
+            try:
+                hedef.gonder(alarmlar)
+            except Exception as e:
+                print(f"❌ Alarm hedefi hatası ({type(hedef).__name__}): {e}")
+        return alarmlar
+
+    def _alarm(self, i):
+        c = self.ciftler
+        kural = self.kurallar[c['kural'][i]]
+        satir = c['satir'][i]
+        sag = c['sag_alan'][i]
+        esik = self.degerler[satir, sag] if sag >= 0 else c['sag_deger'][i]
+        return {
+            'kural': kural['id'],
+            'symbol': self.semboller[satir],
+            'alan': kural['alan'],
+            'kosul': kural['kosul'],
+            'deger': round(float(self.degerler[satir, c['sol'][i]]), 4),
+            'esik': round(float(esik), 4),
+            'fiyat': round(float(self.degerler[satir, 0]), 4),
+            'bar': datetime.fromtimestamp(self.son_zaman[satir] / 1e9).isoformat(timespec='minutes'),
+            'zaman': datetime.now().isoformat(timespec='seconds'),
+            'mesaj': kural.get('mesaj') or f"{kural['alan']} {kural['kosul']} {kural['deger']}"
+        }
+
+    def ozet(self):
+        with self.kilit:
+            return {'semboller': len(self.semboller), 'kurallar': len(self.kurallar),
+                    'ciftler': len(self.ciftler['kural']), **self.istatistik}
+
+class AlarmIzleyici:
+    """Veri katmanından abone sembollerin son barlarını periyodik okuyup motora besler.
+
+    kural_dosyasi verilirse her turda dosya değişikliği denetlenir; başka bir
+    süreçte (web POST /api/alerts, CLI ekle/sil) yazılan kurallar yeniden başlatmadan devreye girer.
+    """
+
+    def __init__(self, motor, veri, semboller, interval='1d', period='3mo', kontrol_araligi=60.0,
+                 kural_dosyasi=None):
+        self.motor = motor
+        self.kural_dosyasi = kural_dosyasi
+        if kural_dosyasi is not None:
+            kural_dosyasi.degisiklik()
+        self.veri = veri
+        self.semboller = list(semboller)
+        self.interval = interval
+        self.period = period
+        self.kontrol_araligi = kontrol_araligi
+        self._durdur = threading.Event()
+        self._is_parcacigi = None
+
+    def baslat(self):
+        if self._is_parcacigi is None:
+            self._is_parcacigi = threading.Thread(target=self._calis, name="alarm-izleyici", daemon=True)
+            self._is_parcacigi.start()
+
+    def durdur(self):
+        self._durdur.set()
+
+    def _calis(self):
+        self.isit()
+        while not self._durdur.wait(self.kontrol_araligi):
+            try:
+                self.besle()
+            except Exception as e:
+                print(f"❌ Alarm izleyici hatası: {e}")
+
+    def kurallari_yenile(self):
+        kurallar = self.kural_dosyasi.degisiklik() if self.kural_dosyasi is not None else None
+        if kurallar is None:
+            return
+        try:
+            self.motor.kurallari_ayarla(kurallar)
+            print(f"🔔 Kurallar yeniden yüklendi ({len(kurallar)} kural)")
+        except ValueError as e:
+            print(f"❌ Kural dosyası geçersiz, önceki kurallar korunuyor: {e}")
+
+    def isit(self):
+        for symbol in self.semboller:
+            try:
+                df = self.veri.gecmis_getir(symbol, self.period, self.interval)
+            except Exception as e:
+                print(f"⚠️  {symbol} alarm durumu yüklenemedi: {e}")
+                continue
+            if df is not None and len(df):
+                self.motor.isit(symbol, df.index.values.astype('datetime64[ns]').view('int64'),
+                                df['Close'].to_numpy(), df['Volume'].to_numpy())
+
+    def besle(self):
+        """Son okumadan bu yana gelen barları sırayla, her turda tüm semboller için tek tik olarak işle"""
+        self.kurallari_yenile()
+        yeniler = {}
+        for symbol in self.semboller:
+            df = self.veri.gecmis_getir(symbol, self.period, self.interval)
+            if df is None or len(df) == 0:
+                continue
+            zaman = df.index.values.astype('datetime64[ns]').view('int64')
+            r = self.motor.satirlar.get(symbol)
+            son = self.motor.son_zaman[r] if r is not None else zaman[-1]
+            bas = int(np.searchsorted(zaman, son))
+            yeniler[symbol] = (zaman[bas:], df['Close'].to_numpy()[bas:], df['Volume'].to_numpy()[bas:])
+
+        alarmlar = []
+        tur = max((len(z) for z, _, _ in yeniler.values()), default=0)
+        for j in range(tur):
+            semboller = [s for s, (z, _, _) in yeniler.items() if j < len(z)]
+            alarmlar += self.motor.isle(semboller, [yeniler[s][0][j] for s in semboller],
+                                        [yeniler[s][1][j] for s in semboller],
+                                        [yeniler[s][2][j] for s in semboller])
+        return alarmlar
+
+def webhook_dinle(port=8765):
+    """Webhook hedefini denemek için yerel alıcı: gelen alarmları yazdırır"""
+    from http.server import BaseHTTPRequestHandler, HTTPServer
+
+    class Alici(BaseHTTPRequestHandler):
+        def do_POST(self):
+            govde = self.rfile.read(int(self.headers.get('Content-Length', 0)))
+            for alarm in json.loads(govde or b'{}').get('alerts', []):
+                print(f"🔔 {alarm['symbol']} {alarm['mesaj']} (değer: {alarm['deger']}, bar: {alarm['bar']})")
+            self.send_response(204)
+            self.end_headers()
+
+        def log_message(self, *args):
+            pass
+
+    print(f"📡 Webhook alıcısı: http://127.0.0.1:{port}/")
+    HTTPServer(('127.0.0.1', port), Alici).serve_forever()
+
+def main():
+    parser = argparse.ArgumentParser(description="Alarm kuralları ve olay güdümlü alarm motoru")
+    parser.add_argument('--dosya', default=KURAL_DOSYASI, help="Kural dosyası")
+    alt = parser.add_subparsers(dest='komut', required=True)
+    alt.add_parser('liste', help="Kuralları listele")
+    ekle = alt.add_parser('ekle', help="Kural ekle (örn: ekle THYAO.IS rsi '>' 70)")
+    ekle.add_argument('sembol', help="Sembol ya da tümü için *")
+    ekle.add_argument('alan', choices=ALANLAR)
+    ekle.add_argument('kosul', choices=KOSULLAR)
+    ekle.add_argument('deger', help="Sayı ya da alan adı (örn: ma50)")
+    ekle.add_argument('--bekleme', type=float, default=3600, help="Aynı kural/sembol için en kısa tekrar süresi (sn)")
+    ekle.add_argument('--mesaj')
+    sil = alt.add_parser('sil', help="Kural sil")
+    sil.add_argument('id')
+    izle = alt.add_parser('izle', help="Sembolleri izle ve alarmları günlüğe / webhook'a gönder")
+    izle.add_argument('semboller', nargs='*', help="örn: THYAO GARAN (boşsa depodaki tüm semboller)")
+    izle.add_argument('--aralik', default='1d')
+    izle.add_argument('--kontrol', type=float, default=60, help="Kontrol aralığı (sn)")
+    izle.add_argument('--webhook', default=os.environ.get('FINANS_ALARM_WEBHOOK'),
+                      help="örn: http://127.0.0.1:8765/ (varsayılan: FINANS_ALARM_WEBHOOK)")
+    dinle = alt.add_parser('webhook-dinle', help="Yerel webhook alıcısı")
+    dinle.add_argument('--port', type=int, default=8765)
+    args = parser.parse_args()
+
+    if args.komut == 'webhook-dinle':
+        webhook_dinle(args.port)
+        return
+
+    kurallar = kurallari_oku(args.dosya)
+    if args.komut == 'liste':
+        for kural in kurallar:
+            print(f"🔔 {kural['id']:20} {kural.get('sembol', '*'):10} {kural['alan']} {kural['kosul']} "
+                  f"{kural['deger']}  (bekleme: {kural.get('bekleme', 3600)} sn)")
+    elif args.komut == 'ekle':
+        try:
+            kural = kural_dogrula({'sembol': args.sembol, 'alan': args.alan, 'kosul': args.kosul,
+                                   'deger': args.deger, 'bekleme': args.bekleme, 'mesaj': args.mesaj})
+        except ValueError as e:
+            print(f"❌ {e}")
+            return
+        kurallari_yaz(kurallar + [kural], args.dosya)
+        print(f"✅ Kural eklendi: {kural['id']}")
+    elif args.komut == 'sil':
+        kalan = [k for k in kurallar if k['id'] != args.id]
+        if len(kalan) == len(kurallar):
+            print(f"❌ Kural bulunamadı: {args.id}")
+            return
+        kurallari_yaz(kalan, args.dosya)
+        print(f"✅ Kural silindi: {args.id}")
+    else:
+        from veri_katmani import VeriKatmani
+        from makro_deposu import makro_adlari
+        veri = VeriKatmani()
+        semboller = [sembol_normalle(s) for s in args.semboller] or \
+            [f"{s}.IS" for s in veri.depo.semboller(args.aralik) if s not in makro_adlari() and '=' not in s]
+        if not semboller:
+            print("❌ Sembol verilmedi ve depoda kayıtlı sembol yok")
+            return
+        hedefler = [DosyaHedefi()] + ([WebhookHedefi(args.webhook)] if args.webhook else [])
+        motor = AlarmMotoru(kurallar, hedefler)
+        izleyici = AlarmIzleyici(motor, veri, semboller, args.aralik, kontrol_araligi=args.kontrol,
+                                 kural_dosyasi=KuralDosyasi(args.dosya))
+        izleyici.isit()
+        print(f"🔔 {len(semboller)} sembol, {len(kurallar)} kural izleniyor (Ctrl+C ile çıkış)")
+        try:
+            while True:
+                time.sleep(args.kontrol)
+                for alarm in izleyici.besle():
+                    print(f"🔔 {alarm['symbol']}: {alarm['mesaj']} (değer: {alarm['deger']})")
+        except KeyboardInterrupt:
+            print("\n✅ İzleme durduruldu")
+
+if __name__ == "__main__":
+    main()
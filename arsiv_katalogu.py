@@ -0,0 +1,468 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Finansal_Veriler Arşiv Kataloğu (SQLite)
+Geliştiren: Çağatay Elaman
+"""
+
+import os
+import re
+import sqlite3
+import hashlib
+import argparse
+import threading
+from datetime import datetime, date
+from openpyxl import load_workbook
+
+class ArsivKatalogu:
+    def __init__(self, kok='Finansal_Veriler', db_adi='katalog.db'):
+        # Klasör yapısı (DosyaDuzenleyici ile aynı)
+        self.folders = {
+            'detayli': 'Detayli_Veriler',
+            'teknik': 'Teknik_Analiz',
+            'karsilastirma': 'Karsilastirmalar',
+            'tum_veriler': 'Tum_Veriler',
+            'manuel': 'Manuel_Veriler',
+            'canli': 'Canli_Veriler',
+            'orijinal': 'Orijinal_Veriler'
+        }
+        self.klasor_kategori = {v: k for k, v in self.folders.items()}
+
+        # Dosya adı kalıpları: SEMBOL_tur_YYYYMMDD_HHMM(_vN).xlsx
+        self.kaliplar = [
+            ('karsilastirma', re.compile(r'^karsilastirma_(?P<sembol>[^_]+)_(?P<sembol2>[^_]+)_(?P<tarih>\d{8})_(?P<saat>\d{4})')),
+            ('detayli', re.compile(r'^(?P<sembol>[^_]+)_detayli_veri_(?P<tarih>\d{8})_(?P<saat>\d{4})')),
+            ('teknik', re.compile(r'^(?P<sembol>[^_]+)_teknik_analiz_(?P<tarih>\d{8})_(?P<saat>\d{4})')),
+            ('tum_veriler', re.compile(r'^(?P<sembol>[^_]+)_TUM_VERILER_(?P<tarih>\d{8})_(?P<saat>\d{4})')),
+            ('canli', re.compile(r'^(?P<sembol>[^_]+)_canli_veri_(?P<tarih>\d{8})_(?P<saat>\d{4})')),
+            ('manuel', re.compile(r'^manuel_veri_(?P<tarih>\d{8})_(?P<saat>\d{4})'))
+        ]
+
+        self.kok = kok
+        # Yollar kök klasörün bulunduğu dizine göre saklanır
+        self.ust_dizin = os.path.dirname(os.path.abspath(kok))
+        self.db_yolu = os.path.join(kok, db_adi)
+        self.kilit = threading.Lock()
+        self.setup_db()
+
+    def setup_db(self):
+        """Katalog tablolarını ve indeksleri oluştur"""
+        if not os.path.exists(self.kok):
+            os.makedirs(self.kok)
+
+        self.baglanti = sqlite3.connect(self.db_yolu, check_same_thread=False)
+        self.baglanti.row_factory = sqlite3.Row
+        self.baglanti.execute("PRAGMA journal_mode=WAL")
+        self.baglanti.executescript("""
+            CREATE TABLE IF NOT EXISTS dosyalar (
+                yol TEXT PRIMARY KEY,
+                kategori TEXT NOT NULL,
+                sembol TEXT,
+                zaman TEXT,
+                klasor_tarihi TEXT,
+                satir_sayisi INTEGER,
+                baslangic TEXT,
+                bitis TEXT,
+                boyut INTEGER,
+                mtime REAL,
+                sha256 TEXT
+            );
+            CREATE TABLE IF NOT EXISTS dosya_sembolleri (
+                yol TEXT NOT NULL,
+                sembol TEXT NOT NULL,
+                PRIMARY KEY (yol, sembol)
+            );
+            CREATE INDEX IF NOT EXISTS ix_sembol ON dosya_sembolleri (sembol);
+            CREATE INDEX IF NOT EXISTS ix_kategori_zaman ON dosyalar (kategori, zaman);
+            CREATE INDEX IF NOT EXISTS ix_klasor_tarihi ON dosyalar (klasor_tarihi);
+            CREATE TABLE IF NOT EXISTS ayarlar (
+                ad TEXT PRIMARY KEY,
+                deger TEXT
+            );
+        """)
+        
+        # Eski kataloglarda sha256 sütunu yok
+        sutunlar = [satir['name'] for satir in self.baglanti.execute("PRAGMA table_info(dosyalar)")]
+        if 'sha256' not in sutunlar:
+            self.baglanti.execute("ALTER TABLE dosyalar ADD COLUMN sha256 TEXT")
+        self.baglanti.execute("CREATE INDEX IF NOT EXISTS ix_sha256 ON dosyalar (sha256)")
+
+        # Sürüm 2: sha256 dosya baytları yerine sayfa içeriğinden; sürüm 3: dosya adındaki
+        # kategori ve semboller de özete girer. Eski özetler bir sonraki taramada yenilenir
+        if self.baglanti.execute("PRAGMA user_version").fetchone()[0] < 3:
+            self.baglanti.execute("UPDATE dosyalar SET sha256 = NULL")
+            self.baglanti.execute("PRAGMA user_version = 3")
+        self.baglanti.commit()
+
+    def _anahtar(self, yol):
+        """Dosya yolunu katalog anahtarına çevir"""
+        return os.path.relpath(os.path.abspath(yol), self.ust_dizin).replace(os.sep, '/')
+
+    def _tam_yol(self, anahtar):
+        return os.path.join(self.ust_dizin, *anahtar.split('/'))
+
+    def dosya_adini_coz(self, yol):
+        """Dosya adından kategori, semboller ve zaman bilgisini çıkar"""
+        dosya_adi = os.path.basename(yol)
+        parcalar = self._anahtar(yol).split('/')
+
+        # Klasör adından kategori ve tarih klasörü
+        kategori = None
+        klasor_tarihi = None
+        if len(parcalar) >= 3 and parcalar[-3] in self.klasor_kategori:
+            kategori = self.klasor_kategori[parcalar[-3]]
+            klasor_tarihi = parcalar[-2]
+
+        semboller = []
+        zaman = None
+        for kalip_kategori, kalip in self.kaliplar:
+            eslesme = kalip.match(dosya_adi)
+            if eslesme:
+                grup = eslesme.groupdict()
+                semboller = [grup[k] for k in ('sembol', 'sembol2') if grup.get(k)]
+                zaman = datetime.strptime(grup['tarih'] + grup['saat'], '%Y%m%d%H%M')
+                kategori = kategori or kalip_kategori
+                break
+
+        if zaman is None:
+            zaman = datetime.fromtimestamp(os.path.getmtime(yol))
+
+        return {
+            'kategori': kategori or 'orijinal',
+            'semboller': semboller,
+            'zaman': zaman.strftime('%Y-%m-%d %H:%M'),
+            'klasor_tarihi': klasor_tarihi or zaman.strftime('%Y-%m-%d')
+        }
+
+    def excel_ozeti(self, yol):
+        """İlk sayfanın ilk sütunundan satır sayısı ve tarih aralığını oku"""
+        satir_sayisi = 0
+        baslangic = None
+        bitis = None
+
+        wb = load_workbook(yol, read_only=True)
+        try:
+            ws = wb.worksheets[0]
+            for (deger,) in ws.iter_rows(min_row=2, max_col=1, values_only=True):
+                if deger is None:
+                    continue
+                satir_sayisi += 1
+
+                if isinstance(deger, str):
+                    try:
+                        deger = datetime.fromisoformat(deger)
+                    except ValueError:
+                        continue
+                if isinstance(deger, (datetime, date)):
+                    if baslangic is None or deger < baslangic:
+                        baslangic = deger
+                    if bitis is None or deger > bitis:
+                        bitis = deger
+        finally:
+            wb.close()
+
+        return {
+            'satir_sayisi': satir_sayisi,
+            'baslangic': baslangic.strftime('%Y-%m-%d') if baslangic else None,
+            'bitis': bitis.strftime('%Y-%m-%d') if bitis else None
+        }
+
+    @staticmethod
+    def bayt_hash(yol, blok=1024 * 1024):
+        """Dosya baytlarının SHA-256 özetini hesapla"""
+        h = hashlib.sha256()
+        with open(yol, 'rb') as f:
+            for parca in iter(lambda: f.read(blok), b''):
+                h.update(parca)
+        return h.hexdigest()
+
+    def ad_anahtari(self, yol):
+        """Dosya adı kalıbından kategori ve semboller (ör. 'detayli:THYAO'); kalıba uymayan 'orijinal:'"""
+        dosya_adi = os.path.basename(yol)
+        for kategori, kalip in self.kaliplar:
+            eslesme = kalip.match(dosya_adi)
+            if eslesme:
+                grup = eslesme.groupdict()
+                return kategori + ':' + ','.join(grup[k].upper() for k in ('sembol', 'sembol2') if grup.get(k))
+        return 'orijinal:'
+
+    def dosya_hash(self, yol):
+        """Dosya adındaki kategori/semboller ile sayfa adları ve hücre değerlerinden SHA-256 özeti.
+
+        .xlsx baytları docProps içindeki oluşturma/değiştirme zamanlarını da taşır;
+        aynı veri iki kez dışa aktarıldığında baytlar farklı, bu özet aynıdır. Ad kısmı
+        sayesinde içerikleri aynı (ör. yalnızca başlık satırı) farklı sembollerin
+        dosyaları tekrar sayılmaz. Okunamayan (yarım kopyalanmış vb.) dosyalarda
+        ad ve bayt özeti döner.
+        """
+        ad = self.ad_anahtari(yol)
+        h = hashlib.sha256(ad.encode('utf-8'))
+        try:
+            wb = load_workbook(yol, read_only=True, data_only=True)
+        except Exception:
+            return 'bayt:' + hashlib.sha256(f"{ad}|{self.bayt_hash(yol)}".encode('utf-8')).hexdigest()
+        try:
+            for ws in wb.worksheets:
+                h.update(b'\x00sayfa\x00' + ws.title.encode('utf-8'))
+                for satir in ws.iter_rows(values_only=True):
+                    h.update(repr(satir).encode('utf-8'))
+                    h.update(b'\n')
+        except Exception:
+            return 'bayt:' + hashlib.sha256(f"{ad}|{self.bayt_hash(yol)}".encode('utf-8')).hexdigest()
+        finally:
+            wb.close()
+        return h.hexdigest()
+
+    def ekle(self, yol, commit=True, sha256=None):
+        """Dosyayı kataloğa ekle (değişmemişse tekrar okumaz)"""
+        anahtar = self._anahtar(yol)
+        stat = os.stat(yol)
+
+        with self.kilit:
+            mevcut = self.baglanti.execute(
+                "SELECT boyut, mtime, sha256 FROM dosyalar WHERE yol = ?", (anahtar,)
+            ).fetchone()
+        if (mevcut and mevcut['boyut'] == stat.st_size and mevcut['mtime'] == stat.st_mtime
+                and mevcut['sha256']):
+            return False
+
+        bilgi = self.dosya_adini_coz(yol)
+        if sha256 is None:
+            sha256 = self.dosya_hash(yol)
+        try:
+            ozet = self.excel_ozeti(yol)
+        except Exception:
+            ozet = {'satir_sayisi': None, 'baslangic': None, 'bitis': None}
+
+        with self.kilit:
+            self.baglanti.execute("""
+                INSERT OR REPLACE INTO dosyalar
+                (yol, kategori, sembol, zaman, klasor_tarihi, satir_sayisi, baslangic, bitis, boyut, mtime, sha256)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """, (anahtar, bilgi['kategori'], ','.join(bilgi['semboller']) or None, bilgi['zaman'],
+                  bilgi['klasor_tarihi'], ozet['satir_sayisi'], ozet['baslangic'], ozet['bitis'],
+                  stat.st_size, stat.st_mtime, sha256))
+            self.baglanti.execute("DELETE FROM dosya_sembolleri WHERE yol = ?", (anahtar,))
+            self.baglanti.executemany(
+                "INSERT INTO dosya_sembolleri (yol, sembol) VALUES (?, ?)",
+                [(anahtar, sembol) for sembol in bilgi['semboller']]
+            )
+            if commit:
+                self.baglanti.commit()
+        return True
+
+    def ekle_toplu(self, yollar):
+        """Birden fazla dosyayı tek commit ile kataloğa ekle"""
+        eklenen = sum(1 for yol in yollar if self.ekle(yol, commit=False))
+        with self.kilit:
+            self.baglanti.commit()
+        return eklenen
+
+    def tasi(self, eski_yol, yeni_yol):
+        """Taşınan dosyanın kaydını güncelle; kayıt yoksa ekle"""
+        eski = self._anahtar(eski_yol)
+        with self.kilit:
+            kayit = self.baglanti.execute("SELECT 1 FROM dosyalar WHERE yol = ?", (eski,)).fetchone()
+        if kayit is None:
+            return self.ekle(yeni_yol)
+
+        yeni = self._anahtar(yeni_yol)
+        bilgi = self.dosya_adini_coz(yeni_yol)
+        with self.kilit:
+            self.baglanti.execute(
+                "UPDATE dosyalar SET yol = ?, kategori = ?, klasor_tarihi = ? WHERE yol = ?",
+                (yeni, bilgi['kategori'], bilgi['klasor_tarihi'], eski)
+            )
+            self.baglanti.execute("UPDATE dosya_sembolleri SET yol = ? WHERE yol = ?", (yeni, eski))
+            self.baglanti.commit()
+        return True
+
+    def hashleri_tamamla(self):
+        """Özeti olmayan kayıtların (eski sürüm kataloglar) içerik özetini hesapla"""
+        with self.kilit:
+            anahtarlar = [satir['yol'] for satir in
+                          self.baglanti.execute("SELECT yol FROM dosyalar WHERE sha256 IS NULL")]
+        guncellenen = 0
+        for anahtar in anahtarlar:
+            tam_yol = self._tam_yol(anahtar)
+            if not os.path.exists(tam_yol):
+                continue
+            sha256 = self.dosya_hash(tam_yol)
+            with self.kilit:
+                self.baglanti.execute("UPDATE dosyalar SET sha256 = ? WHERE yol = ?", (sha256, anahtar))
+            guncellenen += 1
+        with self.kilit:
+            self.baglanti.commit()
+        return guncellenen
+
+    def hash_ile_bul(self, sha256):
+        """Aynı içeriğe sahip arşivdeki dosyayı bul"""
+        with self.kilit:
+            satirlar = self.baglanti.execute(
+                "SELECT yol FROM dosyalar WHERE sha256 = ? ORDER BY zaman", (sha256,)
+            ).fetchall()
+        for satir in satirlar:
+            tam_yol = self._tam_yol(satir['yol'])
+            if os.path.exists(tam_yol):
+                return tam_yol
+        return None
+
+    def sil(self, yol):
+        """Dosya kaydını sil"""
+        anahtar = self._anahtar(yol)
+        with self.kilit:
+            self.baglanti.execute("DELETE FROM dosyalar WHERE yol = ?", (anahtar,))
+            self.baglanti.execute("DELETE FROM dosya_sembolleri WHERE yol = ?", (anahtar,))
+            self.baglanti.commit()
+
+    def tara(self):
+        """Arşivi bir kez tarayıp kataloğu eşitle (ilk kurulum / dış değişiklikler için)"""
+        gorulen = set()
+        eklenen = 0
+        for klasor, _, dosyalar in os.walk(self.kok):
+            for dosya in dosyalar:
+                if not dosya.endswith('.xlsx') or dosya.startswith('~$'):
+                    continue
+                yol = os.path.join(klasor, dosya)
+                gorulen.add(self._anahtar(yol))
+                if self.ekle(yol, commit=False):
+                    eklenen += 1
+
+        with self.kilit:
+            kayitli = {satir['yol'] for satir in self.baglanti.execute("SELECT yol FROM dosyalar")}
+            silinen = kayitli - gorulen
+            for anahtar in silinen:
+                self.baglanti.execute("DELETE FROM dosyalar WHERE yol = ?", (anahtar,))
+                self.baglanti.execute("DELETE FROM dosya_sembolleri WHERE yol = ?", (anahtar,))
+            self.baglanti.execute("INSERT OR REPLACE INTO ayarlar (ad, deger) VALUES ('son_tarama', ?)",
+                                  (datetime.now().isoformat(timespec='seconds'),))
+            self.baglanti.commit()
+
+        return {'eklenen': eklenen, 'silinen': len(silinen), 'toplam': len(gorulen)}
+
+    def ilk_tarama(self):
+        """Katalog hiç taranmadıysa (yeni kurulum / katalog öncesi arşiv) arşivi bir kez tara"""
+        with self.kilit:
+            tarandi = self.baglanti.execute("SELECT 1 FROM ayarlar WHERE ad = 'son_tarama'").fetchone()
+        if tarandi:
+            return None
+        print("🔄 Arşiv kataloğu ilk kez oluşturuluyor...")
+        sonuc = self.tara()
+        print(f"✅ Katalog hazır: {sonuc['toplam']} dosya")
+        return sonuc
+
+    def sorgula(self, sembol=None, kategori=None, baslangic=None, bitis=None, tarih=None, limit=None):
+        """Kataloğu sembol, kategori ve zaman aralığına göre sorgula"""
+        sorgu = "SELECT d.* FROM dosyalar d"
+        kosullar = []
+        parametreler = []
+
+        if sembol:
+            sorgu += " JOIN dosya_sembolleri s ON s.yol = d.yol"
+            kosullar.append("s.sembol = ?")
+            parametreler.append(sembol.replace('.IS', ''))
+        if kategori:
+            kosullar.append("d.kategori = ?")
+            parametreler.append(kategori)
+        if tarih:
+            kosullar.append("d.klasor_tarihi = ?")
+            parametreler.append(tarih)
+        if baslangic:
+            kosullar.append("d.zaman >= ?")
+            parametreler.append(baslangic)
+        if bitis:
+            # Sadece tarih verildiyse günün tamamını kapsa
+            kosullar.append("d.zaman <= ?")
+            parametreler.append(bitis if len(bitis) > 10 else bitis + ' 23:59')
+
+        if kosullar:
+            sorgu += " WHERE " + " AND ".join(kosullar)
+        sorgu += " ORDER BY d.zaman"
+        if limit:
+            sorgu += f" LIMIT {int(limit)}"
+
+        with self.kilit:
+            satirlar = self.baglanti.execute(sorgu, parametreler).fetchall()
+
+        sonuc = []
+        for satir in satirlar:
+            kayit = dict(satir)
+            kayit['tam_yol'] = self._tam_yol(kayit['yol'])
+            sonuc.append(kayit)
+        return sonuc
+
+    def semboller(self):
+        """Katalogdaki tüm sembolleri listele"""
+        with self.kilit:
+            satirlar = self.baglanti.execute(
+                "SELECT DISTINCT sembol FROM dosya_sembolleri ORDER BY sembol"
+            ).fetchall()
+        return [satir['sembol'] for satir in satirlar]
+
+    def say(self, kategori=None, tarih=None):
+        """Dosya sayısını hesapla"""
+        sorgu = "SELECT COUNT(*) FROM dosyalar"
+        kosullar = []
+        parametreler = []
+        if kategori:
+            kosullar.append("kategori = ?")
+            parametreler.append(kategori)
+        if tarih:
+            kosullar.append("klasor_tarihi = ?")
+            parametreler.append(tarih)
+        if kosullar:
+            sorgu += " WHERE " + " AND ".join(kosullar)
+
+        with self.kilit:
+            return self.baglanti.execute(sorgu, parametreler).fetchone()[0]
+
+    def ozet(self):
+        """Kategori bazında dosya sayıları ve tarih aralıkları"""
+        with self.kilit:
+            satirlar = self.baglanti.execute("""
+                SELECT kategori, COUNT(*) AS adet, MIN(zaman) AS ilk, MAX(zaman) AS son,
+                       SUM(boyut) AS boyut
+                FROM dosyalar GROUP BY kategori ORDER BY kategori
+            """).fetchall()
+        return [dict(satir) for satir in satirlar]
+
+def main():
+    parser = argparse.ArgumentParser(description="Finansal_Veriler arşiv kataloğu")
+    parser.add_argument('--kok', default='Finansal_Veriler', help="Arşiv kök klasörü")
+    alt = parser.add_subparsers(dest='komut', required=True)
+
+    alt.add_parser('tara', help="Arşivi tarayıp kataloğu güncelle")
+    alt.add_parser('ozet', help="Kategori bazında özet")
+
+    sorgu = alt.add_parser('sorgula', help="Katalogda arama yap")
+    sorgu.add_argument('--sembol', help="örn: THYAO")
+    sorgu.add_argument('--kategori', help="detayli, teknik, karsilastirma, tum_veriler, manuel, canli, orijinal")
+    sorgu.add_argument('--baslangic', help="YYYY-MM-DD")
+    sorgu.add_argument('--bitis', help="YYYY-MM-DD")
+    sorgu.add_argument('--tarih', help="Tarih klasörü (YYYY-MM-DD)")
+    sorgu.add_argument('--limit', type=int)
+
+    args = parser.parse_args()
+    katalog = ArsivKatalogu(kok=args.kok)
+
+    if args.komut == 'tara':
+        sonuc = katalog.tara()
+        print(f"✅ Katalog güncellendi: {sonuc['toplam']} dosya "
+              f"({sonuc['eklenen']} yeni/değişen, {sonuc['silinen']} silinen)")
+
+    elif args.komut == 'ozet':
+        for satir in katalog.ozet():
+            print(f"📁 {satir['kategori']:14} {satir['adet']:5} dosya  "
+                  f"{satir['ilk']} → {satir['son']}  ({(satir['boyut'] or 0) / 1024:.0f} KB)")
+
+    elif args.komut == 'sorgula':
+        kayitlar = katalog.sorgula(args.sembol, args.kategori, args.baslangic,
+                                   args.bitis, args.tarih, args.limit)
+        for kayit in kayitlar:
+            aralik = f"{kayit['baslangic']} - {kayit['bitis']}" if kayit['baslangic'] else "-"
+            print(f"📄 {kayit['zaman']}  {kayit['kategori']:13} {kayit['sembol'] or '-':12} "
+                  f"{kayit['satir_sayisi'] or 0:6} satır  {aralik:23}  {kayit['yol']}")
+        print(f"\n💡 {len(kayitlar)} dosya bulundu")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,237 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Arşivdeki Excel Anlık Görüntülerini Sembol Başına Tek Geçmiş Dosyasında Birleştirme
+Geliştiren: Çağatay Elaman
+"""
+
+import os
+import argparse
+import numpy as np
+import pandas as pd
+from arsiv_katalogu import ArsivKatalogu
+from gecmis_deposu import GecmisDeposu
+from veri_katmani import VeriKatmani
+from kurumsal_islemler import ISLEM_SUTUNLARI, yahoo_ham
+from ohlcv_tipleri import FIYAT_SUTUNLARI, HACIM_SUTUNU, zaman_ns
+
+class ArsivSikistirici:
+    def __init__(self, kok='Finansal_Veriler'):
+        self.katalog = ArsivKatalogu(kok=kok)
+        self.depo = GecmisDeposu(kok=os.path.join(kok, 'Gecmis'))
+        # Depo ham (işlem günü) fiyatları tutar; kapsam ve kurumsal işlem tablosu veri katmanından
+        self.veri = VeriKatmani(self.depo)
+
+        # OHLCV içeren kategoriler
+        self.kategoriler = ['detayli', 'teknik', 'canli', 'karsilastirma']
+        self.zorunlu_sutunlar = ['Open', 'High', 'Low', 'Close']
+
+    def print_separator(self, title):
+        print(f"\n{'='*60}")
+        print(f" {title}")
+        print(f"{'='*60}")
+
+    def find_snapshots(self, symbol):
+        """Sembolün tüm anlık görüntülerini katalogdan bul (eskiden yeniye)"""
+        kayitlar = []
+        for kategori in self.kategoriler:
+            kayitlar.extend(self.katalog.sorgula(sembol=symbol, kategori=kategori))
+        return sorted(kayitlar, key=lambda k: (k['zaman'], k['yol']))
+
+    def read_snapshot(self, kayit, symbol):
+        """Excel dosyasından sembolün OHLCV sayfasını oku"""
+        sayfalar = pd.read_excel(kayit['tam_yol'], sheet_name=None, index_col=0)
+
+        # Karşılaştırma dosyalarında sayfa adı sembol, diğerlerinde ilk sayfa
+        sayfa = sayfalar.get(self.depo.sembol_adi(symbol))
+        if sayfa is None:
+            sayfa = next(iter(sayfalar.values()))
+
+        if not all(sutun in sayfa.columns for sutun in self.zorunlu_sutunlar):
+            return None
+        return self.depo.normalize(sayfa)
+
+    def olaylari_isle(self, symbol, parca):
+        """Görüntünün Dividends / Stock Splits sütunlarındaki, tabloda olmayan olayları tabloya ekle.
+
+        Görüntü auto_adjust ile alındığından ham kapanış doğrudan okunamaz; bölünme ölçeği
+        yahoo_ham ile geri alınır, temettü çarpanlarının birikimi ise son olaydan geriye
+        doğru çözülür (düzeltilmiş = (ham - temettü) x sonraki çarpanlar). Temettü çarpanı
+        indirmede olduğu gibi ex-tarihten önceki ham kapanıştan hesaplanır.
+        """
+        islemler = self.veri.islemler
+        ham, olaylar = yahoo_ham(parca)
+        olaylar = olaylar[olaylar.index > ham.index[0]] if len(ham) else olaylar
+        mevcut = islemler.oku(symbol)
+        if len(olaylar) == 0 or olaylar.index.isin(mevcut.index).all():
+            return False
+
+        kapanis = ham['Close'].to_numpy(dtype=np.float64)
+        zaman = zaman_ns(ham.index)
+        onceki_zaman, onceki_kapanis = [], []
+        sonraki = 1.0
+        for gun, olay in olaylar[::-1].iterrows():
+            konum = np.searchsorted(zaman, gun.value, side='left') - 1
+            if konum < 0:
+                continue
+            temettu = float(olay['Dividends'])
+            if gun in mevcut.index:
+                kayit = mevcut.loc[gun]
+                oran = float(kayit['Stock Splits'])
+                carpan = float(kayit['fiyat_carpani']) * (oran if oran > 0 else 1.0)
+            else:
+                ham_onceki = kapanis[konum] / sonraki + temettu
+                onceki_zaman.append(zaman[konum])
+                onceki_kapanis.append(ham_onceki)
+                carpan = 1 - temettu / ham_onceki if 0 < temettu < ham_onceki else 1.0
+            sonraki *= carpan
+
+        barlar = pd.DataFrame({'Close': onceki_kapanis[::-1]},
+                              index=pd.DatetimeIndex(np.array(onceki_zaman[::-1], dtype='datetime64[ns]')))
+        return islemler.ekle(symbol, olaylar, barlar)
+
+    def ham_fiyatlara_cevir(self, symbol, parca, goruntu_zamani):
+        """ticker.history() (auto_adjust) görüntüsünü işlem günü fiyatlarına çevir; çevrilemezse None.
+
+        Görüntü, alındığı ana kadar gerçekleşen temettü ve bölünmelere göre düzeltilmiştir.
+        Tabloda olmayan olaylar önce görüntünün kendi olay sütunlarından tabloya eklenir,
+        sonra olayların çarpanları geri uygulanır. Görüntü olay sütunu içermiyor ve tablo
+        hiç yoksa doğru çarpan bilinemeyeceği için görüntü atlanır.
+        """
+        islemler = self.veri.islemler
+        if all(c in parca.columns for c in ISLEM_SUTUNLARI):
+            if self.olaylari_isle(symbol, parca):
+                print("   🔄 Görüntüdeki temettü/bölünmeler kurumsal işlem tablosuna eklendi")
+        elif not os.path.exists(islemler.dosya_yolu(symbol)):
+            print("   ⚠️  Olay sütunu yok ve kurumsal işlem tablosu bulunamadı; düzeltme geri alınamaz")
+            return None
+
+        carpan = islemler.carpanlar(symbol)
+        if carpan is None:
+            return parca
+        olay_zaman, fiyat_kum, hacim_kum = carpan
+        k = np.searchsorted(olay_zaman, zaman_ns(parca.index), side='right')
+        ks = np.searchsorted(olay_zaman, pd.Timestamp(goruntu_zamani).value, side='right')
+        if (k >= ks).all():
+            return parca
+
+        # Bar ile görüntü anı arasındaki olayların çarpımı: (t, görüntü] aralığı
+        fiyat = fiyat_kum[np.minimum(k, ks)] / fiyat_kum[ks]
+        hacim = hacim_kum[np.minimum(k, ks)] / hacim_kum[ks]
+        parca = parca.copy()
+        for c in FIYAT_SUTUNLARI:
+            if c in parca.columns:
+                parca[c] = parca[c].to_numpy(dtype=np.float64) / fiyat
+        if HACIM_SUTUNU in parca.columns:
+            parca[HACIM_SUTUNU] = np.rint(parca[HACIM_SUTUNU].to_numpy(dtype=np.float64) / hacim)
+        return self.depo.normalize(parca)
+
+    def verify(self, symbol, parcalar, beklenen):
+        """Yazılan dosyayı tekrar okuyup tüm kaynak barların içinde olduğunu doğrula"""
+        yazilan = self.depo.oku(symbol)
+        if yazilan is None or len(yazilan) != len(beklenen):
+            return False
+        if not yazilan.index.equals(beklenen.index):
+            return False
+        for parca in parcalar:
+            if not parca.index.isin(yazilan.index).all():
+                return False
+
+        return np.allclose(yazilan[self.zorunlu_sutunlar].to_numpy(dtype=float),
+                           beklenen[self.zorunlu_sutunlar].to_numpy(dtype=float),
+                           rtol=0, atol=1e-9, equal_nan=True)
+
+    def compact_symbol(self, symbol, remove_sources=False):
+        """Tek bir sembolün anlık görüntülerini birleştir"""
+        kayitlar = self.find_snapshots(symbol)
+        if not kayitlar:
+            print(f"📭 {symbol} için arşivde dosya yok")
+            return None
+
+        print(f"\n📊 {symbol}: {len(kayitlar)} anlık görüntü bulundu")
+
+        # Mevcut geçmiş en eski kaynak sayılır; sonraki görüntüler üzerine yazar
+        parcalar = []
+        okunan = []
+        mevcut = self.depo.oku(symbol)
+        if mevcut is not None and not self.veri.ham_mi(symbol):
+            # Ham depo öncesinden kalan düzeltilmiş barlar ham görüntülerle karıştırılmaz
+            print("   ⚠️  Mevcut geçmiş düzeltilmiş fiyatlarla yazılmış, yok sayılıyor")
+            mevcut = None
+        if mevcut is not None:
+            parcalar.append(mevcut)
+
+        for kayit in kayitlar:
+            try:
+                parca = self.read_snapshot(kayit, symbol)
+            except Exception as e:
+                print(f"   ⚠️  Okunamadı, atlandı: {kayit['yol']} ({e})")
+                continue
+            if parca is None:
+                print(f"   ⚠️  OHLCV sayfası yok, atlandı: {kayit['yol']}")
+                continue
+            parca = self.ham_fiyatlara_cevir(symbol, parca, kayit['zaman'])
+            if parca is None:
+                print(f"   ⚠️  Ham fiyatlara çevrilemedi, atlandı: {kayit['yol']}")
+                continue
+            parcalar.append(parca)
+            okunan.append(kayit)
+
+        if not okunan:
+            print(f"❌ {symbol} için okunabilir veri yok")
+            return None
+
+        birlesik = self.depo.normalize(pd.concat(parcalar))
+        if len(birlesik) == 0:
+            print(f"📭 {symbol} için dosyalarda bar yok, geçmiş yazılmadı")
+            return None
+        yol = self.depo.yaz(symbol, birlesik)
+        self.veri.ham_isaretle(symbol)
+
+        toplam_satir = sum(len(p) for p in parcalar)
+        print(f"   ✅ {toplam_satir} satır → {len(birlesik)} benzersiz bar")
+        print(f"   💾 Kaydedildi: {yol} ({os.path.getsize(yol) / 1024:.1f} KB)")
+
+        if remove_sources:
+            if not self.verify(symbol, parcalar, birlesik):
+                print("   ❌ Doğrulama başarısız, kaynak dosyalar silinmedi!")
+                return birlesik
+
+            # Karşılaştırma dosyaları başka sembolün verisini de içerdiği için silinmez
+            silinecek = [k for k in okunan if k['kategori'] != 'karsilastirma']
+            for kayit in silinecek:
+                os.remove(kayit['tam_yol'])
+                self.katalog.sil(kayit['tam_yol'])
+            print(f"   🗑️  {len(silinecek)} kaynak dosya doğrulandı ve silindi")
+
+        return birlesik
+
+    def compact_all(self, symbols=None, remove_sources=False):
+        """Birden fazla sembolü birleştir (verilmezse katalogdaki tüm semboller)"""
+        self.print_separator("ARŞİV SIKIŞTIRMA")
+
+        symbols = symbols or self.katalog.semboller()
+        sonuclar = {}
+        for symbol in symbols:
+            sonuc = self.compact_symbol(symbol, remove_sources)
+            if sonuc is not None:
+                sonuclar[symbol] = len(sonuc)
+
+        print(f"\n🎉 {len(sonuclar)} sembol için geçmiş dosyası güncellendi")
+        return sonuclar
+
+def main():
+    parser = argparse.ArgumentParser(description="Arşivdeki anlık görüntüleri sembol başına tek dosyada birleştir")
+    parser.add_argument('semboller', nargs='*', help="örn: THYAO AKBNK (boşsa tümü)")
+    parser.add_argument('--kok', default='Finansal_Veriler', help="Arşiv kök klasörü")
+    parser.add_argument('--sil', action='store_true', help="Doğrulamadan sonra kaynak Excel dosyalarını sil")
+    parser.add_argument('--tara', action='store_true', help="Önce arşiv kataloğunu güncelle")
+    args = parser.parse_args()
+
+    sikistirici = ArsivSikistirici(kok=args.kok)
+    if args.tara:
+        sikistirici.katalog.tara()
+    sikistirici.compact_all([s.replace('.IS', '').upper() for s in args.semboller], args.sil)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,217 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Dashboard İçin Halka Tamponlu Canlı Seri Deposu
+Geliştiren: Çağatay Elaman
+"""
+
+import time
+import threading
+import numpy as np
+from datetime import datetime
+from veri_katmani import ARALIK_SANIYE, periyot_baslangici
+from islem_takvimi import IslemTakvimi
+from gostergeler import GostergeHesaplayici, TEMEL_GOSTERGELER
+from ohlcv_tipleri import FIYAT_TIPI, HACIM_TIPI, hassas
+
+class CanliSeri:
+    """(sembol, aralık) için son N barı ve gösterge değerlerini tutan sabit boyutlu halka tampon.
+
+    Diziler 2N uzunluğundadır ve her değer hem i hem de i+N konumuna yazılır;
+    böylece son k <= N bar her zaman bitişik bir dilimdir ve kopyasız okunur.
+    """
+
+    alanlar = ('zaman', 'open', 'high', 'low', 'close', 'volume',
+               'ma20', 'ma50', 'rsi', 'upper_band', 'lower_band')
+
+    def __init__(self, kapasite=600):
+        self.kapasite = kapasite
+        # Fiyatlar float32, hacim ve zaman int64; göstergeler float64
+        self.diziler = {alan: np.full(2 * kapasite, np.nan) for alan in self.alanlar}
+        for alan in ('open', 'high', 'low', 'close'):
+            self.diziler[alan] = np.full(2 * kapasite, np.nan, dtype=FIYAT_TIPI)
+        self.diziler['volume'] = np.zeros(2 * kapasite, dtype=HACIM_TIPI)
+        self.diziler['zaman'] = np.zeros(2 * kapasite, dtype=np.int64)
+        self.n = 0
+        self.kapsam_baslangic = None
+        self.guncelleme = 0.0
+        # Tampondaki düzeltilmiş barların dayandığı kurumsal işlem tablosu sürümü
+        self.islem_surumu = None
+        # Seri başına kilit: bir sembolün indirmesi diğer sembolleri bekletmez
+        self.kilit = threading.Lock()
+
+    @property
+    def bellek_boyutu(self):
+        """Seri başına sabit bellek kullanımı (bayt)"""
+        return sum(dizi.nbytes for dizi in self.diziler.values())
+
+    def _yaz(self, konum, degerler):
+        for alan, deger in degerler.items():
+            dizi = self.diziler[alan]
+            dizi[konum] = deger
+            dizi[konum + self.kapasite] = deger
+
+    def _gostergeleri_hesapla(self, konum):
+        """Son barın göstergelerini son 50 barlık bitişik pencereden hesapla (O(1))"""
+        p = self.son(min(self.n, 50))
+        g = GostergeHesaplayici(p['open'], p['high'], p['low'], p['close'], p['volume']).hesapla(TEMEL_GOSTERGELER)
+        self._yaz(konum, {alan: dizi[-1] for alan, dizi in g.items()})
+
+    def ekle(self, zaman, acilis, yuksek, dusuk, kapanis, hacim):
+        """Yeni bar ekle (O(1))"""
+        konum = self.n % self.kapasite
+        self._yaz(konum, {
+            'zaman': zaman, 'open': acilis, 'high': yuksek, 'low': dusuk,
+            'close': kapanis, 'volume': hacim,
+            'ma20': np.nan, 'ma50': np.nan, 'rsi': np.nan, 'upper_band': np.nan, 'lower_band': np.nan
+        })
+        self.n += 1
+        self._gostergeleri_hesapla(konum)
+
+    def son_bari_guncelle(self, acilis, yuksek, dusuk, kapanis, hacim):
+        """Henüz kapanmamış son barı güncelle"""
+        konum = (self.n - 1) % self.kapasite
+        self._yaz(konum, {'open': acilis, 'high': yuksek, 'low': dusuk, 'close': kapanis, 'volume': hacim})
+        self._gostergeleri_hesapla(konum)
+
+    def son(self, k=None):
+        """Son k barın kopyasız görünümleri"""
+        adet = min(self.n, self.kapasite)
+        k = adet if k is None else min(k, adet)
+        bas = (self.n - k) % self.kapasite
+        return {alan: dizi[bas:bas + k] for alan, dizi in self.diziler.items()}
+
+    @property
+    def ilk_zaman(self):
+        return int(self.son()['zaman'][0]) if self.n else None
+
+    @property
+    def son_zaman(self):
+        return int(self.diziler['zaman'][(self.n - 1) % self.kapasite]) if self.n else None
+
+    def kapsiyor_mu(self, baslangic_ns):
+        """İstenen başlangıçtan itibaren tüm barlar tamponda mı?"""
+        if self.n == 0 or self.kapsam_baslangic is None or self.kapsam_baslangic > baslangic_ns:
+            return False
+        return self.n <= self.kapasite or self.ilk_zaman <= baslangic_ns
+
+    def aralik(self, baslangic_ns):
+        """Başlangıçtan itibaren barların kopyasız görünümleri"""
+        pencere = self.son()
+        bas = int(np.searchsorted(pencere['zaman'], baslangic_ns))
+        return {alan: dizi[bas:] for alan, dizi in pencere.items()}
+
+    def yukle(self, df, baslangic_ns):
+        """DataFrame'den toplu yükleme (göstergeler tüm geçmiş üzerinden vektörel)"""
+        zaman = df.index.values.astype('datetime64[ns]').view('int64')
+        hesaplayici = GostergeHesaplayici.df_den(df)
+
+        son_k = min(len(df), self.kapasite)
+        kaynak = dict(hesaplayici.seriler, zaman=zaman)
+        kaynak.update(hesaplayici.hesapla(TEMEL_GOSTERGELER))
+        for alan, dizi in kaynak.items():
+            self.diziler[alan][:son_k] = dizi[-son_k:]
+            self.diziler[alan][self.kapasite:self.kapasite + son_k] = dizi[-son_k:]
+
+        self.n = son_k
+        self.kapsam_baslangic = baslangic_ns if len(df) <= self.kapasite else int(zaman[-son_k])
+        self.guncelleme = time.time()
+
+    def guncelle(self, df, baslangic_ns):
+        """Yeni gelen veriyi tampona işle: son barı güncelle, yenileri ekle"""
+        zaman = df.index.values.astype('datetime64[ns]').view('int64')
+        if self.n == 0 or len(zaman) == 0 or zaman[0] > self.son_zaman or \
+                self.kapsam_baslangic is None or baslangic_ns < self.kapsam_baslangic:
+            # Örtüşme yok ya da istek tampondan daha eski barlar içeriyor: baştan yükle
+            self.yukle(df, baslangic_ns)
+            return
+
+        acilis = df['Open'].to_numpy()
+        yuksek = df['High'].to_numpy()
+        dusuk = df['Low'].to_numpy()
+        kapanis = df['Close'].to_numpy()
+        hacim = df['Volume'].to_numpy()
+
+        son_zaman = self.son_zaman
+        for i in np.flatnonzero(zaman >= son_zaman):
+            if zaman[i] == son_zaman:
+                self.son_bari_guncelle(acilis[i], yuksek[i], dusuk[i], kapanis[i], hacim[i])
+            else:
+                self.ekle(zaman[i], acilis[i], yuksek[i], dusuk[i], kapanis[i], hacim[i])
+
+        self.kapsam_baslangic = min(self.kapsam_baslangic, baslangic_ns)
+        self.guncelleme = time.time()
+
+class CanliSeriDeposu:
+    """Web sürecinde (sembol, aralık) başına canlı serileri tutar"""
+
+    def __init__(self, veri_katmani, kapasite=600):
+        self.veri = veri_katmani
+        self.kapasite = kapasite
+        self.seriler = {}
+        self.kilit = threading.Lock()
+        self.takvim = IslemTakvimi()
+
+    def _dakika(self, saat):
+        s, d = saat.split(':')
+        return int(s) * 60 + int(d)
+
+    def tahmini_bar(self, baslangic, interval, simdi=None):
+        """Başlangıçtan bu yana işlem barı sayısı tahmini (takvimdeki işlem günleri x seans barları)"""
+        simdi = simdi or datetime.now()
+        gunler = self.takvim.islem_gunleri(baslangic, simdi)
+        if interval == '1d':
+            return len(gunler)
+        acilis, kapanis = self._dakika(self.takvim.seans['acilis']), self._dakika(self.takvim.seans['kapanis'])
+        tam_gun = len(gunler) - int(len(gunler) > 0 and gunler[-1] == np.datetime64(simdi.date(), 'D'))
+        bugun = 0 if tam_gun == len(gunler) else min(max(simdi.hour * 60 + simdi.minute - acilis, 0), kapanis - acilis)
+        return (tam_gun * (kapanis - acilis) + bugun) * 60 // ARALIK_SANIYE[interval]
+
+    def getir(self, symbol, period, interval):
+        """İstenen aralığı tampondan kopyalayıp döndür; tampon yetmiyorsa None.
+
+        Kopya seri kilidi altında alınır; yanıt yazılırken eşzamanlı bir güncelleme
+        tamponun üzerine yazsa da dönen diziler değişmez.
+        """
+        baslangic = periyot_baslangici(period)
+        # Tampona sığmayacak periyotlar için indirme yapılmaz; çağıran doğrudan veri katmanına gider
+        if self.tahmini_bar(baslangic, interval) > self.kapasite:
+            return None
+        baslangic_ns = np.datetime64(baslangic, 'ns').view('int64')
+        anahtar = (symbol, interval)
+
+        with self.kilit:
+            seri = self.seriler.get(anahtar)
+            if seri is None:
+                seri = CanliSeri(self.kapasite)
+                self.seriler[anahtar] = seri
+
+        # Ağ çağrısı yalnızca bu serinin kilidini tutar
+        with seri.kilit:
+            # Yeni temettü / bölünme eski barların düzeltmesini de değiştirir: tampon baştan yüklenir
+            islem_surumu = self.veri.islemler.surum(symbol)
+            ayni_duzeltme = seri.n == 0 or seri.islem_surumu == islem_surumu
+            taze = time.time() - seri.guncelleme <= self.veri.tazelik[interval]
+            if not (taze and ayni_duzeltme and seri.kapsiyor_mu(baslangic_ns)):
+                df = self.veri.gecmis_getir(symbol, period, interval)
+                if df is None or len(df) == 0:
+                    return None
+                if ayni_duzeltme:
+                    seri.guncelle(df, baslangic_ns)
+                else:
+                    seri.yukle(df, baslangic_ns)
+                seri.islem_surumu = islem_surumu
+
+            if not seri.kapsiyor_mu(baslangic_ns):
+                return None
+            return {alan: dizi.copy() for alan, dizi in seri.aralik(baslangic_ns).items()}
+
+def tarih_listesi(zaman, interval):
+    """int64 zaman damgalarını grafik etiketlerine çevir (pandas kullanmadan)"""
+    birim = 'D' if interval == '1d' else 'm'
+    metinler = np.datetime_as_string(zaman.view('datetime64[ns]'), unit=birim)
+    return np.char.replace(metinler, 'T', ' ').tolist()
+
+def json_listesi(dizi, ondalik=2):
+    """NaN değerleri None olacak şekilde yuvarlanmış liste (float32 önce float64'e yükseltilir)"""
+    return [None if x != x else x for x in np.round(hassas(dizi), ondalik).tolist()]
@@ -14,6 +14,10 @@ import time
 import yfinance as yf
 from alpha_vantage.timeseries import TimeSeries
 import warnings
+from hisse_bilgi_onbellegi import HisseBilgiOnbellegi
+from tik_toplayici import TikToplayici
+import excel_aktarimi
+from makro_deposu import ortak_depo
 warnings.filterwarnings('ignore')
 
 class CanliVeriCekici:
@@ -22,12 +26,24 @@ class CanliVeriCekici:
         self.session.headers.update({
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
         })
+        
+        # ticker.info önbelleği
+        self.bilgi_onbellegi = HisseBilgiOnbellegi()
+        
+        # İzleme sırasında görülen fiyatlardan gün içi bar üretimi
+        self.tik_toplayici = TikToplayici()
     
     def print_separator(self, title):
         print(f"\n{'='*50}")
         print(f" {title}")
         print(f"{'='*50}")
     
+    def record_tick(self, symbol, info):
+        """Görülen fiyatı bar üreticisine ver"""
+        fiyat = info.get('currentPrice')
+        if isinstance(fiyat, (int, float)):
+            self.tik_toplayici.ekle(symbol, fiyat, kumulatif_hacim=info.get('regularMarketVolume'))
+    
     def method1_yfinance(self, symbol="THYAO.IS", period="1mo"):
         """Yahoo Finance API kullanarak veri çekme"""
         self.print_separator("YAHOO FINANCE API")
@@ -36,7 +52,7 @@ class CanliVeriCekici:
             
             # Hisse senedi bilgilerini al
             ticker = yf.Ticker(symbol)
-            info = ticker.info
+            info = self.bilgi_onbellegi.get_info(symbol)
             
             print(f"🏢 Şirket: {info.get('longName', 'Bilinmiyor')}")
             print(f"💱 Sembol: {symbol}")
@@ -140,7 +156,9 @@ class CanliVeriCekici:
         self.print_separator("MANUEL VERİ GİRİŞİ")
         
         print("📝 Manuel veri girişi yapın:")
+        print("💡 USD/TRY ve BIST100 tarihe göre makro depodan doldurulur (Enter ile kabul edin)")
         
+        makro = ortak_depo()
         data_list = []
         while True:
             print(f"\n--- Veri {len(data_list) + 1} ---")
@@ -154,7 +172,14 @@ class CanliVeriCekici:
                 min_fiyat = float(input("Minimum fiyat: "))
                 max_fiyat = float(input("Maksimum fiyat: "))
                 hacim = int(input("Hacim: "))
-                usd_try = float(input("USD/TRY: "))
+                
+                gun = datetime.strptime(tarih, '%Y-%m-%d')
+                varsayilan = makro.deger('usd_try', gun)
+                if varsayilan is None:
+                    usd_try = float(input("USD/TRY: "))
+                else:
+                    usd_try = float(input(f"USD/TRY [{varsayilan:.4f}]: ") or varsayilan)
+                bist_100 = makro.deger('bist_100', gun)
                 
                 data_list.append({
                     'Tarih': tarih,
@@ -162,7 +187,8 @@ class CanliVeriCekici:
                     'Min': min_fiyat,
                     'Max': max_fiyat,
                     'Hacim': hacim,
-                    'USD_TRY': usd_try
+                    'USD_TRY': usd_try,
+                    'BIST_100': bist_100
                 })
                 
                 print("✅ Veri eklendi!")
@@ -190,19 +216,23 @@ class CanliVeriCekici:
         
         try:
             while True:
-                ticker = yf.Ticker(symbol)
-                info = ticker.info
+                info = self.bilgi_onbellegi.get_info(symbol, fiyat_sure=interval / 2)
                 
                 current_time = datetime.now().strftime('%H:%M:%S')
                 current_price = info.get('currentPrice', 'Bilinmiyor')
                 change_percent = info.get('regularMarketChangePercent', 'Bilinmiyor')
                 
                 print(f"[{current_time}] 💰 {symbol}: {current_price} TL ({change_percent}%)")
+                self.record_tick(symbol, info)
                 
                 time.sleep(interval)
                 
         except KeyboardInterrupt:
             print("\n⏹️  İzleme durduruldu.")
+        finally:
+            bar_sayisi = self.tik_toplayici.bosalt()
+            if bar_sayisi:
+                print(f"💾 {bar_sayisi} tamamlanmış bar yerel depoya yazıldı")
     
     def method6_run_all_automatically(self, symbol="THYAO.IS", period="1mo", api_key=None):
         """Tüm yöntemleri otomatik olarak çalıştır"""
@@ -279,18 +309,19 @@ class CanliVeriCekici:
         print(f"{'='*30}")
         try:
             print("🔄 5 güncelleme yapılıyor...")
-            ticker = yf.Ticker(symbol)
             for i in range(5):
-                info = ticker.info
+                info = self.bilgi_onbellegi.get_info(symbol, fiyat_sure=1)
                 current_time = datetime.now().strftime('%H:%M:%S')
                 current_price = info.get('currentPrice', 'Bilinmiyor')
                 change_percent = info.get('regularMarketChangePercent', 'Bilinmiyor')
                 
                 print(f"[{current_time}] 💰 {symbol}: {current_price} TL ({change_percent}%)")
+                self.record_tick(symbol, info)
                 
                 if i < 4:  # Son güncellemede bekleme
                     time.sleep(2)
             
+            self.tik_toplayici.bosalt()
             results['realtime'] = True
             success_count += 1
             print("✅ Gerçek zamanlı izleme başarılı!")
@@ -356,22 +387,20 @@ class CanliVeriCekici:
         # Excel olarak kaydet
         filename = f"{symbol.replace('.IS', '')}_TUM_VERILER_{datetime.now().strftime('%Y%m%d_%H%M')}.xlsx"
         
-        with pd.ExcelWriter(filename, engine='openpyxl') as writer:
-            # Her veri türü için ayrı sayfa
-            for method, data in combined_data.items():
-                if isinstance(data, dict) and 'Son_5_Gun' in data:
-                    # Son 5 gün verilerini kaydet
-                    data['Son_5_Gun'].to_excel(writer, sheet_name=f"{method}_Son5Gun")
-                    
-                    # Özet bilgileri kaydet
-                    summary_df = pd.DataFrame({
-                        'Bilgi': ['Veri Sayısı', 'Tarih Aralığı'],
-                        'Değer': [data['Veri_Sayisi'], data['Tarih_Araligi']]
-                    })
-                    summary_df.to_excel(writer, sheet_name=f"{method}_Ozet", index=False)
-                else:
-                    # Direkt DataFrame'i kaydet
-                    data.to_excel(writer, sheet_name=method, index=False)
+        # Her veri türü için ayrı sayfa (akış modunda yazılır)
+        sayfalar = []
+        for method, data in combined_data.items():
+            if isinstance(data, dict) and 'Son_5_Gun' in data:
+                # Son 5 gün verileri ve özet bilgiler
+                sayfalar.append(excel_aktarimi.df_sayfasi(f"{method}_Son5Gun", data['Son_5_Gun']))
+                sayfalar.append(excel_aktarimi.sutun_sayfasi(f"{method}_Ozet", {
+                    'Bilgi': ['Veri Sayısı', 'Tarih Aralığı'],
+                    'Değer': np.array([data['Veri_Sayisi'], data['Tarih_Araligi']], dtype=object)
+                }))
+            else:
+                # Direkt DataFrame'i kaydet
+                sayfalar.append(excel_aktarimi.df_sayfasi(method, data, index=False))
+        excel_aktarimi.excel_yaz(filename, sayfalar)
         
         print(f"💾 Birleştirilmiş veriler kaydedildi: {filename}")
     
@@ -6,9 +6,13 @@ Geliştiren: Çağatay Elaman
 """
 
 import os
+import json
 import shutil
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 import glob
+from arsiv_katalogu import ArsivKatalogu
 
 class DosyaDuzenleyici:
     def __init__(self):
@@ -33,6 +37,13 @@ class DosyaDuzenleyici:
             'karsilastirma': ['karsilastirma_'],
             'orijinal': ['dnıs.xlsx', 'veri.xlsx']
         }
+        
+        # Arşiv kataloğu
+        self.katalog = ArsivKatalogu(kok=self.folders['base'])
+        
+        # Yarıda kalan çalışmaları tamamlamak için işlem günlüğü
+        self.gunluk_yolu = os.path.join(self.folders['base'], '.organizasyon_gunlugu.jsonl')
+        self.gunluk_kilit = threading.Lock()
     
     def print_separator(self, title):
         print(f"\n{'='*60}")
@@ -95,37 +106,149 @@ class DosyaDuzenleyici:
         else:
             return os.path.join(self.folders['base'], today)
     
-    def move_file(self, source_file, destination_folder):
-        """Dosyayı taşı"""
+    def unique_destination(self, destination_folder, source_file, reserved):
+        """Hedefte aynı isimde dosya varsa _v1, _v2 ... ile yeni isim üret"""
+        destination_path = os.path.join(destination_folder, os.path.basename(source_file))
+        
+        if os.path.exists(destination_path) or destination_path in reserved:
+            base_name = os.path.splitext(os.path.basename(source_file))[0]
+            extension = os.path.splitext(source_file)[1]
+            counter = 1
+            while os.path.exists(destination_path) or destination_path in reserved:
+                new_name = f"{base_name}_v{counter}{extension}"
+                destination_path = os.path.join(destination_folder, new_name)
+                counter += 1
+        
+        return destination_path
+    
+    def write_journal(self, kayit):
+        """İşlem günlüğüne bir satır ekle"""
+        with self.gunluk_kilit:
+            with open(self.gunluk_yolu, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(kayit, ensure_ascii=False) + '\n')
+                f.flush()
+                os.fsync(f.fileno())
+    
+    def resume_journal(self):
+        """Önceki çalışmadan yarıda kalan adımları tamamla"""
+        if not os.path.exists(self.gunluk_yolu):
+            return 0
+        
+        son_durum = {}
+        with open(self.gunluk_yolu, encoding='utf-8') as f:
+            for satir in f:
+                try:
+                    kayit = json.loads(satir)
+                except ValueError:
+                    continue  # Yarım yazılmış son satır
+                son_durum[(kayit['kaynak'], kayit['hedef'])] = kayit
+        
+        yarim = [k for k in son_durum.values() if k['durum'] == 'basladi']
+        for kayit in yarim:
+            kaynak, hedef = kayit['kaynak'], kayit['hedef']
+            
+            # 'atla' adımları kaynak dosya yerinde kaldığı için tekrar işlenir
+            if kayit['islem'] == 'atla' or not os.path.exists(hedef):
+                continue
+            
+            if self.katalog.dosya_hash(hedef) != kayit['sha256']:
+                # Kopyalama yarıda kalmış, kaynak hâlâ duruyor
+                if os.path.exists(kaynak):
+                    os.remove(hedef)
+                continue
+            
+            if os.path.exists(kaynak):
+                os.remove(kaynak)
+            self.katalog.ekle(hedef, sha256=kayit['sha256'])
+        
+        os.remove(self.gunluk_yolu)
+        return len(yarim)
+    
+    def plan_files(self, excel_files, hashes, duplicate_policy):
+        """Her dosya için yapılacak işlemi belirle (taşı / atla / bağlantı)"""
+        plan = []
+        bu_calisma = {}
+        reserved = set()
+        
+        for file in excel_files:
+            sha256 = hashes[file]
+            category = self.categorize_file(file)
+            destination_folder = self.get_destination_folder(category, file)
+            
+            # Aynı içerik arşivde ya da bu çalışmada zaten var mı?
+            mevcut = bu_calisma.get(sha256) or self.katalog.hash_ile_bul(sha256)
+            
+            if mevcut is None:
+                destination_path = self.unique_destination(destination_folder, file, reserved)
+                bu_calisma[sha256] = destination_path
+                islem = 'tasi'
+            elif duplicate_policy == 'baglanti' and \
+                    os.path.join(destination_folder, os.path.basename(file)) != mevcut:
+                destination_path = self.unique_destination(destination_folder, file, reserved)
+                islem = 'baglanti'
+            else:
+                destination_path = mevcut
+                islem = 'atla'
+            
+            if islem != 'atla':
+                reserved.add(destination_path)
+            
+            plan.append({
+                'islem': islem,
+                'kaynak': file,
+                'hedef': destination_path,
+                'mevcut': mevcut,
+                'kategori': category,
+                'sha256': sha256
+            })
+        
+        return plan
+    
+    def apply_step(self, adim):
+        """Planlanan tek bir adımı günlüğe yazarak uygula"""
         try:
+            self.write_journal({**adim, 'durum': 'basladi'})
+            
+            destination_folder = os.path.dirname(adim['hedef'])
             if not os.path.exists(destination_folder):
-                os.makedirs(destination_folder)
+                os.makedirs(destination_folder, exist_ok=True)
+            
+            if adim['islem'] == 'tasi':
+                shutil.move(adim['kaynak'], adim['hedef'])
+                self.katalog.ekle(adim['hedef'], sha256=adim['sha256'])
             
-            destination_path = os.path.join(destination_folder, os.path.basename(source_file))
+            elif adim['islem'] == 'baglanti':
+                try:
+                    os.link(adim['mevcut'], adim['hedef'])
+                except OSError:
+                    # Hard link desteklenmiyorsa (farklı disk vb.) kopyala
+                    shutil.copy2(adim['mevcut'], adim['hedef'])
+                self.katalog.ekle(adim['hedef'], sha256=adim['sha256'])
+                os.remove(adim['kaynak'])
             
-            # Eğer hedef dosya zaten varsa, üzerine yazma
-            if os.path.exists(destination_path):
-                base_name = os.path.splitext(os.path.basename(source_file))[0]
-                extension = os.path.splitext(source_file)[1]
-                counter = 1
-                while os.path.exists(destination_path):
-                    new_name = f"{base_name}_v{counter}{extension}"
-                    destination_path = os.path.join(destination_folder, new_name)
-                    counter += 1
+            else:
+                # Aynı içerik zaten arşivde
+                os.remove(adim['kaynak'])
             
-            shutil.move(source_file, destination_path)
-            return destination_path
+            self.write_journal({**adim, 'durum': 'bitti'})
+            return True
+        
         except Exception as e:
-            print(f"❌ {source_file} taşınırken hata: {e}")
-            return None
+            print(f"❌ {adim['kaynak']} işlenirken hata: {e}")
+            return False
     
-    def organize_files(self):
-        """Dosyaları organize et"""
+    def organize_files(self, duplicate_policy='atla', max_workers=None):
+        """Dosyaları organize et (içerik hash'i ile tekrar eden dosyaları ayıkla)"""
         self.print_separator("DOSYA ORGANİZASYONU BAŞLATILIYOR")
         
         # Klasörleri oluştur
         self.setup_folders()
         
+        # Önceki çalışma yarıda kaldıysa tamamla
+        yarim = self.resume_journal()
+        if yarim:
+            print(f"♻️  Önceki çalışmadan {yarim} yarım adım tamamlandı")
+        
         # Excel dosyalarını bul
         excel_files = self.find_excel_files()
         
@@ -137,36 +260,68 @@ class DosyaDuzenleyici:
         for file in excel_files:
             print(f"   📄 {file}")
         
+        max_workers = max_workers or min(8, (os.cpu_count() or 1) * 2)
+        
+        # Katalog öncesinden kalan arşiv önce kataloğa girer; yoksa tekrarlar boş kataloğa karşı aranır
+        self.katalog.ilk_tarama()
+        
+        print(f"\n🔑 İçerik hash'leri hesaplanıyor ({max_workers} iş parçacığı)...")
+        with ThreadPoolExecutor(max_workers=max_workers) as havuz:
+            hashes = dict(zip(excel_files, havuz.map(self.katalog.dosya_hash, excel_files)))
+        
+        # Eski kataloglardaki bayt özetleri içerik özetine çevrilir (yoksa tekrarlar bulunamaz)
+        yenilenen = self.katalog.hashleri_tamamla()
+        if yenilenen:
+            print(f"🔑 Arşivdeki {yenilenen} dosyanın içerik hash'i güncellendi")
+        
+        plan = self.plan_files(excel_files, hashes, duplicate_policy)
+        
         print(f"\n🔄 Dosyalar organize ediliyor...")
         
-        # Dosyaları kategorize et ve taşı
+        # Bağlantılar, bağlanacakları dosya taşındıktan sonra oluşturulur
+        with ThreadPoolExecutor(max_workers=max_workers) as havuz:
+            ilk_asama = [a for a in plan if a['islem'] != 'baglanti']
+            sonuclar = dict(zip(map(id, ilk_asama), havuz.map(self.apply_step, ilk_asama)))
+            ikinci_asama = [a for a in plan if a['islem'] == 'baglanti']
+            sonuclar.update(zip(map(id, ikinci_asama), havuz.map(self.apply_step, ikinci_asama)))
+        
         moved_files = {}
-        for file in excel_files:
-            category = self.categorize_file(file)
-            destination_folder = self.get_destination_folder(category, file)
-            
-            print(f"\n📁 {file} → {category} kategorisi")
-            print(f"   📂 Hedef: {destination_folder}")
+        skipped_files = []
+        linked_files = []
+        for adim in plan:
+            print(f"\n📁 {adim['kaynak']} → {adim['kategori']} kategorisi")
             
-            destination_path = self.move_file(file, destination_folder)
+            if not sonuclar[id(adim)]:
+                print(f"   ❌ İşlenemedi!")
+                continue
             
-            if destination_path:
-                if category not in moved_files:
-                    moved_files[category] = []
-                moved_files[category].append(destination_path)
-                print(f"   ✅ Taşındı: {destination_path}")
+            if adim['islem'] == 'tasi':
+                moved_files.setdefault(adim['kategori'], []).append(adim['hedef'])
+                print(f"   ✅ Taşındı: {adim['hedef']}")
+            elif adim['islem'] == 'baglanti':
+                linked_files.append(adim['hedef'])
+                print(f"   🔗 Aynı içerik mevcut, bağlantı oluşturuldu: {adim['hedef']}")
             else:
-                print(f"   ❌ Taşınamadı!")
+                skipped_files.append(adim['kaynak'])
+                print(f"   ⏭️  Aynı içerik zaten arşivde: {adim['hedef']}")
+        
+        # Tüm adımlar tamamlandıysa günlüğe gerek kalmadı
+        if all(sonuclar.values()) and os.path.exists(self.gunluk_yolu):
+            os.remove(self.gunluk_yolu)
         
         # Özet rapor
-        self.print_summary(moved_files)
+        self.print_summary(moved_files, skipped_files, linked_files)
     
-    def print_summary(self, moved_files):
+    def print_summary(self, moved_files, skipped_files=(), linked_files=()):
         """Özet rapor göster"""
         self.print_separator("ORGANİZASYON TAMAMLANDI")
         
         total_moved = sum(len(files) for files in moved_files.values())
         print(f"🎉 Toplam {total_moved} dosya organize edildi!")
+        if skipped_files:
+            print(f"⏭️  {len(skipped_files)} tekrar eden dosya atlandı")
+        if linked_files:
+            print(f"🔗 {len(linked_files)} tekrar eden dosya için bağlantı oluşturuldu")
         
         print(f"\n📊 Kategori Bazında Dağılım:")
         for category, files in moved_files.items():
@@ -188,6 +343,9 @@ class DosyaDuzenleyici:
         
         today = datetime.now().strftime('%Y-%m-%d')
         
+        # Katalog öncesinden kalan arşiv bir kez taranır (yoksa mevcut dosyalar görünmez)
+        self.katalog.ilk_tarama()
+        
         print(f"📂 Ana Klasör: {base_folder}")
         print(f"📅 Tarih: {today}")
         print()
@@ -198,8 +356,9 @@ class DosyaDuzenleyici:
                 full_path = os.path.join(base_folder, folder_path, today)
                 print(f"📁 {folder_name.title()}: {full_path}")
                 
-                if os.path.exists(full_path):
-                    files = [f for f in os.listdir(full_path) if f.endswith('.xlsx')]
+                # Dosyaları klasörü taramadan katalogdan al
+                files = [os.path.basename(k['yol']) for k in self.katalog.sorgula(kategori=folder_name, tarih=today)]
+                if files:
                     print(f"      📄 {len(files)} Excel dosyası")
                     total_files += len(files)
                     
@@ -221,10 +380,11 @@ class DosyaDuzenleyici:
         print("1. 📁 Dosyaları Organize Et")
         print("2. 📊 Mevcut Klasör Yapısını Göster")
         print("3. 🚀 Otomatik Organizasyon")
+        print("4. 🗂️  Arşiv Kataloğunu Güncelle")
         
         while True:
             try:
-                choice = input("\n🎯 Hangi işlemi yapmak istiyorsunuz? (1-3, q=çıkış): ")
+                choice = input("\n🎯 Hangi işlemi yapmak istiyorsunuz? (1-4, q=çıkış): ")
                 
                 if choice.lower() == 'q':
                     print("👋 Program sonlandırılıyor...")
@@ -241,8 +401,12 @@ class DosyaDuzenleyici:
                     self.organize_files()
                     print("\n🎉 Otomatik organizasyon tamamlandı!")
                 
+                elif choice == '4':
+                    sonuc = self.katalog.tara()
+                    print(f"✅ Katalog güncellendi: {sonuc['toplam']} dosya ({sonuc['eklenen']} yeni/değişen, {sonuc['silinen']} silinen)")
+                
                 else:
-                    print("❌ Geçersiz seçim! 1-3 arası bir sayı girin.")
+                    print("❌ Geçersiz seçim! 1-4 arası bir sayı girin.")
                 
             except KeyboardInterrupt:
                 print("\n👋 Program sonlandırılıyor...")
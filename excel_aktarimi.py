@@ -0,0 +1,243 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Akış Modunda Hızlı Excel Aktarımı (xlsxwriter constant_memory / openpyxl write_only)
+Geliştiren: Çağatay Elaman
+"""
+
+import os
+import time
+import argparse
+import tempfile
+import numpy as np
+import pandas as pd
+from concurrent.futures import ProcessPoolExecutor
+from ohlcv_tipleri import ondalik_geri
+
+try:
+    import xlsxwriter
+except ImportError:
+    xlsxwriter = None
+
+# xlsxwriter kuruluysa o, değilse openpyxl write_only
+VARSAYILAN_MOTOR = 'xlsxwriter' if xlsxwriter is not None else 'openpyxl'
+
+TARIH_BICIMI = 'yyyy-mm-dd hh:mm:ss'
+EXCEL_SIFIR_NS = np.datetime64('1899-12-30', 'ns').astype(np.int64)
+GUN_NS = 24 * 3600 * 10**9
+
+def df_sayfasi(ad, df, index=True):
+    """DataFrame'i sayfa tanımına çevir (kopya yok; sütunlar numpy dizisi olarak alınır)"""
+    sutunlar, diziler = [], []
+    if index:
+        sutunlar.append(df.index.name or 'Date')
+        diziler.append(df.index)
+    for sutun in df.columns:
+        sutunlar.append(str(sutun))
+        diziler.append(df[sutun].to_numpy())
+    return {'ad': ad[:31], 'sutunlar': sutunlar, 'diziler': diziler}
+
+def sutun_sayfasi(ad, sutunlar):
+    """{sütun adı: dizi} sözlüğünden sayfa tanımı"""
+    return {'ad': ad[:31], 'sutunlar': list(sutunlar),
+            'diziler': [d if isinstance(d, pd.DatetimeIndex) else np.asarray(d) for d in sutunlar.values()]}
+
+def _tarih_mi(dizi):
+    return isinstance(dizi, pd.DatetimeIndex) or np.issubdtype(getattr(dizi, 'dtype', object), np.datetime64)
+
+def _duvar_saati_ns(dizi):
+    """Tarihleri saat dilimi bilgisini atarak (yerel saat) int64 ns'ye çevir"""
+    index = pd.DatetimeIndex(dizi)
+    if index.tz is not None:
+        index = index.tz_localize(None)
+    return index.as_unit('ns').asi8
+
+def _python_listesi(dizi):
+    """Hücrelere yazılacak liste: NaN -> boş hücre, tarih -> datetime"""
+    if _tarih_mi(dizi):
+        ns = _duvar_saati_ns(dizi)
+        return [None if n == np.iinfo(np.int64).min else d
+                for n, d in zip(ns.tolist(), pd.DatetimeIndex(ns).to_pydatetime())]
+    # float32 fiyatlar en kısa ondalık gösterimleriyle yazılır (64.16000366 -> 64.16)
+    dizi = ondalik_geri(dizi)
+    liste = dizi.tolist()
+    if dizi.dtype.kind == 'f' and np.isnan(dizi).any():
+        liste = [None if x != x else x for x in liste]
+    elif dizi.dtype.kind == 'O':
+        # Metin / nesne sütunlarındaki eksikler (NaN, None, pd.NA) de boş hücre olur
+        eksik = pd.isna(dizi)
+        if eksik.any():
+            liste = [None if e else x for x, e in zip(liste, eksik.tolist())]
+    return liste
+
+def _xlsxwriter_yaz(yol, sayfalar):
+    kitap = xlsxwriter.Workbook(yol, {'constant_memory': True})
+    tarih = kitap.add_format({'num_format': TARIH_BICIMI})
+    baslik = kitap.add_format({'bold': True})
+    try:
+        for sayfa in sayfalar:
+            ws = kitap.add_worksheet(sayfa['ad'])
+            ws.write_row(0, 0, sayfa['sutunlar'], baslik)
+
+            sutunlar = []
+            tarih_sutunlari = set()
+            for j, dizi in enumerate(sayfa['diziler']):
+                if _tarih_mi(dizi):
+                    # Excel seri tarihine vektörel dönüşüm (1899-12-30 tabanlı gün)
+                    ns = _duvar_saati_ns(dizi)
+                    seri = (ns - EXCEL_SIFIR_NS) / GUN_NS
+                    sutunlar.append([None if n == np.iinfo(np.int64).min else s
+                                     for n, s in zip(ns.tolist(), seri.tolist())])
+                    tarih_sutunlari.add(j)
+                    ws.set_column(j, j, 19)
+                else:
+                    sutunlar.append(_python_listesi(dizi))
+
+            # constant_memory: satırlar sırayla yazılıp diske akıtılır
+            for i, satir in enumerate(zip(*sutunlar), start=1):
+                for j, deger in enumerate(satir):
+                    if deger is None:
+                        continue
+                    if j in tarih_sutunlari:
+                        ws.write_number(i, j, deger, tarih)
+                    else:
+                        ws.write(i, j, deger)
+    finally:
+        kitap.close()
+
+def _openpyxl_yaz(yol, sayfalar):
+    from openpyxl import Workbook
+    from openpyxl.cell import WriteOnlyCell
+    from openpyxl.styles import Font
+
+    kitap = Workbook(write_only=True)
+    for sayfa in sayfalar:
+        ws = kitap.create_sheet(sayfa['ad'])
+        kalin = Font(bold=True)
+        basliklar = []
+        for ad in sayfa['sutunlar']:
+            hucre = WriteOnlyCell(ws, value=ad)
+            hucre.font = kalin
+            basliklar.append(hucre)
+        ws.append(basliklar)
+
+        sutunlar = [_python_listesi(dizi) for dizi in sayfa['diziler']]
+        tarih_sutunlari = [j for j, dizi in enumerate(sayfa['diziler']) if _tarih_mi(dizi)]
+        if not tarih_sutunlari:
+            for satir in zip(*sutunlar):
+                ws.append(satir)
+            continue
+
+        for satir in zip(*sutunlar):
+            satir = list(satir)
+            for j in tarih_sutunlari:
+                if satir[j] is not None:
+                    hucre = WriteOnlyCell(ws, value=satir[j])
+                    hucre.number_format = TARIH_BICIMI
+                    satir[j] = hucre
+            ws.append(satir)
+
+    kitap.save(yol)
+
+def excel_yaz(yol, sayfalar, motor=None):
+    """Sayfa tanımlarını akış modunda tek bir .xlsx dosyasına yaz"""
+    motor = motor or VARSAYILAN_MOTOR
+    klasor = os.path.dirname(yol)
+    if klasor and not os.path.exists(klasor):
+        os.makedirs(klasor, exist_ok=True)
+
+    if motor == 'xlsxwriter' and xlsxwriter is None:
+        raise ValueError("xlsxwriter kurulu değil (pip install XlsxWriter)")
+    if motor not in ('xlsxwriter', 'openpyxl'):
+        raise ValueError(f"Geçersiz motor: {motor} (xlsxwriter/openpyxl)")
+
+    # Yarım dosya kalmaması için geçici dosyaya yaz, sonra yer değiştir; aynı adla
+    # eşzamanlı aktarımlar (arka plan kuyruğu) çakışmasın diye geçici ad benzersiz
+    tanitici, gecici = tempfile.mkstemp(dir=klasor or '.', prefix=os.path.basename(yol) + '.', suffix='.tmp')
+    os.close(tanitici)
+    try:
+        if motor == 'xlsxwriter':
+            _xlsxwriter_yaz(gecici, sayfalar)
+        else:
+            _openpyxl_yaz(gecici, sayfalar)
+        os.replace(gecici, yol)
+    except BaseException:
+        if os.path.exists(gecici):
+            os.remove(gecici)
+        raise
+    return yol
+
+def _is_yaz(is_):
+    yol, sayfalar, motor = is_
+    return excel_yaz(yol, sayfalar, motor)
+
+def paralel_excel_yaz(isler, max_workers=None, motor=None):
+    """Birden fazla (yol, sayfalar) işini süreç havuzunda paralel yaz"""
+    isler = [(yol, sayfalar, motor) for yol, sayfalar in isler]
+    if len(isler) <= 1 or max_workers == 1:
+        return [_is_yaz(is_) for is_ in isler]
+    max_workers = max_workers or min(len(isler), os.cpu_count() or 1)
+    with ProcessPoolExecutor(max_workers=max_workers) as havuz:
+        return list(havuz.map(_is_yaz, isler))
+
+# Teknik_Gostergeler sayfasındaki sütun adı -> gösterge serisi
+TEKNIK_SUTUNLARI = {
+    'MA20': 'ma20', 'MA50': 'ma50', 'RSI': 'rsi',
+    'Bollinger_Ust': 'upper_band', 'Bollinger_Alt': 'lower_band',
+    'EMA12': 'ema12', 'EMA26': 'ema26', 'MACD': 'macd', 'MACD_Sinyal': 'macd_signal',
+    'ATR': 'atr', 'Stokastik_K': 'stoch_k', 'Stokastik_D': 'stoch_d',
+    'OBV': 'obv', 'VWAP': 'vwap', 'ADX': 'adx', 'RSI_Wilder': 'rsi_wilder', 'Parabolic_SAR': 'sar'
+}
+
+def teknik_rapor_sayfalari(hist, g):
+    """Teknik analiz raporu: Ana_Veri + Teknik_Gostergeler (g: gösterge serileri)"""
+    teknik = {'Tarih': hist.index, 'Kapanis': hist['Close'].to_numpy()}
+    teknik.update({sutun: g[seri] for sutun, seri in TEKNIK_SUTUNLARI.items() if seri in g})
+    return [df_sayfasi('Ana_Veri', hist), sutun_sayfasi('Teknik_Gostergeler', teknik)]
+
+def main():
+    parser = argparse.ArgumentParser(description="Semboller için teknik analiz raporlarını paralel Excel'e aktar")
+    parser.add_argument('semboller', nargs='+', help="örn: THYAO GARAN AKBNK")
+    parser.add_argument('--periyot', default='10y', help="Veri aralığı (örn: 1y, 10y)")
+    parser.add_argument('--aralik', default='1d', help="Bar aralığı")
+    parser.add_argument('--klasor', default=os.path.join('Finansal_Veriler', 'Teknik_Analiz', 'Toplu'))
+    parser.add_argument('--tek-dosya', action='store_true', help="Tüm semboller tek dosyada, sembol başına bir sayfa")
+    parser.add_argument('--motor', choices=['xlsxwriter', 'openpyxl'], help="Varsayılan: kuruluysa xlsxwriter")
+    parser.add_argument('--is-parcacigi', type=int, default=None, help="Paralel süreç sayısı")
+    args = parser.parse_args()
+
+    import gostergeler
+    from veri_katmani import VeriKatmani
+
+    veri = VeriKatmani()
+    damga = time.strftime('%Y%m%d_%H%M')
+    tumu = tuple(gostergeler.GOSTERGE_CIKTILARI)
+
+    bas = time.perf_counter()
+    raporlar = {}
+    for sembol in args.semboller:
+        symbol = sembol if sembol.endswith('.IS') else f"{sembol.upper()}.IS"
+        hist = veri.gecmis_getir(symbol, args.periyot, args.aralik)
+        if hist is None or len(hist) == 0:
+            print(f"❌ {symbol} için veri bulunamadı")
+            continue
+        raporlar[symbol.replace('.IS', '')] = (hist, gostergeler.gosterge_tablosu(hist, tumu))
+    print(f"📊 {len(raporlar)} sembol hazırlandı ({time.perf_counter() - bas:.2f} sn)")
+
+    bas = time.perf_counter()
+    if args.tek_dosya:
+        sayfalar = [df_sayfasi(ad, hist.join(g)) for ad, (hist, g) in raporlar.items()]
+        yollar = [excel_yaz(os.path.join(args.klasor, f"teknik_analiz_toplu_{damga}.xlsx"), sayfalar, args.motor)]
+    else:
+        isler = [(os.path.join(args.klasor, f"{ad}_teknik_analiz_{damga}.xlsx"), teknik_rapor_sayfalari(hist, g))
+                 for ad, (hist, g) in raporlar.items()]
+        yollar = paralel_excel_yaz(isler, args.is_parcacigi, args.motor)
+
+    satir = sum(len(hist) for hist, _ in raporlar.values())
+    print(f"💾 {len(yollar)} dosya, {satir:,} satır yazıldı ({time.perf_counter() - bas:.2f} sn, "
+          f"motor: {args.motor or VARSAYILAN_MOTOR})")
+    for yol in yollar:
+        print(f"   📄 {yol}")
+
+if __name__ == "__main__":
+    main()
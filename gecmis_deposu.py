@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Sembol Başına Sıkıştırılmış Fiyat Geçmişi Deposu (Parquet)
+Geliştiren: Çağatay Elaman
+"""
+
+import os
+import tempfile
+import pandas as pd
+from ohlcv_tipleri import OHLCV_SUTUNLARI
+
+class GecmisDeposu:
+    def __init__(self, kok=os.path.join('Finansal_Veriler', 'Gecmis'), sikistirma='zstd'):
+        self.kok = kok
+        self.sikistirma = sikistirma
+
+        # Saklanan sütunlar (yfinance history ile aynı isimler); temettü/bölünme diskte kalır
+        self.ek_sutunlar = ('Dividends', 'Stock Splits')
+        self.sutunlar = list(OHLCV_SUTUNLARI + self.ek_sutunlar)
+
+    def sembol_adi(self, symbol):
+        """Dosya adı için sembolü sadeleştir (THYAO.IS -> THYAO)"""
+        return symbol.replace('.IS', '').upper()
+
+    def dosya_yolu(self, symbol, interval='1d'):
+        return os.path.join(self.kok, interval, f"{self.sembol_adi(symbol)}.parquet")
+
+    def var_mi(self, symbol, interval='1d'):
+        return os.path.exists(self.dosya_yolu(symbol, interval))
+
+    def semboller(self, interval='1d'):
+        """Depodaki sembolleri listele"""
+        klasor = os.path.join(self.kok, interval)
+        if not os.path.exists(klasor):
+            return []
+        return sorted(f[:-len('.parquet')] for f in os.listdir(klasor) if f.endswith('.parquet'))
+
+    def normalize(self, df):
+        """Index'i timezone-naive DatetimeIndex yap, sırala ve tekrarları at (son gelen kazanır).
+
+        Diskte tam hassasiyet (float64) kalır; bellek politikası (ohlcv_tipleri.kompakt)
+        okuyan tarafta uygulanır.
+        """
+        df = df[[c for c in self.sutunlar if c in df.columns]]
+        index = pd.DatetimeIndex(df.index)
+        if index.tz is not None:
+            index = index.tz_localize(None)
+        df = df.set_axis(index.as_unit('ns').rename('Date'), axis=0)
+        df = df[~df.index.duplicated(keep='last')]
+        return df.sort_index()
+
+    def oku(self, symbol, interval='1d', columns=None):
+        """Sembolün geçmişini oku, yoksa None döner"""
+        yol = self.dosya_yolu(symbol, interval)
+        if not os.path.exists(yol):
+            return None
+        return pd.read_parquet(yol, columns=columns)
+
+    def _kaydet(self, symbol, df, interval):
+        """Atomik yazma: önce geçici dosya, sonra yer değiştir"""
+        yol = self.dosya_yolu(symbol, interval)
+        klasor = os.path.dirname(yol)
+        if not os.path.exists(klasor):
+            os.makedirs(klasor, exist_ok=True)
+
+        # Aynı sembol için eşzamanlı yazımlar çakışmasın diye geçici dosya adı benzersiz
+        tanitici, gecici = tempfile.mkstemp(dir=klasor, prefix=os.path.basename(yol) + '.', suffix='.tmp')
+        os.close(tanitici)
+        try:
+            df.to_parquet(gecici, compression=self.sikistirma)
+            os.replace(gecici, yol)
+        except BaseException:
+            if os.path.exists(gecici):
+                os.remove(gecici)
+            raise
+        return yol
+
+    def yaz(self, symbol, df, interval='1d'):
+        """Geçmişin tamamını yaz"""
+        return self._kaydet(symbol, self.normalize(df), interval)
+
+    def birlestir(self, symbol, df, interval='1d'):
+        """Yeni barları mevcut geçmişle birleştir (aynı zaman damgasında yeni veri kazanır)"""
+        mevcut = self.oku(symbol, interval)
+        if mevcut is not None and len(mevcut) > 0:
+            df = pd.concat([mevcut, self.normalize(df)])
+        birlesik = self.normalize(df)
+        self._kaydet(symbol, birlesik, interval)
+        return birlesik
@@ -14,10 +14,18 @@ import time
 import yfinance as yf
 import warnings
 import os
+from concurrent.futures import Future
+from hisse_bilgi_onbellegi import HisseBilgiOnbellegi
+from arsiv_katalogu import ArsivKatalogu
+from veri_katmani import VeriKatmani
+import gostergeler
+import excel_aktarimi
+from aktarim_kuyrugu import AktarimKuyrugu
+from ohlcv_tipleri import kompakt
 warnings.filterwarnings('ignore')
 
 class GelismisVeriCekici:
-    def __init__(self):
+    def __init__(self, arka_planda_yaz=True):
         self.session = requests.Session()
         self.session.headers.update({
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
@@ -44,6 +52,38 @@ class GelismisVeriCekici:
         
         # Klasör yapısını oluştur
         self.setup_folders()
+        
+        # ticker.info önbelleği
+        self.bilgi_onbellegi = HisseBilgiOnbellegi()
+        
+        # Arşiv kataloğu (yazılan her dosya indekslenir)
+        self.katalog = ArsivKatalogu(kok=self.folders['base'])
+        
+        # Yerel depo destekli veri katmanı
+        self.veri = VeriKatmani()
+        
+        # Excel dosyaları arka planda yazılır; yazılanlar toplu halde kataloğa eklenir
+        self.aktarim = AktarimKuyrugu(toplu_sonra=self.katalog.ekle_toplu) if arka_planda_yaz else None
+    
+    def disa_aktar(self, file_path, sayfalar):
+        """Excel dosyasını kuyruğa ver (arka plan kapalıysa hemen yaz); yazım Future'ını döndür"""
+        if self.aktarim is not None:
+            return self.aktarim.gonder(file_path, sayfalar)
+        
+        gelecek = Future()
+        try:
+            excel_aktarimi.excel_yaz(file_path, sayfalar)
+            self.katalog.ekle(file_path)
+            gelecek.set_result(file_path)
+        except Exception as e:
+            gelecek.set_exception(e)
+            raise
+        return gelecek
+    
+    def aktarimlari_bekle(self, timeout=None):
+        """Kuyruktaki tüm dışa aktarımların diske yazılmasını bekle"""
+        if self.aktarim is not None:
+            self.aktarim.bosalt(timeout)
     
     def setup_folders(self):
         """Klasör yapısını oluştur"""
@@ -117,7 +157,7 @@ class GelismisVeriCekici:
             
             # Hisse senedi bilgilerini al
             ticker = yf.Ticker(symbol)
-            info = ticker.info
+            info = self.bilgi_onbellegi.get_info(symbol)
             
             print(f"🏢 Şirket: {info.get('longName', 'Bilinmiyor')}")
             print(f"💱 Sembol: {symbol}")
@@ -150,12 +190,9 @@ class GelismisVeriCekici:
                 filename = f"{symbol.replace('.IS', '')}_detayli_veri_{datetime.now().strftime('%Y%m%d_%H%M')}.xlsx"
                 file_path = self.get_file_path('detayli', filename)
                 
-                # Timezone-aware index'i timezone-naive yap
-                hist_clean = hist.copy()
-                hist_clean.index = hist_clean.index.tz_localize(None)
-                
-                hist_clean.to_excel(file_path)
-                print(f"\n💾 Veriler kaydedildi: {file_path}")
+                # Akış modunda yaz (saat dilimi hücrelere yazılırken atılır, kopya yok)
+                self.disa_aktar(file_path, [excel_aktarimi.df_sayfasi('Sheet1', hist)])
+                print(f"\n💾 Veriler kaydediliyor: {file_path}")
                 
                 return hist
             else:
@@ -202,8 +239,9 @@ class GelismisVeriCekici:
             ticker1 = yf.Ticker(symbol1)
             ticker2 = yf.Ticker(symbol2)
             
-            hist1 = ticker1.history(period=period)
-            hist2 = ticker2.history(period=period)
+            # Karşılaştırma yalnızca OHLCV kullanır (float32 fiyat, int64 hacim)
+            hist1 = kompakt(ticker1.history(period=period))
+            hist2 = kompakt(ticker2.history(period=period))
             
             if len(hist1) > 0 and len(hist2) > 0:
                 print(f"\n✅ Her iki hisse için veri alındı!")
@@ -232,28 +270,22 @@ class GelismisVeriCekici:
                 filename = f"karsilastirma_{symbol1.replace('.IS', '')}_{symbol2.replace('.IS', '')}_{datetime.now().strftime('%Y%m%d_%H%M')}.xlsx"
                 file_path = self.get_file_path('karsilastirma', filename)
                 
-                with pd.ExcelWriter(file_path, engine='openpyxl') as writer:
-                    # Timezone sorunu çözüldü
-                    hist1_clean = hist1.copy()
-                    hist1_clean.index = hist1_clean.index.tz_localize(None)
-                    hist2_clean = hist2.copy()
-                    hist2_clean.index = hist2_clean.index.tz_localize(None)
-                    
-                    hist1_clean.to_excel(writer, sheet_name=f"{symbol1.replace('.IS', '')}")
-                    hist2_clean.to_excel(writer, sheet_name=f"{symbol2.replace('.IS', '')}")
-                    
-                    # Karşılaştırma özeti
-                    karsilastirma_df = pd.DataFrame({
-                        'Hisse': [symbol1, symbol2],
-                        'Son_Fiyat': [son_fiyat1, son_fiyat2],
-                        'Degisim_Yuzde': [degisim1, degisim2],
-                        'Ortalama_Fiyat': [hist1['Close'].mean(), hist2['Close'].mean()],
-                        'En_Yuksek': [hist1['High'].max(), hist2['High'].max()],
-                        'En_Dusuk': [hist1['Low'].min(), hist2['Low'].min()]
-                    })
-                    karsilastirma_df.to_excel(writer, sheet_name='Karsilastirma_Ozeti', index=False)
-                
-                print(f"\n💾 Karşılaştırma kaydedildi: {file_path}")
+                # Karşılaştırma özeti
+                karsilastirma_df = pd.DataFrame({
+                    'Hisse': [symbol1, symbol2],
+                    'Son_Fiyat': [son_fiyat1, son_fiyat2],
+                    'Degisim_Yuzde': [degisim1, degisim2],
+                    'Ortalama_Fiyat': [hist1['Close'].mean(), hist2['Close'].mean()],
+                    'En_Yuksek': [hist1['High'].max(), hist2['High'].max()],
+                    'En_Dusuk': [hist1['Low'].min(), hist2['Low'].min()]
+                })
+                
+                self.disa_aktar(file_path, [
+                    excel_aktarimi.df_sayfasi(symbol1.replace('.IS', ''), hist1),
+                    excel_aktarimi.df_sayfasi(symbol2.replace('.IS', ''), hist2),
+                    excel_aktarimi.df_sayfasi('Karsilastirma_Ozeti', karsilastirma_df, index=False)
+                ])
+                print(f"\n💾 Karşılaştırma kaydediliyor: {file_path}")
                 
                 return {'hist1': hist1, 'hist2': hist2, 'karsilastirma': karsilastirma_df}
             else:
@@ -264,36 +296,23 @@ class GelismisVeriCekici:
             print(f"❌ Hata: {e}")
             return None
     
-    def method4_teknik_analiz(self, symbol="THYAO.IS", period="3mo"):
+    def method4_teknik_analiz(self, symbol="THYAO.IS", period="3mo", interval="1d"):
         """Teknik analiz verileri"""
         self.print_separator("TEKNİK ANALİZ")
         
         try:
             print(f"📊 {symbol} için teknik analiz yapılıyor...")
-            print(f"📅 Veri aralığı: {period}")
+            print(f"📅 Veri aralığı: {period} ({interval} barlar)")
             
-            ticker = yf.Ticker(symbol)
-            hist = ticker.history(period=period)
+            hist = self.veri.gecmis_getir(symbol, period, interval)
             
-            if len(hist) > 0:
-                # Basit teknik göstergeler
+            if hist is not None and len(hist) > 0:
                 close_prices = hist['Close']
                 
-                # Hareketli ortalamalar
-                ma20 = close_prices.rolling(window=20).mean()
-                ma50 = close_prices.rolling(window=50).mean()
-                
-                # RSI hesaplama (basit)
-                delta = close_prices.diff()
-                gain = (delta.where(delta > 0, 0)).rolling(window=14).mean()
-                loss = (-delta.where(delta < 0, 0)).rolling(window=14).mean()
-                rs = gain / loss
-                rsi = 100 - (100 / (1 + rs))
-                
-                # Bollinger Bands
-                ma20_std = close_prices.rolling(window=20).std()
-                upper_band = ma20 + (ma20_std * 2)
-                lower_band = ma20 - (ma20_std * 2)
+                # Tüm göstergeler tek geçişte (ortak ara sonuçlar bir kez hesaplanır)
+                g = gostergeler.gosterge_tablosu(hist, tuple(gostergeler.GOSTERGE_CIKTILARI))
+                ma20, ma50, rsi = g['ma20'], g['ma50'], g['rsi']
+                upper_band, lower_band = g['upper_band'], g['lower_band']
                 
                 print(f"\n📊 Teknik Analiz Sonuçları:")
                 print(f"   Son Fiyat: {close_prices.iloc[-1]:.2f} TL")
@@ -302,6 +321,13 @@ class GelismisVeriCekici:
                 print(f"   RSI: {rsi.iloc[-1]:.2f}")
                 print(f"   Bollinger Üst: {upper_band.iloc[-1]:.2f} TL")
                 print(f"   Bollinger Alt: {lower_band.iloc[-1]:.2f} TL")
+                print(f"   MACD: {g['macd'].iloc[-1]:.2f} (Sinyal: {g['macd_signal'].iloc[-1]:.2f})")
+                print(f"   ATR: {g['atr'].iloc[-1]:.2f} TL")
+                print(f"   Stokastik %K/%D: {g['stoch_k'].iloc[-1]:.2f} / {g['stoch_d'].iloc[-1]:.2f}")
+                print(f"   ADX: {g['adx'].iloc[-1]:.2f}")
+                print(f"   Wilder RSI: {g['rsi_wilder'].iloc[-1]:.2f}")
+                print(f"   Parabolic SAR: {g['sar'].iloc[-1]:.2f} TL")
+                print(f"   VWAP: {g['vwap'].iloc[-1]:.2f} TL")
                 
                 # Sinyal analizi
                 current_price = close_prices.iloc[-1]
@@ -331,25 +357,9 @@ class GelismisVeriCekici:
                 filename = f"{symbol.replace('.IS', '')}_teknik_analiz_{datetime.now().strftime('%Y%m%d_%H%M')}.xlsx"
                 file_path = self.get_file_path('teknik', filename)
                 
-                with pd.ExcelWriter(file_path, engine='openpyxl') as writer:
-                    # Ana veri (timezone sorunu çözüldü)
-                    hist_clean = hist.copy()
-                    hist_clean.index = hist_clean.index.tz_localize(None)
-                    hist_clean.to_excel(writer, sheet_name='Ana_Veri')
-                    
-                    # Teknik göstergeler
-                    teknik_df = pd.DataFrame({
-                        'Tarih': hist_clean.index,
-                        'Kapanis': close_prices,
-                        'MA20': ma20,
-                        'MA50': ma50,
-                        'RSI': rsi,
-                        'Bollinger_Ust': upper_band,
-                        'Bollinger_Alt': lower_band
-                    })
-                    teknik_df.to_excel(writer, sheet_name='Teknik_Gostergeler', index=False)
-                
-                print(f"\n💾 Teknik analiz kaydedildi: {file_path}")
+                # Ana_Veri + Teknik_Gostergeler sayfaları akış modunda
+                self.disa_aktar(file_path, excel_aktarimi.teknik_rapor_sayfalari(hist, g))
+                print(f"\n💾 Teknik analiz kaydediliyor: {file_path}")
                 
                 return hist
             else:
@@ -367,6 +377,11 @@ class GelismisVeriCekici:
         base_folder = self.folders['base']
         today = datetime.now().strftime('%Y-%m-%d')
         
+        # Sayımlar kuyrukta bekleyen dosyaları da içersin
+        self.aktarimlari_bekle()
+        # Katalog öncesinden kalan arşiv bir kez taranır (yoksa mevcut dosyalar görünmez)
+        self.katalog.ilk_tarama()
+        
         print(f"📂 Ana Klasör: {base_folder}")
         print(f"📅 Tarih: {today}")
         print()
@@ -377,27 +392,16 @@ class GelismisVeriCekici:
                 full_path = os.path.join(base_folder, folder_path, today)
                 print(f"   📂 {folder_name.title()}: {full_path}")
                 
-                # Klasördeki dosya sayısını göster
-                if os.path.exists(full_path):
-                    files = [f for f in os.listdir(full_path) if f.endswith('.xlsx')]
-                    print(f"      📄 {len(files)} Excel dosyası")
+                # Klasördeki dosya sayısını göster (katalogdan)
+                print(f"      📄 {self.katalog.say(kategori=folder_name, tarih=today)} Excel dosyası")
         
         print(f"\n💡 Toplam Excel dosyası sayısı: {self.count_total_excel_files()}")
     
     def count_total_excel_files(self):
-        """Toplam Excel dosyası sayısını hesapla"""
-        total = 0
-        base_folder = self.folders['base']
+        """Bugünkü toplam Excel dosyası sayısını katalogdan al"""
+        self.katalog.ilk_tarama()
         today = datetime.now().strftime('%Y-%m-%d')
-        
-        for folder_name, folder_path in self.folders.items():
-            if folder_name != 'base':
-                full_path = os.path.join(base_folder, folder_path, today)
-                if os.path.exists(full_path):
-                    files = [f for f in os.listdir(full_path) if f.endswith('.xlsx')]
-                    total += len(files)
-        
-        return total
+        return self.katalog.say(tarih=today)
     
     def run_menu(self):
         """Ana menü"""
@@ -436,7 +440,8 @@ class GelismisVeriCekici:
                 elif choice == '4':
                     symbol = input("📈 Hisse senedi sembolü (örn: THYAO.IS): ") or "THYAO.IS"
                     period = input("📅 Veri aralığı (1d, 5d, 1mo, 3mo, 6mo, 1y, 2y, 5y, 10y, ytd, max): ") or "3mo"
-                    self.method4_teknik_analiz(symbol, period)
+                    interval = input("⏱️  Bar aralığı (1m, 5m, 15m, 1h, 1d): ") or "1d"
+                    self.method4_teknik_analiz(symbol, period, interval)
                 
                 elif choice == '5':
                     print("\n🚀 TÜM YÖNTEMLER OTOMATİK ÇALIŞTIRILIYOR!")
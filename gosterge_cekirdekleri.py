@@ -0,0 +1,259 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Özyinelemeli Göstergeler İçin Derlenmiş Çekirdekler (Numba, yoksa NumPy)
+Geliştiren: Çağatay Elaman
+"""
+
+import time
+import argparse
+import numpy as np
+import pandas as pd
+
+try:
+    import numba
+    NUMBA_VAR = True
+except ImportError:
+    numba = None
+    NUMBA_VAR = False
+
+# Varsayılan motor: Numba kuruluysa derlenmiş döngüler, değilse NumPy/pandas
+VARSAYILAN_MOTOR = 'numba' if NUMBA_VAR else 'numpy'
+
+def _derle(fonksiyon):
+    """Numba varsa fonksiyonu derle, yoksa olduğu gibi bırak"""
+    if NUMBA_VAR:
+        return numba.njit(cache=True, nogil=True)(fonksiyon)
+    return fonksiyon
+
+# --- Döngü çekirdekleri: [sembol, zaman] biçiminde bitişik float64 diziler ---
+
+@_derle
+def _ema_dongu(x, alpha, min_periyot, y):
+    sembol_sayisi, n = x.shape
+    for s in range(sembol_sayisi):
+        onceki = np.nan
+        sayi = 0
+        for t in range(n):
+            deger = x[s, t]
+            if deger == deger:
+                sayi += 1
+                if onceki == onceki:
+                    onceki = onceki + alpha * (deger - onceki)
+                else:
+                    onceki = deger
+            y[s, t] = onceki if sayi >= min_periyot else np.nan
+
+@_derle
+def _sar_dongu(yuksek, dusuk, adim, azami, y):
+    sembol_sayisi, n = yuksek.shape
+    for s in range(sembol_sayisi):
+        basladi = False
+        yukselis = True
+        sar = uc = hizlanma = np.nan
+        onceki_yuksek = onceki_dusuk = iki_onceki_yuksek = iki_onceki_dusuk = np.nan
+        for t in range(n):
+            h = yuksek[s, t]
+            l = dusuk[s, t]
+            if not (h == h and l == l):
+                y[s, t] = np.nan
+                continue
+            if not basladi:
+                # İlk geçerli bar: yükseliş trendiyle başla
+                basladi = True
+                sar, uc, hizlanma = l, h, adim
+                onceki_yuksek = iki_onceki_yuksek = h
+                onceki_dusuk = iki_onceki_dusuk = l
+                y[s, t] = np.nan
+                continue
+            yeni = sar + hizlanma * (uc - sar)
+            if yukselis:
+                yeni = min(yeni, onceki_dusuk, iki_onceki_dusuk)
+                if l < yeni:
+                    yukselis = False
+                    yeni = uc
+                    uc = l
+                    hizlanma = adim
+                elif h > uc:
+                    uc = h
+                    hizlanma = min(hizlanma + adim, azami)
+            else:
+                yeni = max(yeni, onceki_yuksek, iki_onceki_yuksek)
+                if h > yeni:
+                    yukselis = True
+                    yeni = uc
+                    uc = h
+                    hizlanma = adim
+                elif l < uc:
+                    uc = l
+                    hizlanma = min(hizlanma + adim, azami)
+            y[s, t] = yeni
+            sar = yeni
+            iki_onceki_yuksek, iki_onceki_dusuk = onceki_yuksek, onceki_dusuk
+            onceki_yuksek, onceki_dusuk = h, l
+
+# --- NumPy yolları (Numba yoksa) ---
+
+def _ema_numpy(x, alpha, min_periyot):
+    """pandas ewm (C ile yazılmış) sütun başına bir sembol.
+
+    ignore_na=True: aradaki NaN barlar ağırlıkları bozmaz, döngü çekirdeğiyle aynı özyineleme.
+    """
+    return pd.DataFrame(x.T).ewm(alpha=alpha, adjust=False, ignore_na=True,
+                                 min_periods=min_periyot).mean().to_numpy().T
+
+def _sar_numpy(yuksek, dusuk, adim, azami):
+    """Zaman üzerinde döngü, her adımda tüm semboller vektörel"""
+    sembol_sayisi, n = yuksek.shape
+    y = np.full((sembol_sayisi, n), np.nan)
+
+    basladi = np.zeros(sembol_sayisi, dtype=bool)
+    yukselis = np.ones(sembol_sayisi, dtype=bool)
+    sar = np.full(sembol_sayisi, np.nan)
+    uc = np.full(sembol_sayisi, np.nan)
+    hizlanma = np.full(sembol_sayisi, adim)
+    onceki_yuksek, onceki_dusuk = sar.copy(), sar.copy()
+    iki_onceki_yuksek, iki_onceki_dusuk = sar.copy(), sar.copy()
+
+    for t in range(n):
+        h, l = yuksek[:, t], dusuk[:, t]
+        gecerli = ~(np.isnan(h) | np.isnan(l))
+
+        # İlk geçerli bar: yükseliş trendiyle başla, çıktı üretme
+        ilk = gecerli & ~basladi
+        if ilk.any():
+            sar, uc = np.where(ilk, l, sar), np.where(ilk, h, uc)
+            onceki_yuksek, iki_onceki_yuksek = np.where(ilk, h, onceki_yuksek), np.where(ilk, h, iki_onceki_yuksek)
+            onceki_dusuk, iki_onceki_dusuk = np.where(ilk, l, onceki_dusuk), np.where(ilk, l, iki_onceki_dusuk)
+            basladi |= ilk
+            gecerli &= ~ilk
+
+        yeni = sar + hizlanma * (uc - sar)
+        yeni = np.where(yukselis, np.minimum(yeni, np.minimum(onceki_dusuk, iki_onceki_dusuk)),
+                        np.maximum(yeni, np.maximum(onceki_yuksek, iki_onceki_yuksek)))
+
+        donus = np.where(yukselis, l < yeni, h > yeni) & gecerli
+        yeni_uc = np.where(yukselis, h > uc, l < uc) & gecerli & ~donus
+
+        yeni = np.where(donus, uc, yeni)
+        uc = np.where(donus, np.where(yukselis, l, h), np.where(yeni_uc, np.where(yukselis, h, l), uc))
+        hizlanma = np.where(donus, adim, np.where(yeni_uc, np.minimum(hizlanma + adim, azami), hizlanma))
+        yukselis = np.where(donus, ~yukselis, yukselis)
+
+        y[:, t] = np.where(gecerli, yeni, np.nan)
+        sar = np.where(gecerli, yeni, sar)
+        iki_onceki_yuksek = np.where(gecerli, onceki_yuksek, iki_onceki_yuksek)
+        iki_onceki_dusuk = np.where(gecerli, onceki_dusuk, iki_onceki_dusuk)
+        onceki_yuksek = np.where(gecerli, h, onceki_yuksek)
+        onceki_dusuk = np.where(gecerli, l, onceki_dusuk)
+    return y
+
+# --- Ortak arayüz: 1-D (tek sembol) veya 2-D [sembol, zaman] diziler ---
+
+def _hazirla(*diziler):
+    """Dizileri bitişik 2-D float64 yap; tek sembolse sonucu geri düzleştirmek için bayrak döndür"""
+    tek = np.ndim(diziler[0]) == 1
+    return [np.ascontiguousarray(np.atleast_2d(d), dtype=np.float64) for d in diziler], tek
+
+def _motor(motor):
+    motor = motor or VARSAYILAN_MOTOR
+    if motor == 'numba' and not NUMBA_VAR:
+        raise ValueError("Numba kurulu değil (pip install numba)")
+    if motor not in ('numba', 'numpy'):
+        raise ValueError(f"Geçersiz motor: {motor} (numba/numpy)")
+    return motor
+
+def ema(x, alpha, min_periyot=1, motor=None):
+    """Üssel ortalama: y[t] = y[t-1] + alpha * (x[t] - y[t-1]); NaN barlar önceki değeri taşır"""
+    (x,), tek = _hazirla(x)
+    if _motor(motor) == 'numba':
+        y = np.empty_like(x)
+        _ema_dongu(x, alpha, min_periyot, y)
+    else:
+        y = _ema_numpy(x, alpha, min_periyot)
+    return y[0] if tek else y
+
+def wilder(x, pencere, motor=None):
+    """Wilder yumuşatması (alpha = 1 / pencere)"""
+    return ema(x, 1 / pencere, pencere, motor)
+
+def wilder_rsi(kapanis, pencere=14, motor=None):
+    """Wilder yumuşatmalı RSI"""
+    (kapanis,), tek = _hazirla(kapanis)
+    fark = np.full_like(kapanis, np.nan)
+    fark[:, 1:] = np.diff(kapanis, axis=1)
+    kazanc = np.where(fark > 0, fark, np.where(np.isnan(fark), np.nan, 0.0))
+    kayip = np.where(fark < 0, -fark, np.where(np.isnan(fark), np.nan, 0.0))
+    with np.errstate(divide='ignore', invalid='ignore'):
+        rsi = 100 - 100 / (1 + wilder(kazanc, pencere, motor) / wilder(kayip, pencere, motor))
+    return rsi[0] if tek else rsi
+
+def atr(yuksek, dusuk, kapanis, pencere=14, motor=None):
+    """Ortalama gerçek aralık (Wilder)"""
+    (yuksek, dusuk, kapanis), tek = _hazirla(yuksek, dusuk, kapanis)
+    onceki = np.full_like(kapanis, np.nan)
+    onceki[:, 1:] = kapanis[:, :-1]
+    tr = np.fmax(yuksek - dusuk, np.fmax(np.abs(yuksek - onceki), np.abs(dusuk - onceki)))
+    sonuc = wilder(tr, pencere, motor)
+    return sonuc[0] if tek else sonuc
+
+def parabolic_sar(yuksek, dusuk, adim=0.02, azami=0.2, motor=None):
+    """Parabolic SAR (ilk bar yükseliş trendi varsayılır)"""
+    (yuksek, dusuk), tek = _hazirla(yuksek, dusuk)
+    if _motor(motor) == 'numba':
+        y = np.empty_like(yuksek)
+        _sar_dongu(yuksek, dusuk, adim, azami, y)
+    else:
+        y = _sar_numpy(yuksek, dusuk, adim, azami)
+    return y[0] if tek else y
+
+# --- Karşılaştırma ---
+
+def _sure(fonksiyon, tekrar):
+    fonksiyon()  # Isınma (Numba ilk çağrıda derler)
+    bas = time.perf_counter()
+    for _ in range(tekrar):
+        fonksiyon()
+    return (time.perf_counter() - bas) / tekrar * 1000
+
+def karsilastir(sembol_sayisi=100, bar_sayisi=2500, tekrar=5, tohum=42):
+    """Numba ve NumPy yollarını sentetik OHLC paneli üzerinde karşılaştır (ms)"""
+    rng = np.random.default_rng(tohum)
+    kapanis = 100 * np.exp(np.cumsum(rng.normal(0, 0.02, (sembol_sayisi, bar_sayisi)), axis=1))
+    yuksek = kapanis * (1 + rng.random((sembol_sayisi, bar_sayisi)) * 0.01)
+    dusuk = kapanis * (1 - rng.random((sembol_sayisi, bar_sayisi)) * 0.01)
+
+    cekirdekler = {
+        'EMA(12)': lambda m: ema(kapanis, 2 / 13, 12, m),
+        'Wilder RSI(14)': lambda m: wilder_rsi(kapanis, 14, m),
+        'ATR(14)': lambda m: atr(yuksek, dusuk, kapanis, 14, m),
+        'Parabolic SAR': lambda m: parabolic_sar(yuksek, dusuk, motor=m)
+    }
+    motorlar = ['numpy'] + (['numba'] if NUMBA_VAR else [])
+
+    print(f"\n📊 {sembol_sayisi} sembol x {bar_sayisi} bar, {tekrar} tekrar ortalaması (ms)")
+    print(f"   {'Çekirdek':<16}" + ''.join(f"{m:>10}" for m in motorlar) + f"{'Fark':>12}")
+    sonuclar = {}
+    for ad, fonksiyon in cekirdekler.items():
+        sureler = {m: _sure(lambda: fonksiyon(m), tekrar) for m in motorlar}
+        fark = ''
+        if NUMBA_VAR:
+            fark = f"{np.nanmax(np.abs(fonksiyon('numba') - fonksiyon('numpy'))):.1e}"
+        print(f"   {ad:<16}" + ''.join(f"{sureler[m]:>10.2f}" for m in motorlar) + f"{fark:>12}")
+        sonuclar[ad] = sureler
+    if not NUMBA_VAR:
+        print("💡 Numba kurulu değil; yalnızca NumPy yolu ölçüldü (pip install numba)")
+    return sonuclar
+
+def main():
+    parser = argparse.ArgumentParser(description="Gösterge çekirdeklerini Numba ve NumPy ile karşılaştır")
+    parser.add_argument('--sembol', type=int, default=100, help="Sembol sayısı")
+    parser.add_argument('--bar', type=int, default=2500, help="Sembol başına bar sayısı")
+    parser.add_argument('--tekrar', type=int, default=5, help="Ölçüm tekrarı")
+    args = parser.parse_args()
+
+    for sembol_sayisi in sorted({1, args.sembol}):
+        karsilastir(sembol_sayisi, args.bar, args.tekrar)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,285 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Ortak Teknik Gösterge Kütüphanesi (Tek Geçişte Vektörel Hesaplama)
+Geliştiren: Çağatay Elaman
+"""
+
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+import gosterge_cekirdekleri as cekirdek
+
+# İstenebilecek göstergeler ve ürettikleri seriler
+GOSTERGE_CIKTILARI = {
+    'ma20': ('ma20',),
+    'ma50': ('ma50',),
+    'rsi': ('rsi',),
+    'rsi_wilder': ('rsi_wilder',),
+    'bollinger': ('upper_band', 'lower_band'),
+    'ema': ('ema12', 'ema26'),
+    'macd': ('macd', 'macd_signal', 'macd_hist'),
+    'atr': ('atr',),
+    'stokastik': ('stoch_k', 'stoch_d'),
+    'obv': ('obv',),
+    'vwap': ('vwap',),
+    'adx': ('adx', 'plus_di', 'minus_di'),
+    'sar': ('sar',)
+}
+
+# Mevcut ekranların kullandığı varsayılan set
+TEMEL_GOSTERGELER = ('ma20', 'ma50', 'rsi', 'bollinger')
+
+class GostergeHesaplayici:
+    """OHLCV dizileri üzerinde göstergeleri hesaplar.
+
+    Ortak ara sonuçlar (fiyat farkı, gerçek aralık, kümülatif toplamlar, kayan
+    ortalamalar, EMA'lar) ilk ihtiyaçta bir kez hesaplanıp saklanır; aynı
+    hesaplayıcıdan istenen diğer göstergeler bunları yeniden kullanır.
+    """
+
+    def __init__(self, acilis, yuksek, dusuk, kapanis, hacim, zaman=None):
+        self.seriler = {
+            'open': np.asarray(acilis, dtype=np.float64),
+            'high': np.asarray(yuksek, dtype=np.float64),
+            'low': np.asarray(dusuk, dtype=np.float64),
+            'close': np.asarray(kapanis, dtype=np.float64),
+            'volume': np.asarray(hacim, dtype=np.float64)
+        }
+        self.zaman = None if zaman is None else np.asarray(zaman).astype('datetime64[ns]').view('int64')
+        self.n = len(self.seriler['close'])
+        self.ara = {}
+
+    @classmethod
+    def df_den(cls, df):
+        """yfinance biçimindeki DataFrame'den hesaplayıcı oluştur"""
+        zaman = df.index.values if isinstance(df.index, pd.DatetimeIndex) else None
+        return cls(df['Open'].to_numpy(), df['High'].to_numpy(), df['Low'].to_numpy(),
+                   df['Close'].to_numpy(), df['Volume'].to_numpy(), zaman)
+
+    def _sakla(self, anahtar, fonksiyon):
+        deger = self.ara.get(anahtar)
+        if deger is None:
+            deger = fonksiyon()
+            self.ara[anahtar] = deger
+        return deger
+
+    def _bos(self):
+        return np.full(self.n, np.nan)
+
+    # --- Ortak ara sonuçlar ---
+
+    def seri(self, ad):
+        """Ham ya da türetilmiş bir seri (fark, kazanc, kayip, tr, tipik, ...)"""
+        if ad in self.seriler:
+            return self.seriler[ad]
+        return self._sakla(('seri', ad), lambda: getattr(self, f'_{ad}')())
+
+    def _fark(self):
+        fark = self._bos()
+        fark[1:] = np.diff(self.seriler['close'])
+        return fark
+
+    def _kazanc(self):
+        # İlk bar (fark NaN) mevcut RSI hesabındaki gibi 0 sayılır
+        return np.where(self.seri('fark') > 0, self.seri('fark'), 0.0)
+
+    def _kayip(self):
+        return np.where(self.seri('fark') < 0, -self.seri('fark'), 0.0)
+
+    def _onceki_kapanis(self):
+        onceki = self._bos()
+        onceki[1:] = self.seriler['close'][:-1]
+        return onceki
+
+    def _tr(self):
+        """Gerçek aralık (ilk barda yüksek - düşük)"""
+        yuksek, dusuk = self.seriler['high'], self.seriler['low']
+        onceki = self.seri('onceki_kapanis')
+        return np.fmax(yuksek - dusuk, np.fmax(np.abs(yuksek - onceki), np.abs(dusuk - onceki)))
+
+    def _yukari_hareket(self):
+        hareket = self._bos()
+        hareket[1:] = np.diff(self.seriler['high'])
+        return hareket
+
+    def _asagi_hareket(self):
+        hareket = self._bos()
+        hareket[1:] = -np.diff(self.seriler['low'])
+        return hareket
+
+    def _arti_dm(self):
+        yukari, asagi = self.seri('yukari_hareket'), self.seri('asagi_hareket')
+        return np.where((yukari > asagi) & (yukari > 0), yukari, np.where(np.isnan(yukari), np.nan, 0.0))
+
+    def _eksi_dm(self):
+        yukari, asagi = self.seri('yukari_hareket'), self.seri('asagi_hareket')
+        return np.where((asagi > yukari) & (asagi > 0), asagi, np.where(np.isnan(asagi), np.nan, 0.0))
+
+    def _tipik(self):
+        return (self.seriler['high'] + self.seriler['low'] + self.seriler['close']) / 3
+
+    def _tipik_hacim(self):
+        return self.seri('tipik') * self.seriler['volume']
+
+    def _kumulatif(self, ad):
+        """Başına 0 eklenmiş kümülatif toplam, kareler toplamı ve geçerli değer sayısı (NaN'lar atlanır)"""
+        def hesapla():
+            x = self.seri(ad)
+            gecerli = ~np.isnan(x)
+            # Büyük değerlerde toplam farkı kaybını azaltmak için ilk değere göre kaydır
+            kaydirma = x[gecerli][0] if gecerli.any() else 0.0
+            y = np.where(gecerli, x - kaydirma, 0.0)
+            return (np.concatenate(([0.0], np.cumsum(y))),
+                    np.concatenate(([0.0], np.cumsum(y * y))),
+                    np.concatenate(([0], np.cumsum(gecerli))),
+                    kaydirma)
+        return self._sakla(('kumulatif', ad), hesapla)
+
+    def kayan_toplam(self, ad, pencere):
+        """Kayan toplam; penceresinde NaN olan barlar NaN (pandas rolling ile aynı)"""
+        def hesapla():
+            toplam, _, sayi, kaydirma = self._kumulatif(ad)
+            sonuc = self._bos()
+            if self.n >= pencere:
+                dolu = sayi[pencere:] - sayi[:-pencere] == pencere
+                degerler = toplam[pencere:] - toplam[:-pencere] + kaydirma * pencere
+                sonuc[pencere - 1:] = np.where(dolu, degerler, np.nan)
+            return sonuc
+        return self._sakla(('toplam', ad, pencere), hesapla)
+
+    def kayan_ortalama(self, ad, pencere):
+        return self._sakla(('ortalama', ad, pencere), lambda: self.kayan_toplam(ad, pencere) / pencere)
+
+    def kayan_std(self, ad, pencere):
+        """Örneklem standart sapması (ddof=1), kümülatif kareler toplamından"""
+        def hesapla():
+            toplam, kareler, _, kaydirma = self._kumulatif(ad)
+            sonuc = self._bos()
+            if self.n >= pencere:
+                s1 = toplam[pencere:] - toplam[:-pencere]
+                s2 = kareler[pencere:] - kareler[:-pencere]
+                varyans = np.maximum(s2 - s1 * s1 / pencere, 0.0) / (pencere - 1)
+                sonuc[pencere - 1:] = np.sqrt(varyans)
+                sonuc[np.isnan(self.kayan_toplam(ad, pencere))] = np.nan
+            return sonuc
+        return self._sakla(('std', ad, pencere), hesapla)
+
+    def kayan_en_yuksek(self, ad, pencere):
+        def hesapla():
+            sonuc = self._bos()
+            if self.n >= pencere:
+                sonuc[pencere - 1:] = sliding_window_view(self.seri(ad), pencere).max(axis=1)
+            return sonuc
+        return self._sakla(('max', ad, pencere), hesapla)
+
+    def kayan_en_dusuk(self, ad, pencere):
+        def hesapla():
+            sonuc = self._bos()
+            if self.n >= pencere:
+                sonuc[pencere - 1:] = sliding_window_view(self.seri(ad), pencere).min(axis=1)
+            return sonuc
+        return self._sakla(('min', ad, pencere), hesapla)
+
+    def ema(self, ad, pencere):
+        """Üssel hareketli ortalama (alpha = 2 / (pencere + 1))"""
+        return self._sakla(('ema', ad, pencere), lambda: cekirdek.ema(self.seri(ad), 2 / (pencere + 1), pencere))
+
+    def wilder(self, ad, pencere):
+        """Wilder yumuşatması (alpha = 1 / pencere)"""
+        return self._sakla(('wilder', ad, pencere), lambda: cekirdek.wilder(self.seri(ad), pencere))
+
+    # --- Göstergeler ---
+
+    def _ma20(self):
+        return {'ma20': self.kayan_ortalama('close', 20)}
+
+    def _ma50(self):
+        return {'ma50': self.kayan_ortalama('close', 50)}
+
+    def _rsi(self, pencere=14):
+        """RSI (14 barlık basit ortalama kazanç / kayıp)"""
+        kazanc = self.kayan_ortalama('kazanc', pencere)
+        kayip = self.kayan_ortalama('kayip', pencere)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            rsi = 100 - 100 / (1 + kazanc / kayip)
+        return {'rsi': rsi}
+
+    def _rsi_wilder(self, pencere=14):
+        """RSI (Wilder yumuşatmalı kazanç / kayıp)"""
+        return {'rsi_wilder': cekirdek.wilder_rsi(self.seriler['close'], pencere)}
+
+    def _bollinger(self, pencere=20, carpan=2):
+        orta = self.kayan_ortalama('close', pencere)
+        std = self.kayan_std('close', pencere)
+        return {'upper_band': orta + std * carpan, 'lower_band': orta - std * carpan}
+
+    def _ema(self):
+        return {'ema12': self.ema('close', 12), 'ema26': self.ema('close', 26)}
+
+    def _macd(self):
+        macd = self.ema('close', 12) - self.ema('close', 26)
+        self.seriler['macd'] = macd
+        sinyal = self.ema('macd', 9)
+        return {'macd': macd, 'macd_signal': sinyal, 'macd_hist': macd - sinyal}
+
+    def _atr(self, pencere=14):
+        return {'atr': self.wilder('tr', pencere)}
+
+    def _stokastik(self, pencere=14, yumusatma=3):
+        en_dusuk = self.kayan_en_dusuk('low', pencere)
+        en_yuksek = self.kayan_en_yuksek('high', pencere)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            k = 100 * (self.seriler['close'] - en_dusuk) / (en_yuksek - en_dusuk)
+        self.seriler['stoch_k'] = k
+        return {'stoch_k': k, 'stoch_d': self.kayan_ortalama('stoch_k', yumusatma)}
+
+    def _obv(self):
+        yon = np.sign(np.nan_to_num(self.seri('fark')))
+        return {'obv': np.cumsum(yon * np.nan_to_num(self.seriler['volume']))}
+
+    def _vwap(self, pencere=20):
+        """Gün içi barlarda seans VWAP'ı (her gün sıfırlanır), günlük barlarda kayan VWAP"""
+        gun_ici = self.zaman is not None and self.n > 1 and \
+            np.median(np.diff(self.zaman)) < 24 * 3600 * 10**9
+        if not gun_ici:
+            with np.errstate(divide='ignore', invalid='ignore'):
+                return {'vwap': self.kayan_toplam('tipik_hacim', pencere) / self.kayan_toplam('volume', pencere)}
+
+        # Gün başlarındaki kümülatif değerleri çıkararak seans içi toplamlar
+        gun = self.zaman // (24 * 3600 * 10**9)
+        baslar = np.concatenate(([0], np.flatnonzero(np.diff(gun)) + 1))
+        grup = np.repeat(baslar, np.diff(np.concatenate((baslar, [self.n]))))
+        tutar = np.concatenate(([0.0], np.cumsum(np.nan_to_num(self.seri('tipik_hacim')))))
+        hacim = np.concatenate(([0.0], np.cumsum(np.nan_to_num(self.seriler['volume']))))
+        with np.errstate(divide='ignore', invalid='ignore'):
+            vwap = (tutar[1:] - tutar[grup]) / (hacim[1:] - hacim[grup])
+        return {'vwap': vwap}
+
+    def _adx(self, pencere=14):
+        tr = self.wilder('tr', pencere)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            arti_di = 100 * self.wilder('arti_dm', pencere) / tr
+            eksi_di = 100 * self.wilder('eksi_dm', pencere) / tr
+            self.seriler['dx'] = 100 * np.abs(arti_di - eksi_di) / (arti_di + eksi_di)
+        return {'adx': self.wilder('dx', pencere), 'plus_di': arti_di, 'minus_di': eksi_di}
+
+    def _sar(self):
+        return {'sar': cekirdek.parabolic_sar(self.seriler['high'], self.seriler['low'])}
+
+    def hesapla(self, gostergeler=TEMEL_GOSTERGELER):
+        """İstenen göstergeleri hesapla: {seri_adi: ndarray}"""
+        sonuc = {}
+        for gosterge in gostergeler:
+            if gosterge not in GOSTERGE_CIKTILARI:
+                raise ValueError(f"Bilinmeyen gösterge: {gosterge} (desteklenen: {', '.join(GOSTERGE_CIKTILARI)})")
+            sonuc.update(self._sakla(('gosterge', gosterge), getattr(self, f'_{gosterge}')))
+        return sonuc
+
+def hesapla(df, gostergeler=TEMEL_GOSTERGELER):
+    """DataFrame için göstergeleri tek hesaplayıcıda hesapla: {seri_adi: ndarray}"""
+    return GostergeHesaplayici.df_den(df).hesapla(gostergeler)
+
+def gosterge_tablosu(df, gostergeler=TEMEL_GOSTERGELER):
+    """Göstergeleri df ile aynı index'e sahip bir DataFrame olarak döndür"""
+    return pd.DataFrame(hesapla(df, gostergeler), index=df.index)
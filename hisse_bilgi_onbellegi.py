@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Hisse Senedi Bilgi Önbelleği (ticker.info)
+Geliştiren: Çağatay Elaman
+"""
+
+import os
+import json
+import time
+import sqlite3
+import threading
+import yfinance as yf
+
+class HisseBilgiOnbellegi:
+    def __init__(self, db_yolu=os.path.join('Finansal_Veriler', 'hisse_bilgi.db'),
+                 statik_sure=3 * 24 * 3600, yavas_sure=3600, degisken_sure=15):
+        # Alan grupları ve geçerlilik süreleri (saniye)
+        self.alan_gruplari = {
+            'statik': ['longName', 'shortName', 'sector', 'industry', 'currency', 'exchange'],
+            'yavas': ['marketCap', 'fiftyTwoWeekHigh', 'fiftyTwoWeekLow', 'sharesOutstanding'],
+            'degisken': ['currentPrice', 'regularMarketPrice', 'regularMarketChangePercent',
+                         'regularMarketVolume', 'previousClose']
+        }
+        self.sureler = {
+            'statik': statik_sure,
+            'yavas': yavas_sure,
+            'degisken': degisken_sure
+        }
+
+        self.db_yolu = db_yolu
+        self.kilit = threading.Lock()
+        self.bellek = {}
+        self.setup_db()
+
+    def setup_db(self):
+        """SQLite veritabanını hazırla"""
+        klasor = os.path.dirname(self.db_yolu)
+        if klasor and not os.path.exists(klasor):
+            os.makedirs(klasor)
+
+        self.baglanti = sqlite3.connect(self.db_yolu, check_same_thread=False)
+        self.baglanti.execute("PRAGMA journal_mode=WAL")
+        self.baglanti.execute("""
+            CREATE TABLE IF NOT EXISTS bilgi (
+                sembol TEXT NOT NULL,
+                grup TEXT NOT NULL,
+                veri TEXT NOT NULL,
+                zaman REAL NOT NULL,
+                PRIMARY KEY (sembol, grup)
+            )
+        """)
+        self.baglanti.commit()
+
+    def _oku(self, symbol, grup):
+        """Önce bellekten, yoksa diskten kaydı oku"""
+        kayit = self.bellek.get((symbol, grup))
+        if kayit is None:
+            with self.kilit:
+                satir = self.baglanti.execute(
+                    "SELECT veri, zaman FROM bilgi WHERE sembol = ? AND grup = ?",
+                    (symbol, grup)
+                ).fetchone()
+            if satir is None:
+                return None
+            kayit = (satir[1], json.loads(satir[0]))
+            self.bellek[(symbol, grup)] = kayit
+        return kayit
+
+    def _yaz(self, symbol, info, zaman):
+        """Gelen info sözlüğünü gruplara ayırıp kaydet"""
+        satirlar = []
+        for grup, alanlar in self.alan_gruplari.items():
+            veri = {alan: info[alan] for alan in alanlar if info.get(alan) is not None}
+            if not veri:
+                continue
+            self.bellek[(symbol, grup)] = (zaman, veri)
+            satirlar.append((symbol, grup, json.dumps(veri), zaman))
+
+        with self.kilit:
+            self.baglanti.executemany(
+                "INSERT OR REPLACE INTO bilgi (sembol, grup, veri, zaman) VALUES (?, ?, ?, ?)",
+                satirlar
+            )
+            self.baglanti.commit()
+
+    def _hizli_fiyat(self, ticker):
+        """Sadece fiyat alanlarını fast_info ile al (ticker.info'dan çok daha hafif)"""
+        fast = ticker.fast_info
+        son_fiyat = fast.last_price
+        onceki_kapanis = fast.previous_close
+
+        info = {
+            'currentPrice': son_fiyat,
+            'regularMarketPrice': son_fiyat,
+            'previousClose': onceki_kapanis,
+            'regularMarketVolume': fast.last_volume
+        }
+        if son_fiyat is not None and onceki_kapanis:
+            info['regularMarketChangePercent'] = (son_fiyat - onceki_kapanis) / onceki_kapanis * 100
+        return info
+
+    def get_info(self, symbol, fiyat_sure=None):
+        """ticker.info yerine kullanılır; süresi dolan grupları yeniler"""
+        simdi = time.time()
+        sureler = dict(self.sureler)
+        if fiyat_sure is not None:
+            sureler['degisken'] = fiyat_sure
+
+        sonuc = {}
+        eskiyen = []
+        for grup in self.alan_gruplari:
+            kayit = self._oku(symbol, grup)
+            if kayit is None or simdi - kayit[0] > sureler[grup]:
+                eskiyen.append(grup)
+            if kayit is not None:
+                sonuc.update(kayit[1])
+
+        if not eskiyen:
+            return sonuc
+
+        try:
+            ticker = yf.Ticker(symbol)
+            yeni = None
+
+            # Sadece fiyat eskidiyse tam info çağrısına gerek yok
+            if eskiyen == ['degisken']:
+                try:
+                    yeni = self._hizli_fiyat(ticker)
+                except Exception:
+                    yeni = None
+
+            if yeni is None:
+                yeni = ticker.info
+
+            self._yaz(symbol, yeni, simdi)
+            sonuc.update({k: v for k, v in yeni.items() if v is not None})
+
+        except Exception:
+            # Kaynak erişilemezse eski veriyle devam et
+            if not sonuc:
+                raise
+
+        return sonuc
+
+    def temizle(self, symbol=None):
+        """Önbelleği temizle"""
+        with self.kilit:
+            if symbol is None:
+                self.baglanti.execute("DELETE FROM bilgi")
+                self.bellek.clear()
+            else:
+                self.baglanti.execute("DELETE FROM bilgi WHERE sembol = ?", (symbol,))
+                for grup in self.alan_gruplari:
+                    self.bellek.pop((symbol, grup), None)
+            self.baglanti.commit()
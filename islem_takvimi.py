@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Borsa İstanbul İşlem Takvimi (Tatiller, Yarım Günler, Seans Saatleri)
+Geliştiren: Çağatay Elaman
+"""
+
+import os
+import json
+import argparse
+import numpy as np
+from datetime import datetime, date, timedelta
+
+TAKVIM_DOSYASI = os.path.join('Finansal_Veriler', 'bist_takvimi.json')
+
+# Dini bayramların ilk günleri (Diyanet takvimi); yeni yıllar dosyaya eklenebilir
+RAMAZAN_BAYRAMI = {
+    2018: '2018-06-15', 2019: '2019-06-04', 2020: '2020-05-24', 2021: '2021-05-13', 2022: '2022-05-02',
+    2023: '2023-04-21', 2024: '2024-04-10', 2025: '2025-03-30', 2026: '2026-03-20', 2027: '2027-03-09'
+}
+KURBAN_BAYRAMI = {
+    2018: '2018-08-21', 2019: '2019-08-11', 2020: '2020-07-31', 2021: '2021-07-20', 2022: '2022-07-09',
+    2023: '2023-06-28', 2024: '2024-06-16', 2025: '2025-06-06', 2026: '2026-05-27', 2027: '2027-05-16'
+}
+# Resmi tatiller (ay, gün)
+RESMI_TATILLER = ((1, 1), (4, 23), (5, 1), (5, 19), (7, 15), (8, 30), (10, 29))
+
+VARSAYILAN_SEANS = {'acilis': '10:00', 'kapanis': '18:00', 'yarim_gun_kapanis': '12:30'}
+
+def varsayilan_takvim():
+    """Yerleşik tablolardan tatil ve yarım gün listesi"""
+    tatiller, yarim_gunler = set(), set()
+    for yil in sorted(RAMAZAN_BAYRAMI):
+        for ay, gun in RESMI_TATILLER:
+            tatiller.add(date(yil, ay, gun))
+        # Cumhuriyet Bayramı arifesi yarım gün
+        yarim_gunler.add(date(yil, 10, 28))
+        for bayram, sure in ((RAMAZAN_BAYRAMI[yil], 3), (KURBAN_BAYRAMI[yil], 4)):
+            ilk = datetime.strptime(bayram, '%Y-%m-%d').date()
+            tatiller.update(ilk + timedelta(days=i) for i in range(sure))
+            yarim_gunler.add(ilk - timedelta(days=1))
+    yarim_gunler -= tatiller
+    return {
+        'yillar': [min(RAMAZAN_BAYRAMI), max(RAMAZAN_BAYRAMI)],
+        'seans': dict(VARSAYILAN_SEANS),
+        'tatiller': sorted(g.isoformat() for g in tatiller),
+        'yarim_gunler': sorted(g.isoformat() for g in yarim_gunler)
+    }
+
+def takvim_oku(yol=TAKVIM_DOSYASI):
+    """Yerel takvim dosyasını oku; yoksa yerleşik tablolardan oluşturup kaydet.
+
+    Dosya elle düzenlenebilir (ör. idari izin köprü günleri `tatiller`e eklenir).
+    """
+    if os.path.exists(yol):
+        with open(yol, encoding='utf-8') as f:
+            return json.load(f)
+    takvim = varsayilan_takvim()
+    os.makedirs(os.path.dirname(yol) or '.', exist_ok=True)
+    gecici = yol + '.tmp'
+    with open(gecici, 'w', encoding='utf-8') as f:
+        json.dump(takvim, f, ensure_ascii=False, indent=1)
+    os.replace(gecici, yol)
+    return takvim
+
+def gunlere(tarihler):
+    """Tarih / datetime64 / int64 ns dizisini datetime64[D] dizisine çevir"""
+    dizi = np.asarray(tarihler)
+    if dizi.dtype.kind in 'iu':
+        dizi = dizi.astype('datetime64[ns]')
+    return dizi.astype('datetime64[D]')
+
+class IslemTakvimi:
+    """BIST işlem günleri; sorgular numpy iş günü takvimiyle vektöreldir"""
+
+    def __init__(self, yol=TAKVIM_DOSYASI):
+        veri = takvim_oku(yol)
+        self.tatiller = np.array(sorted(veri['tatiller']), dtype='datetime64[D]')
+        self.yarim_gunler = np.array(sorted(veri.get('yarim_gunler', [])), dtype='datetime64[D]')
+        self.seans = dict(VARSAYILAN_SEANS, **veri.get('seans', {}))
+        self.yillar = tuple(veri.get('yillar', (None, None)))
+        self.takvim = np.busdaycalendar(weekmask='1111100', holidays=self.tatiller)
+
+    def islem_gunu_mu(self, tarihler):
+        return np.is_busday(gunlere(tarihler), busdaycal=self.takvim)
+
+    def yarim_gun_mu(self, tarihler):
+        return np.isin(gunlere(tarihler), self.yarim_gunler)
+
+    def sira(self, tarihler):
+        """İşlem günü sıra numarası (ardışık işlem günleri ardışık sayılar; tatil günü sonraki günün sırasını alır)"""
+        return np.busday_count(np.datetime64('2000-01-03'), gunlere(tarihler), busdaycal=self.takvim)
+
+    def islem_gunleri(self, baslangic, bitis):
+        """[baslangic, bitis] aralığındaki işlem günleri (datetime64[D])"""
+        gunler = np.arange(np.datetime64(baslangic, 'D'), np.datetime64(bitis, 'D') + 1)
+        return gunler[np.is_busday(gunler, busdaycal=self.takvim)]
+
+    def gun_ekle(self, tarihler, adet):
+        """İşlem günü cinsinden ileri / geri git (tatil günleri önce sonraki işlem gününe yuvarlanır)"""
+        return np.busday_offset(gunlere(tarihler), adet, roll='forward', busdaycal=self.takvim)
+
+    def son_tamamlanan_gun(self, simdi=None):
+        """Seansı kapanmış son işlem günü"""
+        simdi = simdi or datetime.now()
+        bugun = np.datetime64(simdi.date(), 'D')
+        kapanis = self.seans['yarim_gun_kapanis'] if self.yarim_gun_mu([bugun])[0] else self.seans['kapanis']
+        if self.islem_gunu_mu([bugun])[0] and simdi.strftime('%H:%M') >= kapanis:
+            return bugun
+        return np.busday_offset(bugun, -1, roll='forward', busdaycal=self.takvim)
+
+def main():
+    parser = argparse.ArgumentParser(description="BIST işlem takvimi: tatiller ve yarım günler")
+    parser.add_argument('yil', type=int, nargs='?', default=datetime.now().year)
+    parser.add_argument('--dosya', default=TAKVIM_DOSYASI)
+    args = parser.parse_args()
+
+    takvim = IslemTakvimi(args.dosya)
+    if args.yil < takvim.yillar[0] or args.yil > takvim.yillar[1]:
+        print(f"⚠️  {args.yil} takvim kapsamı dışında ({takvim.yillar[0]}-{takvim.yillar[1]}); yalnızca hafta sonları bilinir")
+    bas, bit = f"{args.yil}-01-01", f"{args.yil}-12-31"
+    print(f"📅 {args.yil}: {len(takvim.islem_gunleri(bas, bit))} işlem günü")
+    for gun in takvim.tatiller[(takvim.tatiller >= np.datetime64(bas)) & (takvim.tatiller <= np.datetime64(bit))]:
+        print(f"   ⛔ {gun}  tatil")
+    for gun in takvim.yarim_gunler[(takvim.yarim_gunler >= np.datetime64(bas)) & (takvim.yarim_gunler <= np.datetime64(bit))]:
+        print(f"   ⏱️  {gun}  yarım gün (kapanış {takvim.seans['yarim_gun_kapanis']})")
+
+if __name__ == "__main__":
+    main()
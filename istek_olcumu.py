@@ -0,0 +1,185 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Web İstekleri İçin Aşama Süreleri, Prometheus Metrikleri ve İsteğe Bağlı Profil
+Geliştiren: Çağatay Elaman
+"""
+
+import os
+import io
+import time
+import pstats
+import cProfile
+import threading
+import contextlib
+import numpy as np
+from datetime import datetime
+from flask import Response, current_app, g, has_request_context, request
+
+try:
+    from pyinstrument import Profiler as OrneklemeProfili
+except ImportError:
+    OrneklemeProfili = None
+
+# Gecikme histogramı üst sınırları (saniye)
+VARSAYILAN_KOVALAR = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+class Histogram:
+    """Etiket kümesi başına kova sayaçları, toplam ve adet"""
+
+    def __init__(self, ad, aciklama, etiketler, kovalar=VARSAYILAN_KOVALAR):
+        self.ad = ad
+        self.aciklama = aciklama
+        self.etiketler = etiketler
+        self.kovalar = np.asarray(kovalar, dtype=np.float64)
+        self.seriler = {}
+
+    def gozle(self, etiket_degerleri, sure):
+        seri = self.seriler.get(etiket_degerleri)
+        if seri is None:
+            seri = self.seriler[etiket_degerleri] = [np.zeros(len(self.kovalar) + 1, dtype=np.int64), 0.0]
+        # Her gözlem tek kovaya yazılır; yayında kümülatife çevrilir
+        seri[0][np.searchsorted(self.kovalar, sure, side='left')] += 1
+        seri[1] += sure
+
+    def yayinla(self):
+        satirlar = [f"# HELP {self.ad} {self.aciklama}", f"# TYPE {self.ad} histogram"]
+        sinirlar = [f"{k:g}" for k in self.kovalar] + ['+Inf']
+        for etiket_degerleri, (sayaclar, toplam) in sorted(self.seriler.items()):
+            etiket = ','.join(f'{a}="{_kacis(d)}"' for a, d in zip(self.etiketler, etiket_degerleri))
+            for sinir, adet in zip(sinirlar, np.cumsum(sayaclar)):
+                satirlar.append(f'{self.ad}_bucket{{{etiket},le="{sinir}"}} {adet}')
+            satirlar.append(f"{self.ad}_sum{{{etiket}}} {toplam:.6f}")
+            satirlar.append(f"{self.ad}_count{{{etiket}}} {int(sayaclar.sum())}")
+        return satirlar
+
+def _kacis(deger):
+    return str(deger).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+class IstekOlcumu:
+    """Flask uygulamasına istek süresi ölçümü, /metrics ve ?profil=1 desteği ekler.
+
+    İstek içinde `with olcum.asama('fetch'):` ile işaretlenen aşamalar
+    Server-Timing başlığına yazılır ve rota / aşama histogramlarına eklenir.
+    """
+
+    def __init__(self, app=None, kovalar=VARSAYILAN_KOVALAR, max_sembol=200,
+                 profil_klasoru=os.path.join('Finansal_Veriler', 'Profiller')):
+        self.max_sembol = max_sembol
+        self.profil_klasoru = profil_klasoru
+        self.kilit = threading.Lock()
+        self.semboller = set()
+
+        self.istek_suresi = Histogram('http_request_duration_seconds',
+                                      'İstek süresi (rota ve sembol başına)', ('route', 'symbol'), kovalar)
+        self.asama_suresi = Histogram('http_request_stage_duration_seconds',
+                                      'İstek aşaması süresi (fetch, compute, format, serialize)',
+                                      ('route', 'stage'), kovalar)
+        self.istek_sayisi = {}
+
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        # Profil, sunucu tarafında açıkça izin verilmedikçe çalışmaz
+        app.config.setdefault('PROFIL_IZNI', os.environ.get('FINANS_PROFIL') == '1')
+        app.before_request(self._basla)
+        app.after_request(self._bitir)
+        app.add_url_rule('/metrics', 'metrics', self.metrikler)
+        app.extensions['istek_olcumu'] = self
+
+    @contextlib.contextmanager
+    def asama(self, ad):
+        """İstek aşamasının süresini ölç (istek dışında çağrılırsa bir şey yapmaz)"""
+        if not has_request_context() or 'asamalar' not in g:
+            yield
+            return
+        bas = time.perf_counter()
+        try:
+            yield
+        finally:
+            g.asamalar[ad] = g.asamalar.get(ad, 0.0) + time.perf_counter() - bas
+
+    def _olculecek_mi(self):
+        return request.endpoint not in (None, 'static', 'metrics')
+
+    def _basla(self):
+        if not self._olculecek_mi():
+            return
+        g.asamalar = {}
+        g.istek_baslangic = time.perf_counter()
+        g.profil = None
+        if request.args.get('profil') == '1' and current_app.config['PROFIL_IZNI']:
+            g.profil = self._profil_baslat()
+
+    def _profil_baslat(self):
+        """pyinstrument varsa örnekleme profili, yoksa cProfile"""
+        if OrneklemeProfili is not None:
+            profil = OrneklemeProfili(interval=0.001)
+            profil.start()
+        else:
+            profil = cProfile.Profile()
+            profil.enable()
+        return profil
+
+    def _profil_kaydet(self, profil):
+        if not os.path.exists(self.profil_klasoru):
+            os.makedirs(self.profil_klasoru, exist_ok=True)
+        ad = f"{request.endpoint}_{datetime.now().strftime('%Y%m%d_%H%M%S_%f')}"
+
+        if OrneklemeProfili is not None:
+            profil.stop()
+            yol = os.path.join(self.profil_klasoru, f"{ad}.html")
+            with open(yol, 'w', encoding='utf-8') as f:
+                f.write(profil.output_html())
+        else:
+            profil.disable()
+            yol = os.path.join(self.profil_klasoru, f"{ad}.txt")
+            metin = io.StringIO()
+            pstats.Stats(profil, stream=metin).sort_stats('cumulative').print_stats(40)
+            with open(yol, 'w', encoding='utf-8') as f:
+                f.write(metin.getvalue())
+        return yol
+
+    def _sembol_etiketi(self):
+        """Sembol etiketini sınırla: ilk max_sembol farklı sembolden sonrası 'diger'"""
+        sembol = request.args.get('symbol')
+        if sembol is None:
+            return ''
+        if sembol in self.semboller:
+            return sembol
+        if len(self.semboller) < self.max_sembol:
+            self.semboller.add(sembol)
+            return sembol
+        return 'diger'
+
+    def _bitir(self, yanit):
+        if 'istek_baslangic' not in g:
+            return yanit
+
+        if g.profil is not None:
+            yanit.headers['X-Profil'] = self._profil_kaydet(g.profil)
+
+        toplam = time.perf_counter() - g.istek_baslangic
+        parcalar = [f"{ad};dur={sure * 1000:.2f}" for ad, sure in g.asamalar.items()]
+        parcalar.append(f"total;dur={toplam * 1000:.2f}")
+        yanit.headers['Server-Timing'] = ', '.join(parcalar)
+
+        rota = request.url_rule.rule
+        with self.kilit:
+            self.istek_suresi.gozle((rota, self._sembol_etiketi()), toplam)
+            for ad, sure in g.asamalar.items():
+                self.asama_suresi.gozle((rota, ad), sure)
+            anahtar = (rota, str(yanit.status_code))
+            self.istek_sayisi[anahtar] = self.istek_sayisi.get(anahtar, 0) + 1
+        return yanit
+
+    def metrikler(self):
+        """Prometheus metin biçiminde metrikler"""
+        with self.kilit:
+            satirlar = self.istek_suresi.yayinla() + self.asama_suresi.yayinla()
+            satirlar += ["# HELP http_requests_total İstek sayısı (rota ve durum kodu başına)",
+                         "# TYPE http_requests_total counter"]
+            for (rota, durum), adet in sorted(self.istek_sayisi.items()):
+                satirlar.append(f'http_requests_total{{route="{_kacis(rota)}",status="{durum}"}} {adet}')
+        return Response('\n'.join(satirlar) + '\n', mimetype='text/plain; version=0.0.4')
@@ -0,0 +1,180 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Kurumsal İşlem (Temettü / Bölünme) Tablosu ve Tembel Fiyat Düzeltmesi
+Geliştiren: Çağatay Elaman
+"""
+
+import os
+import tempfile
+import threading
+import numpy as np
+import pandas as pd
+from ohlcv_tipleri import FIYAT_SUTUNLARI, HACIM_SUTUNU, FIYAT_TIPI, HACIM_TIPI, zaman_ns
+
+ISLEM_SUTUNLARI = ('Dividends', 'Stock Splits')
+CARPAN_SUTUNLARI = ('fiyat_carpani', 'hacim_carpani')
+
+def _sonraki_carpim(zaman, olay_zaman, carpanlar):
+    """Her zaman için kendisinden SONRA gerçekleşen olayların çarpanlarının çarpımı"""
+    kumulatif = np.append(np.cumprod(np.asarray(carpanlar, dtype=np.float64)[::-1])[::-1], 1.0)
+    return kumulatif[np.searchsorted(olay_zaman, zaman, side='right')]
+
+def _saat_dilimsiz(df):
+    if isinstance(df.index, pd.DatetimeIndex) and df.index.tz is not None:
+        df = df.set_axis(df.index.tz_localize(None), axis=0)
+    return df
+
+def yahoo_ham(hist):
+    """ticker.history(auto_adjust=False) çıktısını işlem günündeki fiyatlara çevir: (ham barlar, olaylar).
+
+    Yahoo geçmiş fiyatları sonraki bölünmelere göre geriye doğru ölçekler (temettü
+    uygulanmaz); bu ölçek geri alınır ki depodaki barlar indirme zamanından
+    bağımsız olsun. Olaylar tablosundaki temettüler de işlem günü tutarına çevrilir.
+    """
+    hist = _saat_dilimsiz(hist)
+    sutunlar = [c for c in ISLEM_SUTUNLARI if c in hist.columns]
+    if not sutunlar:
+        return hist, bos_olaylar()
+    olaylar = hist[sutunlar].fillna(0).reindex(columns=list(ISLEM_SUTUNLARI), fill_value=0.0)
+    olaylar = olaylar[(olaylar != 0).any(axis=1)]
+    if len(olaylar) == 0:
+        return hist, bos_olaylar()
+
+    bolunme = olaylar[olaylar['Stock Splits'] > 0]
+    if len(bolunme):
+        b_zaman = zaman_ns(bolunme.index)
+        oran = bolunme['Stock Splits'].to_numpy(dtype=np.float64)
+        carpan = _sonraki_carpim(zaman_ns(hist.index), b_zaman, oran)
+        if (carpan != 1).any():
+            hist = hist.copy()
+            for c in FIYAT_SUTUNLARI:
+                if c in hist.columns:
+                    hist[c] = hist[c].to_numpy(dtype=np.float64) * carpan
+            if HACIM_SUTUNU in hist.columns:
+                hist[HACIM_SUTUNU] = np.rint(hist[HACIM_SUTUNU].to_numpy(dtype=np.float64) / carpan)
+        olaylar = olaylar.assign(Dividends=olaylar['Dividends'].to_numpy() *
+                                 _sonraki_carpim(zaman_ns(olaylar.index), b_zaman, oran))
+
+    # Gün içi barlardaki olaylar gün başına taşınır (düzeltme işlem gününden önceki barlara uygulanır)
+    olaylar = olaylar.set_axis(olaylar.index.normalize().rename('Date'), axis=0)
+    return hist, olaylar.groupby(level=0).agg({'Dividends': 'sum', 'Stock Splits': 'max'})
+
+def bos_olaylar():
+    return pd.DataFrame({c: pd.Series(dtype=np.float64) for c in ISLEM_SUTUNLARI},
+                        index=pd.DatetimeIndex([], name='Date'))
+
+class KurumsalIslemDeposu:
+    """Sembol başına temettü / bölünme tablosu ve olay başına düzeltme çarpanları.
+
+    Depodaki barlar ham (işlem günündeki) fiyatlardır. Her olay, tarihinden önceki
+    barlar için bir fiyat ve hacim çarpanı taşır; düzeltilmiş seri, olay çarpanlarının
+    sondan birikimli çarpımının barlara searchsorted ile eşlenmesidir. Yeni bir
+    bölünme yalnızca tabloya satır ekler; bar geçmişi yeniden yazılmaz.
+    """
+
+    def __init__(self, kok=os.path.join('Finansal_Veriler', 'Gecmis', 'Islemler')):
+        self.kok = kok
+        self.onbellek = {}
+        self.kilit = threading.Lock()
+
+    def dosya_yolu(self, symbol):
+        return os.path.join(self.kok, f"{symbol.replace('.IS', '').upper()}.parquet")
+
+    def oku(self, symbol):
+        """Olay tablosu (Dividends, Stock Splits, fiyat_carpani, hacim_carpani); yoksa boş"""
+        yol = self.dosya_yolu(symbol)
+        if not os.path.exists(yol):
+            return bos_olaylar().assign(fiyat_carpani=pd.Series(dtype=np.float64),
+                                        hacim_carpani=pd.Series(dtype=np.float64))
+        return pd.read_parquet(yol)
+
+    def ekle(self, symbol, olaylar, barlar):
+        """Yeni olayları tabloya işle; temettü çarpanı için ex-tarihten önceki ham kapanış kullanılır.
+
+        Mevcut olayların çarpanları korunur (idempotent); tablo değiştiyse True döner.
+        """
+        if olaylar is None or len(olaylar) == 0:
+            return False
+        with self.kilit:
+            mevcut = self.oku(symbol)
+            yeniler = olaylar[~olaylar.index.isin(mevcut.index)]
+            if len(yeniler) == 0:
+                return False
+
+            kapanis = barlar['Close'].to_numpy(dtype=np.float64)
+            konum = np.searchsorted(zaman_ns(barlar.index), zaman_ns(yeniler.index), side='left') - 1
+            onceki = np.where(konum >= 0, kapanis[np.maximum(konum, 0)], np.nan)
+
+            temettu = yeniler['Dividends'].to_numpy(dtype=np.float64)
+            oran = yeniler['Stock Splits'].to_numpy(dtype=np.float64)
+            bolunme = oran > 0
+            with np.errstate(divide='ignore', invalid='ignore'):
+                temettu_carpani = np.where((temettu > 0) & (onceki > temettu), 1 - temettu / onceki, 1.0)
+            yeniler = yeniler.assign(
+                fiyat_carpani=temettu_carpani * np.where(bolunme, 1 / np.where(bolunme, oran, 1), 1.0),
+                hacim_carpani=np.where(bolunme, oran, 1.0))
+
+            tablo = pd.concat([mevcut, yeniler]).sort_index()
+            os.makedirs(self.kok, exist_ok=True)
+            yol = self.dosya_yolu(symbol)
+            # Aynı sembolü yazan web işçileri çakışmasın diye geçici dosya adı benzersiz
+            tanitici, gecici = tempfile.mkstemp(dir=self.kok, prefix=os.path.basename(yol) + '.', suffix='.tmp')
+            os.close(tanitici)
+            try:
+                tablo.to_parquet(gecici)
+                os.replace(gecici, yol)
+            except BaseException:
+                if os.path.exists(gecici):
+                    os.remove(gecici)
+                raise
+            self.onbellek.pop(symbol, None)
+            return True
+
+    def surum(self, symbol):
+        """Tablonun sürümü (dosya mtime ns); tablo yoksa None"""
+        try:
+            return os.stat(self.dosya_yolu(symbol)).st_mtime_ns
+        except OSError:
+            return None
+
+    def carpanlar(self, symbol):
+        """(olay zamanları ns, fiyat birikimli, hacim birikimli); dosya değişmedikçe bellekten"""
+        yol = self.dosya_yolu(symbol)
+        surum = self.surum(symbol)
+        if surum is None:
+            return None
+        kayit = self.onbellek.get(symbol)
+        if kayit is not None and kayit[0] == surum:
+            return kayit[1]
+
+        tablo = pd.read_parquet(yol)
+        sonuc = None
+        if len(tablo):
+            fiyat = tablo['fiyat_carpani'].to_numpy(dtype=np.float64)
+            hacim = tablo['hacim_carpani'].to_numpy(dtype=np.float64)
+            sonuc = (zaman_ns(tablo.index),
+                     np.append(np.cumprod(fiyat[::-1])[::-1], 1.0),
+                     np.append(np.cumprod(hacim[::-1])[::-1], 1.0))
+        self.onbellek[symbol] = (surum, sonuc)
+        return sonuc
+
+    def duzelt(self, symbol, df):
+        """Ham barlardan temettü ve bölünme düzeltilmiş barlar (etkilenen bar yoksa kopyasız)"""
+        carpan = None if df is None or len(df) == 0 else self.carpanlar(symbol)
+        if carpan is None:
+            return df
+        olay_zaman, fiyat_kum, hacim_kum = carpan
+        k = np.searchsorted(olay_zaman, zaman_ns(df.index), side='right')
+        if k[0] == len(olay_zaman):
+            return df
+
+        fiyat, hacim = fiyat_kum[k], hacim_kum[k]
+        veri = {c: (df[c].to_numpy(dtype=np.float64) * fiyat).astype(FIYAT_TIPI)
+                for c in FIYAT_SUTUNLARI if c in df.columns}
+        if HACIM_SUTUNU in df.columns:
+            veri[HACIM_SUTUNU] = np.rint(df[HACIM_SUTUNU].to_numpy(dtype=np.float64) * hacim).astype(HACIM_TIPI)
+        for c in df.columns:
+            if c not in veri:
+                veri[c] = df[c].to_numpy()
+        return pd.DataFrame(veri, index=df.index, columns=df.columns)
@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Makro / Döviz Serileri (USD/TRY, BIST100) Ortak Önbelleği ve As-Of Birleştirme
+Geliştiren: Çağatay Elaman
+"""
+
+import time
+import argparse
+import threading
+import numpy as np
+from collections import namedtuple
+from datetime import datetime
+from ohlcv_tipleri import zaman_ns
+
+# Makro seriler: ad -> Yahoo Finance sembolü
+MAKRO_SEMBOLLERI = {
+    'usd_try': 'USDTRY=X',
+    'bist_100': 'XU100.IS'
+}
+
+GUN_NS = 24 * 60 * 60 * 10**9
+
+# zaman: int64 ns (artan), deger: float64 kapanış, interval: kaynak bar aralığı
+MakroSeri = namedtuple('MakroSeri', 'zaman deger interval')
+
+def makro_adlari():
+    """Depo sembol listelerinden ayıklanacak makro dosya adları (USDTRY=X, XU100)"""
+    return {s.replace('.IS', '') for s in MAKRO_SEMBOLLERI.values()}
+
+def asof_hizala(zaman, kaynak_zaman, degerler, gecikme=0):
+    """Her zaman damgası için o ana kadar bilinen son kaynak değeri (yoksa NaN).
+
+    gecikme: kaynak değerinin bar zamanından ne kadar sonra bilindiği (ns); günlük
+    kapanışlar gün içi barlara ertesi gün başından itibaren eşlenir.
+    """
+    konum = np.searchsorted(kaynak_zaman + gecikme if gecikme else kaynak_zaman, zaman, side='right') - 1
+    return np.where(konum >= 0, degerler[np.maximum(konum, 0)], np.nan)
+
+def hizala(zaman, makro, interval='1d'):
+    """Makro serileri `interval` aralıklı barların zamanlarına hizala: {ad: değerler}"""
+    sonuc = {}
+    for ad, seri in makro.items():
+        gecikme = GUN_NS if seri.interval == '1d' and interval != '1d' else 0
+        sonuc[ad] = asof_hizala(zaman, seri.zaman, seri.deger, gecikme)
+    return sonuc
+
+class MakroDeposu:
+    """Makro serileri süreç başına bir kez getirir ve salt okunur dizi olarak paylaştırır.
+
+    (ad, aralık) için en geniş getirilen kapsam tazelik süresince bellekte tutulur;
+    daha kısa periyot istekleri aynı dizinin searchsorted ile kesilmiş görünümünü
+    alır. Diskte kalıcılık VeriKatmani'nın Parquet deposundadır.
+    """
+
+    def __init__(self, veri=None, tazelik=15 * 60):
+        self._veri = veri
+        self.tazelik = tazelik
+        self.seriler_ = {}
+        self.kilit = threading.Lock()
+
+    @property
+    def veri(self):
+        if self._veri is None:
+            from veri_katmani import VeriKatmani
+            self._veri = VeriKatmani()
+        return self._veri
+
+    def seri(self, ad, period='5y', interval='1d'):
+        """Tek makro seri (MakroSeri) ya da alınamadıysa None"""
+        from veri_katmani import periyot_baslangici
+        baslangic = np.datetime64(periyot_baslangici(period), 'ns').view('int64')
+        anahtar = (ad, interval)
+
+        with self.kilit:
+            kayit = self.seriler_.get(anahtar)
+        if kayit is None or time.time() - kayit[0] > self.tazelik or kayit[1] > baslangic:
+            try:
+                df = self.veri.gecmis_getir(MAKRO_SEMBOLLERI[ad], period, interval)
+            except Exception as e:
+                print(f"⚠️ {ad} ({MAKRO_SEMBOLLERI[ad]}) alınamadı: {e}")
+                return None
+            if df is None or len(df) == 0:
+                return None
+            zaman = zaman_ns(df.index).copy()
+            deger = df['Close'].to_numpy(dtype=np.float64).copy()
+            # Paylaşılan diziler salt okunur: bir sembolün hesabı diğerlerini bozamaz
+            zaman.setflags(write=False)
+            deger.setflags(write=False)
+            kayit = (time.time(), baslangic, MakroSeri(zaman, deger, interval))
+            with self.kilit:
+                eski = self.seriler_.get(anahtar)
+                if eski is None or eski[1] >= baslangic or time.time() - eski[0] > self.tazelik:
+                    self.seriler_[anahtar] = kayit
+
+        seri = kayit[2]
+        bas = int(np.searchsorted(seri.zaman, baslangic))
+        return MakroSeri(seri.zaman[bas:], seri.deger[bas:], interval)
+
+    def seriler(self, period='5y', interval='1d', adlar=None):
+        """{ad: MakroSeri}; alınamayan seri atlanır"""
+        sonuc = {}
+        for ad in adlar or MAKRO_SEMBOLLERI:
+            seri = self.seri(ad, period, interval)
+            if seri is not None and len(seri.zaman) > 0:
+                sonuc[ad] = seri
+        return sonuc
+
+    def deger(self, ad, tarih, period='5y'):
+        """Verilen tarihte (gün sonu) bilinen son değer; yoksa None"""
+        seri = self.seri(ad, period)
+        if seri is None:
+            return None
+        zaman = np.datetime64(tarih, 'ns').view('int64')
+        # Aynı günün kapanışı dahil
+        sonuc = asof_hizala(np.array([zaman]), seri.zaman, seri.deger, -(GUN_NS - 1))[0]
+        return None if np.isnan(sonuc) else float(sonuc)
+
+# Süreç içi ortak örnek (eğitim, web ve menü aynı dizileri kullanır)
+_ortak = None
+_ortak_kilit = threading.Lock()
+
+def ortak_depo(veri=None):
+    """Süreç içi paylaşılan MakroDeposu; ilk çağrıdaki veri katmanı kullanılır"""
+    global _ortak
+    with _ortak_kilit:
+        if _ortak is None:
+            _ortak = MakroDeposu(veri)
+        elif _ortak._veri is None and veri is not None:
+            _ortak._veri = veri
+        return _ortak
+
+def main():
+    parser = argparse.ArgumentParser(description="Makro serileri (USD/TRY, BIST100) getir ve tarih için değer sorgula")
+    parser.add_argument('--periyot', default='5y')
+    parser.add_argument('--aralik', default='1d')
+    parser.add_argument('--tarih', help="Bu tarihteki değerleri göster (YYYY-MM-DD)")
+    args = parser.parse_args()
+
+    depo = MakroDeposu()
+    bas = time.perf_counter()
+    seriler = depo.seriler(args.periyot, args.aralik)
+    if not seriler:
+        print("❌ Makro seriler alınamadı")
+        return
+    print(f"✅ {len(seriler)} makro seri ({time.perf_counter() - bas:.2f} sn)")
+    for ad, seri in seriler.items():
+        ilk = np.datetime_as_string(seri.zaman[0].astype('datetime64[ns]'), unit='D')
+        son = np.datetime_as_string(seri.zaman[-1].astype('datetime64[ns]'), unit='D')
+        print(f"   {ad:10} {MAKRO_SEMBOLLERI[ad]:10} {len(seri.zaman):6} bar  {ilk} → {son}  son: {seri.deger[-1]:.4f}")
+
+    if args.tarih:
+        tarih = datetime.strptime(args.tarih, '%Y-%m-%d')
+        for ad in seriler:
+            deger = depo.deger(ad, tarih, args.periyot)
+            print(f"📅 {args.tarih} {ad}: {'-' if deger is None else f'{deger:.4f}'}")
+
+if __name__ == "__main__":
+    main()
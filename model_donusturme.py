@@ -0,0 +1,245 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Düşük Bellekli Çıkarım İçin Nicemlenmiş Model Dışa Aktarımı (TFLite / ONNX)
+Geliştiren: Çağatay Elaman
+"""
+
+import os
+import json
+import time
+import argparse
+import threading
+import numpy as np
+from datetime import datetime
+
+# run_analysis.py ile aynı özellik sütunları ve bölme
+RUN_ANALYSIS_OZELLIKLERI = ["Min", "Max", "aof", "Hacim", "Sermaye",
+                            "usd_try", "bist_100", "piyasa_degeri_tl", "halka_acık_pd_tl"]
+NICEMLEME_MODLARI = ('float16', 'dinamik', 'int8')
+
+def run_analysis_bolumu(yol="dnıs.xlsx", test_size=0.60, random_state=42):
+    """run_analysis.py'nin temizleme, bölme ve ölçekleme adımları: (x_egitim, x_test, y_test)"""
+    import pandas as pd
+    from sklearn.model_selection import train_test_split
+    from sklearn.preprocessing import MinMaxScaler
+
+    veri = pd.read_excel(yol)
+    for sutun in ("usd_try", "Kapanış", "Min", "Max", "aof"):
+        veri[sutun] = veri[sutun].str.replace(",", ".").astype(float)
+    veri["Hacim"] = veri["Hacim"].str.replace(".", "").astype(float)
+    veri = veri.dropna()
+
+    x_train, x_test, y_train, y_test = train_test_split(
+        veri[RUN_ANALYSIS_OZELLIKLERI].values, veri["Kapanış"].values,
+        test_size=test_size, random_state=random_state)
+    scaler = MinMaxScaler()
+    x_train = scaler.fit_transform(x_train)
+    return x_train.astype(np.float32), scaler.transform(x_test).astype(np.float32), y_test
+
+def kayit_bolumu(meta, model, veri_yolu="dnıs.xlsx"):
+    """Kayıt defteri sürümünün kendi özellik şemasıyla (x_egitim, x_test, y_test).
+
+    run_analysis şemasındaki sürümler run_analysis_bolumu'nu kullanır; model_egitimi
+    sürümlerinin satırları kayıtlı eğitim/test aralıklarından yeniden üretilir ve
+    sürümün ölçekleyicisiyle modelin beklediği ölçeğe getirilir.
+    """
+    import pandas as pd
+    from model_egitimi import OZELLIKLER, OZELLIK_SURUMU, HEDEF, MinMaxOlcekleyici, veri_seti
+
+    ozellikler = meta.get('ozellikler')
+    if ozellikler == RUN_ANALYSIS_OZELLIKLERI or \
+            (ozellikler is None and model.input_shape[-1] == len(RUN_ANALYSIS_OZELLIKLERI)):
+        if ozellikler is None:
+            print("⚠️  Sürümde özellik şeması yok; girdi boyutuna göre run_analysis şeması varsayıldı")
+        return run_analysis_bolumu(veri_yolu)
+    if ozellikler != list(OZELLIKLER):
+        raise ValueError(f"Desteklenmeyen özellik şeması: {ozellikler}")
+    if meta.get('ozellik_surumu') != OZELLIK_SURUMU:
+        raise ValueError(f"Sürüm özellik sürümü v{meta.get('ozellik_surumu')} ile eğitilmiş, "
+                         f"güncel özellikler v{OZELLIK_SURUMU}")
+
+    from veri_katmani import VeriKatmani
+    egitim_bas, egitim_son = (pd.Timestamp(t) for t in meta['egitim_araligi'])
+    test_bas, test_son = (pd.Timestamp(t) for t in meta['test_araligi'])
+    gun = (pd.Timestamp.now(tz=egitim_bas.tz) - egitim_bas).days + 2
+    tablolar = veri_seti(VeriKatmani(), meta['semboller'], f"{gun}d", meta.get('interval', '1d'))
+    if not tablolar:
+        raise ValueError("Sürümün sembolleri için veri yok")
+
+    tablo = pd.concat(tablolar.values()).dropna()
+    zaman = tablo.index
+    egitim = tablo[(zaman >= egitim_bas) & (zaman <= egitim_son)]
+    test = tablo[(zaman >= test_bas) & (zaman <= test_son)]
+    if len(egitim) == 0 or len(test) == 0:
+        raise ValueError("Sürümün eğitim/test aralığında eksiksiz satır yok")
+
+    olcekleyici = MinMaxOlcekleyici.sozlukten(meta['olcekleyici'])
+    return (olcekleyici.transform(egitim[list(OZELLIKLER)].to_numpy()),
+            olcekleyici.transform(test[list(OZELLIKLER)].to_numpy()), test[HEDEF].to_numpy())
+
+def tflite_donustur(model, hedef, mod='float16', temsil_verisi=None):
+    """Keras modelini nicemlenmiş TFLite dosyasına çevir.
+
+    float16: ağırlıklar yarım hassasiyet; dinamik: ağırlıklar int8, aktivasyonlar float;
+    int8: tam tamsayı (temsil_verisi ile aktivasyon aralıkları kalibre edilir).
+    """
+    import tensorflow as tf
+    if mod not in NICEMLEME_MODLARI:
+        raise ValueError(f"Geçersiz nicemleme modu: {mod} ({'/'.join(NICEMLEME_MODLARI)})")
+
+    donusturucu = tf.lite.TFLiteConverter.from_keras_model(model)
+    donusturucu.optimizations = [tf.lite.Optimize.DEFAULT]
+    if mod == 'float16':
+        donusturucu.target_spec.supported_types = [tf.float16]
+    elif mod == 'int8':
+        if temsil_verisi is None:
+            raise ValueError("int8 nicemleme için temsil verisi gerekli")
+        ornekler = np.asarray(temsil_verisi, dtype=np.float32)[:500]
+        donusturucu.representative_dataset = lambda: ([satir[None, :]] for satir in ornekler)
+        # Giriş/çıkış float kalır; iç katmanlar int8
+        donusturucu.target_spec.supported_ops = [tf.lite.OpsSet.TFLITE_BUILTINS_INT8,
+                                                 tf.lite.OpsSet.TFLITE_BUILTINS]
+
+    icerik = donusturucu.convert()
+    gecici = hedef + '.tmp'
+    with open(gecici, 'wb') as f:
+        f.write(icerik)
+    os.replace(gecici, hedef)
+    return hedef
+
+def onnx_donustur(model, hedef):
+    """Keras modelini ONNX'e çevir (tf2onnx gerekir)"""
+    import tensorflow as tf
+    import tf2onnx
+    imza = (tf.TensorSpec((None, model.input_shape[-1]), tf.float32, name='girdi'),)
+    tf2onnx.convert.from_keras(model, input_signature=imza, output_path=hedef)
+    return hedef
+
+class HafifModel:
+    """TFLite / ONNX modeli için Keras benzeri `predict` arayüzü.
+
+    TFLite için önce tflite_runtime (TensorFlow'suz), yoksa tf.lite kullanılır.
+    """
+
+    def __init__(self, yol):
+        self.yol = yol
+        if yol.endswith('.onnx'):
+            import onnxruntime
+            self.oturum = onnxruntime.InferenceSession(yol, providers=['CPUExecutionProvider'])
+            girdi = self.oturum.get_inputs()[0]
+            self.girdi_adi = girdi.name
+            self.input_shape = (None, girdi.shape[-1])
+            self.tur = 'onnx'
+            return
+
+        try:
+            from tflite_runtime.interpreter import Interpreter
+        except ImportError:
+            import tensorflow as tf
+            Interpreter = tf.lite.Interpreter
+        self.yorumlayici = Interpreter(model_path=yol, num_threads=1)
+        self.yorumlayici.allocate_tensors()
+        self.girdi = self.yorumlayici.get_input_details()[0]
+        self.cikti = self.yorumlayici.get_output_details()[0]
+        self.input_shape = (None, int(self.girdi['shape'][-1]))
+        # Yorumlayıcı iş parçacığı güvenli değil
+        self.kilit = threading.Lock()
+        self.boyut = 1
+        self.tur = 'tflite'
+
+    def predict(self, x, verbose=0):
+        x = np.ascontiguousarray(x, dtype=np.float32)
+        if self.tur == 'onnx':
+            return self.oturum.run(None, {self.girdi_adi: x})[0]
+
+        with self.kilit:
+            if len(x) != self.boyut:
+                self.yorumlayici.resize_tensor_input(self.girdi['index'], [len(x), x.shape[1]])
+                self.yorumlayici.allocate_tensors()
+                self.boyut = len(x)
+            self.yorumlayici.set_tensor(self.girdi['index'], x)
+            self.yorumlayici.invoke()
+            return self.yorumlayici.get_tensor(self.cikti['index']).copy()
+
+def _sure(model, x, tekrar=20):
+    model.predict(x, verbose=0)
+    bas = time.perf_counter()
+    for _ in range(tekrar):
+        model.predict(x, verbose=0)
+    return (time.perf_counter() - bas) / tekrar
+
+def karsilastir(model, hafif, x_test, y_test):
+    """Float ve nicemlenmiş modelin test MAE'si, birbirinden sapması ve çıkarım süresi"""
+    tam = model.predict(x_test, verbose=0).ravel()
+    nicem = hafif.predict(x_test).ravel()
+    return {
+        'test_ornek': int(len(y_test)),
+        'mae_float': float(np.mean(np.abs(tam - y_test))),
+        'mae_nicem': float(np.mean(np.abs(nicem - y_test))),
+        'en_buyuk_sapma': float(np.max(np.abs(tam - nicem))),
+        'sure_float_ms': _sure(model, x_test) * 1000,
+        'sure_nicem_ms': _sure(hafif, x_test) * 1000,
+        'boyut_nicem_kb': os.path.getsize(hafif.yol) / 1024
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Keras modelini nicemlenmiş TFLite/ONNX olarak dışa aktar ve MAE raporu üret")
+    parser.add_argument('--keras', default="Hisse_regresyon_analizi.keras", help="Kaynak .keras dosyası")
+    parser.add_argument('--kayit', nargs=2, metavar=('AD', 'SURUM'),
+                        help="Kayıt defterindeki sürümü dönüştür; çıktı sürüm klasörüne yazılır")
+    parser.add_argument('--bicim', choices=['tflite', 'onnx'], default='tflite')
+    parser.add_argument('--mod', choices=NICEMLEME_MODLARI, default='float16', help="TFLite nicemleme modu")
+    parser.add_argument('--veri', default="dnıs.xlsx", help="run_analysis şemalı modellerin test bölümü için veri")
+    args = parser.parse_args()
+
+    from tensorflow.keras.models import load_model
+    if args.kayit:
+        from model_kayit_defteri import ModelKayitDefteri
+        defter = ModelKayitDefteri()
+        meta = defter.meta(args.kayit[0], int(args.kayit[1]))
+        kaynak = defter.model_yolu(args.kayit[0], int(args.kayit[1]))
+    else:
+        kaynak = args.keras
+    model = load_model(kaynak)
+    print(f"🧠 Model yüklendi: {kaynak} ({model.count_params():,} parametre)")
+
+    if args.kayit:
+        try:
+            x_egitim, x_test, y_test = kayit_bolumu(meta, model, args.veri)
+        except ValueError as e:
+            print(f"❌ {args.kayit[0]} v{args.kayit[1]}: {e}")
+            return
+        print(f"📊 Sürümün test bölümü: {len(y_test)} örnek")
+    else:
+        x_egitim, x_test, y_test = run_analysis_bolumu(args.veri)
+        print(f"📊 run_analysis test bölümü: {len(y_test)} örnek")
+
+    klasor = os.path.dirname(kaynak)
+    if args.bicim == 'tflite':
+        hedef = os.path.join(klasor, 'model.tflite' if args.kayit else
+                             os.path.splitext(os.path.basename(kaynak))[0] + f"_{args.mod}.tflite")
+        tflite_donustur(model, hedef, args.mod, temsil_verisi=x_egitim)
+    else:
+        hedef = os.path.join(klasor, 'model.onnx' if args.kayit else
+                             os.path.splitext(os.path.basename(kaynak))[0] + ".onnx")
+        onnx_donustur(model, hedef)
+
+    rapor = karsilastir(model, HafifModel(hedef), x_test, y_test)
+    rapor.update({'kaynak': kaynak, 'hedef': hedef, 'bicim': args.bicim,
+                  'mod': args.mod if args.bicim == 'tflite' else None,
+                  'boyut_float_kb': os.path.getsize(kaynak) / 1024,
+                  'olusturma': datetime.now().isoformat(timespec='seconds')})
+    with open(os.path.splitext(hedef)[0] + '_rapor.json', 'w', encoding='utf-8') as f:
+        json.dump(rapor, f, ensure_ascii=False, indent=1)
+
+    print(f"\n💾 {hedef}")
+    print(f"   Boyut: {rapor['boyut_float_kb']:.1f} KB -> {rapor['boyut_nicem_kb']:.1f} KB")
+    print(f"   MAE (float): {rapor['mae_float']:.6f}")
+    print(f"   MAE ({args.mod if args.bicim == 'tflite' else 'onnx'}): {rapor['mae_nicem']:.6f} "
+          f"(fark: {rapor['mae_nicem'] - rapor['mae_float']:+.6f})")
+    print(f"   En büyük tahmin sapması: {rapor['en_buyuk_sapma']:.6f}")
+    print(f"   Çıkarım ({len(y_test)} örnek): {rapor['sure_float_ms']:.2f} ms -> {rapor['sure_nicem_ms']:.2f} ms")
+
+if __name__ == "__main__":
+    main()
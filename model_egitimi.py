@@ -0,0 +1,306 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Çok Sembollü Model Eğitimi ve Önbellekli Özellik Deposu
+Geliştiren: Çağatay Elaman
+"""
+
+import os
+import glob
+import time
+import hashlib
+import argparse
+import numpy as np
+import pandas as pd
+from datetime import datetime
+from concurrent.futures import ProcessPoolExecutor
+from gostergeler import GostergeHesaplayici
+from ohlcv_tipleri import zaman_ns
+from makro_deposu import MAKRO_SEMBOLLERI, ortak_depo, hizala, makro_adlari
+
+# Özellik hesabı değiştiğinde artırılır; eski önbellek dosyaları kullanılmaz
+OZELLIK_SURUMU = 2
+
+OZELLIKLER = (
+    'getiri_1', 'getiri_5', 'aralik', 'hacim_log', 'hacim_oran',
+    'ma20_fark', 'ma50_fark', 'rsi', 'bollinger_b', 'macd_hist', 'atr_oran',
+    'stoch_k', 'adx', 'usd_try', 'usd_try_getiri', 'bist_100_getiri'
+)
+# Hedef: bir sonraki barın kapanış getirisi
+HEDEF = 'hedef'
+
+# Model kayıt defteri kökü (model_kayit_defteri.KAYIT_KLASORU ile aynı)
+MODEL_KLASORU = os.path.join('Finansal_Veriler', 'Modeller')
+
+def _getiri(x, adim=1):
+    sonuc = np.full(len(x), np.nan)
+    if len(x) > adim:
+        sonuc[adim:] = x[adim:] / x[:-adim] - 1
+    return sonuc
+
+def makro_serileri(veri, period, interval='1d'):
+    """Makro seriler {ad: MakroSeri}; süreç içi ortak depodan (bir kez getirilir)"""
+    return ortak_depo(veri).seriler(period, interval)
+
+def ozellik_hesapla(df, makro, interval='1d'):
+    """OHLCV + makro serilerden özellik tablosu (float32, son satırın hedefi NaN)"""
+    h = GostergeHesaplayici.df_den(df)
+    g = h.hesapla(('ma20', 'ma50', 'rsi', 'bollinger', 'macd', 'atr', 'stokastik', 'adx'))
+    kapanis = h.seriler['close']
+    zaman = zaman_ns(df.index)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        ozellik = {
+            'getiri_1': _getiri(kapanis),
+            'getiri_5': _getiri(kapanis, 5),
+            'aralik': (h.seriler['high'] - h.seriler['low']) / kapanis,
+            'hacim_log': np.log1p(h.seriler['volume']),
+            'hacim_oran': h.seriler['volume'] / h.kayan_ortalama('volume', 20),
+            'ma20_fark': kapanis / g['ma20'] - 1,
+            'ma50_fark': kapanis / g['ma50'] - 1,
+            'rsi': g['rsi'] / 100,
+            'bollinger_b': (kapanis - g['lower_band']) / (g['upper_band'] - g['lower_band']),
+            'macd_hist': g['macd_hist'] / kapanis,
+            'atr_oran': g['atr'] / kapanis,
+            'stoch_k': g['stoch_k'] / 100,
+            'adx': g['adx'] / 100
+        }
+        hizali = hizala(zaman, makro, interval)
+        for ad in MAKRO_SEMBOLLERI:
+            seviye = hizali.get(ad)
+            if seviye is None:
+                seviye = np.full(len(zaman), np.nan)
+            if ad == 'usd_try':
+                ozellik['usd_try'] = seviye
+            ozellik[f"{ad}_getiri"] = _getiri(seviye)
+
+        hedef = np.full(len(kapanis), np.nan)
+        hedef[:-1] = kapanis[1:] / kapanis[:-1] - 1
+        ozellik[HEDEF] = hedef
+
+    tablo = pd.DataFrame({ad: ozellik[ad] for ad in OZELLIKLER + (HEDEF,)}, index=df.index)
+    return tablo.replace([np.inf, -np.inf], np.nan).astype(np.float32)
+
+class OzellikDeposu:
+    """(sembol, özellik sürümü, veri içeriği) anahtarlı özellik önbelleği (Parquet).
+
+    Anahtar OHLCV dizisinin ve makro serilerin içerik özetinden türetilir; gün içinde
+    tazelenen son bar, yeni temettü / bölünme veya makro kapanışı değişince anahtar da
+    değişir, veri değişmedikçe sembolün özellikleri yeniden hesaplanmaz.
+    """
+
+    def __init__(self, kok=os.path.join('Finansal_Veriler', 'Ozellikler')):
+        self.kok = kok
+
+    def _klasor(self, interval):
+        return os.path.join(self.kok, f"v{OZELLIK_SURUMU}", interval)
+
+    def anahtar(self, symbol, df, makro):
+        ozet = hashlib.sha1(f"{OZELLIK_SURUMU}|{symbol}".encode())
+        ozet.update(zaman_ns(df.index).tobytes())
+        sutunlar = [s for s in ('Open', 'High', 'Low', 'Close', 'Volume') if s in df.columns]
+        ozet.update('|'.join(sutunlar).encode())
+        ozet.update(np.ascontiguousarray(df[sutunlar].to_numpy(dtype=np.float64)).tobytes())
+        for ad in sorted(makro):
+            seri = makro[ad]
+            ozet.update(f"|{ad}|{seri.interval}".encode())
+            ozet.update(np.asarray(seri.zaman, dtype=np.int64).tobytes())
+            ozet.update(np.asarray(seri.deger, dtype=np.float64).tobytes())
+        return ozet.hexdigest()[:12]
+
+    def getir(self, symbol, df, interval, makro):
+        """Önbellekteki özellikleri döndür, yoksa hesaplayıp kaydet: (tablo, önbellekten_mi)"""
+        ad = symbol.replace('.IS', '').upper()
+        klasor = self._klasor(interval)
+        yol = os.path.join(klasor, f"{ad}_{self.anahtar(symbol, df, makro)}.parquet")
+        if os.path.exists(yol):
+            return pd.read_parquet(yol), True
+
+        tablo = ozellik_hesapla(df, makro, interval)
+        os.makedirs(klasor, exist_ok=True)
+        # Sembolün eski aralıklı dosyaları artık geçersiz
+        for eski in glob.glob(os.path.join(klasor, f"{ad}_*.parquet")):
+            os.remove(eski)
+        gecici = yol + '.tmp'
+        tablo.to_parquet(gecici)
+        os.replace(gecici, yol)
+        return tablo, False
+
+def veri_seti(veri, semboller, period='5y', interval='1d', depo=None):
+    """Semboller için özellik tablolarını topla: {sembol: tablo}"""
+    depo = depo or OzellikDeposu()
+    bas = time.perf_counter()
+    makro = makro_serileri(veri, period)
+
+    tablolar, hesaplanan = {}, 0
+    for symbol in semboller:
+        df = veri.gecmis_getir(symbol, period, interval)
+        if df is None or len(df) < 60:
+            print(f"⚠️ {symbol}: yetersiz veri, atlandı")
+            continue
+        tablolar[symbol], onbellekten = depo.getir(symbol, df, interval, makro)
+        hesaplanan += not onbellekten
+
+    print(f"📊 {len(tablolar)} sembol özellikleri hazır ({hesaplanan} hesaplandı, "
+          f"{len(tablolar) - hesaplanan} önbellekten, {time.perf_counter() - bas:.2f} sn)")
+    return tablolar
+
+def zaman_bolumu(tablo, test_orani=0.2):
+    """Eksik satırları at, tarihe göre eğitim/test diye böl (gelecek bilgisi sızmaz)"""
+    tablo = tablo.dropna()
+    if len(tablo) == 0:
+        raise ValueError("Eğitim için eksiksiz satır yok")
+    sinir = np.sort(tablo.index.values)[int(len(tablo) * (1 - test_orani))]
+    egitim, test = tablo[tablo.index < sinir], tablo[tablo.index >= sinir]
+    return (egitim[list(OZELLIKLER)].to_numpy(), egitim[HEDEF].to_numpy(),
+            test[list(OZELLIKLER)].to_numpy(), test[HEDEF].to_numpy(), egitim.index, test.index)
+
+class MinMaxOlcekleyici:
+    """Eğitim verisine göre 0-1 ölçekleme; parametreleri JSON olarak saklanabilir"""
+
+    def __init__(self, en_kucuk=None, aralik=None):
+        self.en_kucuk = None if en_kucuk is None else np.asarray(en_kucuk, dtype=np.float64)
+        self.aralik = None if aralik is None else np.asarray(aralik, dtype=np.float64)
+
+    def fit(self, x):
+        self.en_kucuk = np.min(x, axis=0).astype(np.float64)
+        aralik = np.max(x, axis=0) - self.en_kucuk
+        self.aralik = np.where(aralik > 0, aralik, 1.0)
+        return self
+
+    def transform(self, x):
+        return ((np.asarray(x, dtype=np.float64) - self.en_kucuk) / self.aralik).astype(np.float32)
+
+    def sozluk(self):
+        return {'en_kucuk': self.en_kucuk.tolist(), 'aralik': self.aralik.tolist()}
+
+    @classmethod
+    def sozlukten(cls, d):
+        return cls(d['en_kucuk'], d['aralik'])
+
+def model_olustur(girdi_boyutu):
+    """run_analysis.py ile aynı mimari (5 x Dense(5, relu) + Dense(1))"""
+    from tensorflow.keras.models import Sequential
+    from tensorflow.keras.layers import Dense, Input
+
+    model = Sequential([Input(shape=(girdi_boyutu,))] +
+                       [Dense(5, activation="relu") for _ in range(5)] + [Dense(1)])
+    model.compile(optimizer="adam", loss="mse")
+    return model
+
+def egit(x_egitim, y_egitim, x_test, y_test, epoch=95, tohum=42):
+    """Ölçekleyip modeli eğit; (model, ölçekleyici, metrikler) döndür"""
+    import tensorflow as tf
+    tf.random.set_seed(tohum)
+
+    olcekleyici = MinMaxOlcekleyici().fit(x_egitim)
+    model = model_olustur(x_egitim.shape[1])
+    model.fit(olcekleyici.transform(x_egitim), y_egitim, epochs=epoch, batch_size=256, verbose=0)
+
+    tahmin = model.predict(olcekleyici.transform(x_test), verbose=0).ravel()
+    metrikler = {
+        'mae': float(np.mean(np.abs(tahmin - y_test))),
+        'mse': float(np.mean((tahmin - y_test) ** 2)),
+        # Getiri yönünü doğru bilme oranı
+        'yon_isabeti': float(np.mean(np.sign(tahmin) == np.sign(y_test))),
+        'egitim_ornek': int(len(y_egitim)),
+        'test_ornek': int(len(y_test))
+    }
+    return model, olcekleyici, metrikler
+
+def model_kaydet(ad, model, olcekleyici, meta, klasor=MODEL_KLASORU, terfi=False):
+    """Modeli ölçekleyici ve özellik şemasıyla kayıt defterine yeni sürüm olarak kaydet"""
+    from model_kayit_defteri import ModelKayitDefteri
+    defter = ModelKayitDefteri(klasor)
+    surum = defter.kaydet(ad, model, dict(meta, olcekleyici=olcekleyici.sozluk(), ozellikler=list(OZELLIKLER),
+                                          ozellik_surumu=OZELLIK_SURUMU), terfi=terfi)
+    return defter.model_yolu(ad, surum), surum
+
+def _egitim_meta(semboller, egitim_index, test_index, metrikler, interval):
+    return {
+        'semboller': semboller,
+        'interval': interval,
+        'egitim_araligi': [str(egitim_index.min()), str(egitim_index.max())],
+        'test_araligi': [str(test_index.min()), str(test_index.max())],
+        'metrikler': metrikler,
+        'olusturma': datetime.now().isoformat(timespec='seconds')
+    }
+
+def havuz_egit(tablolar, interval='1d', epoch=95, test_orani=0.2, klasor=MODEL_KLASORU, terfi=False):
+    """Tüm sembollerin satırlarıyla tek (havuz) model eğit"""
+    tablo = pd.concat(tablolar.values())
+    x_egitim, y_egitim, x_test, y_test, egitim_index, test_index = zaman_bolumu(tablo, test_orani)
+    model, olcekleyici, metrikler = egit(x_egitim, y_egitim, x_test, y_test, epoch)
+    meta = _egitim_meta(list(tablolar), egitim_index, test_index, metrikler, interval)
+    yol, surum = model_kaydet(f"havuz_{interval}", model, olcekleyici, meta, klasor, terfi)
+    return dict(meta, yol=yol, surum=surum)
+
+def _sembol_egit(is_):
+    symbol, tablo, interval, epoch, test_orani, klasor, terfi = is_
+    # Her süreç tek iş parçacığı kullansın; paralellik süreçlerden gelir
+    import tensorflow as tf
+    tf.config.threading.set_intra_op_parallelism_threads(1)
+    tf.config.threading.set_inter_op_parallelism_threads(1)
+
+    x_egitim, y_egitim, x_test, y_test, egitim_index, test_index = zaman_bolumu(tablo, test_orani)
+    if len(y_egitim) < 50 or len(y_test) == 0:
+        return {'sembol': symbol, 'hata': 'yetersiz örnek'}
+    model, olcekleyici, metrikler = egit(x_egitim, y_egitim, x_test, y_test, epoch)
+    meta = _egitim_meta([symbol], egitim_index, test_index, metrikler, interval)
+    yol, surum = model_kaydet(f"{symbol.replace('.IS', '')}_{interval}", model, olcekleyici, meta, klasor, terfi)
+    return dict(meta, sembol=symbol, yol=yol, surum=surum)
+
+def sembol_bazli_egit(tablolar, interval='1d', epoch=95, test_orani=0.2, klasor=MODEL_KLASORU,
+                      max_workers=None, terfi=False):
+    """Her sembol için ayrı modeli süreç havuzunda paralel eğit"""
+    isler = [(s, t, interval, epoch, test_orani, klasor, terfi) for s, t in tablolar.items()]
+    max_workers = max_workers or min(len(isler), os.cpu_count() or 1)
+    if max_workers <= 1:
+        return [_sembol_egit(is_) for is_ in isler]
+    with ProcessPoolExecutor(max_workers=max_workers) as havuz:
+        return list(havuz.map(_sembol_egit, isler))
+
+def main():
+    parser = argparse.ArgumentParser(description="Yerel OHLCV deposundan çok sembollü model eğitimi")
+    parser.add_argument('semboller', nargs='*', help="örn: THYAO GARAN (boşsa depodaki tüm semboller)")
+    parser.add_argument('--mod', choices=['havuz', 'sembol'], default='havuz',
+                        help="havuz: tek ortak model, sembol: sembol başına model")
+    parser.add_argument('--periyot', default='5y')
+    parser.add_argument('--aralik', default='1d')
+    parser.add_argument('--epoch', type=int, default=95)
+    parser.add_argument('--test-orani', type=float, default=0.2)
+    parser.add_argument('--is-parcacigi', type=int, default=None, help="Sembol modunda paralel süreç sayısı")
+    parser.add_argument('--klasor', default=MODEL_KLASORU, help="Model kayıt defteri klasörü")
+    parser.add_argument('--terfi', action='store_true', help="Yeni sürümleri hemen aktif yap (web kesintisiz geçer)")
+    args = parser.parse_args()
+
+    from veri_katmani import VeriKatmani
+    veri = VeriKatmani()
+    semboller = [s if s.endswith('.IS') else f"{s.upper()}.IS" for s in args.semboller] or \
+        [f"{s}.IS" for s in veri.depo.semboller(args.aralik) if s not in makro_adlari() and '=' not in s]
+    if not semboller:
+        print("❌ Sembol verilmedi ve depoda kayıtlı sembol yok")
+        return
+
+    tablolar = veri_seti(veri, semboller, args.periyot, args.aralik)
+    if not tablolar:
+        print("❌ Eğitilecek veri yok")
+        return
+
+    bas = time.perf_counter()
+    if args.mod == 'havuz':
+        sonuclar = [havuz_egit(tablolar, args.aralik, args.epoch, args.test_orani, args.klasor, args.terfi)]
+    else:
+        sonuclar = sembol_bazli_egit(tablolar, args.aralik, args.epoch, args.test_orani,
+                                     args.klasor, args.is_parcacigi, args.terfi)
+    print(f"🧠 {len(sonuclar)} model eğitildi ({time.perf_counter() - bas:.2f} sn)")
+    for sonuc in sonuclar:
+        if 'hata' in sonuc:
+            print(f"   ❌ {sonuc['sembol']}: {sonuc['hata']}")
+            continue
+        m = sonuc['metrikler']
+        print(f"   💾 {sonuc['yol']} (v{sonuc['surum']})  MAE: {m['mae']:.5f}  "
+              f"Yön isabeti: %{m['yon_isabeti'] * 100:.1f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,239 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Sürümlü Model Kayıt Defteri ve Web İçin Kesintisiz Model Yenileme
+Geliştiren: Çağatay Elaman
+"""
+
+import os
+import json
+import shutil
+import argparse
+import threading
+import numpy as np
+from datetime import datetime
+from tahmin_onbellegi import TahminOnbellegi
+
+KAYIT_KLASORU = os.path.join('Finansal_Veriler', 'Modeller')
+
+class ModelKayitDefteri:
+    """Modelleri kok/<ad>/v<N>/ altında (model.keras + meta.json) sürümlü saklar.
+
+    Aktif sürüm kok/<ad>/aktif.json dosyasındadır ve atomik olarak değiştirilir;
+    yeni sürüm kaydetmek aktif sürümü değiştirmez, `terfi_et` gerekir.
+    """
+
+    def __init__(self, kok=KAYIT_KLASORU):
+        self.kok = kok
+        self.kilit = threading.Lock()
+
+    def _klasor(self, ad, surum=None):
+        yol = os.path.join(self.kok, ad)
+        return yol if surum is None else os.path.join(yol, f"v{surum}")
+
+    def adlar(self):
+        if not os.path.exists(self.kok):
+            return []
+        return sorted(ad for ad in os.listdir(self.kok) if os.path.isdir(os.path.join(self.kok, ad)))
+
+    def surumler(self, ad):
+        klasor = self._klasor(ad)
+        if not os.path.exists(klasor):
+            return []
+        return sorted(int(d[1:]) for d in os.listdir(klasor)
+                      if d.startswith('v') and d[1:].isdigit() and
+                      os.path.exists(os.path.join(klasor, d, 'meta.json')))
+
+    def kaydet(self, ad, model, meta, terfi=False):
+        """Yeni sürüm olarak kaydet (model: Keras modeli ya da .keras dosya yolu); sürüm no döndür"""
+        with self.kilit:
+            surum = max(self.surumler(ad), default=0) + 1
+            hedef = self._klasor(ad, surum)
+            gecici = hedef + '.tmp'
+            shutil.rmtree(gecici, ignore_errors=True)
+            os.makedirs(gecici)
+
+            model_yolu = os.path.join(gecici, 'model.keras')
+            if isinstance(model, str):
+                shutil.copy2(model, model_yolu)
+            else:
+                model.save(model_yolu)
+            meta = dict(meta, ad=ad, surum=surum, kayit=datetime.now().isoformat(timespec='seconds'))
+            with open(os.path.join(gecici, 'meta.json'), 'w', encoding='utf-8') as f:
+                json.dump(meta, f, ensure_ascii=False, indent=1)
+            # Yarım sürüm görünmesin: klasör hazır olunca adlandır
+            os.replace(gecici, hedef)
+
+        if terfi:
+            self.terfi_et(ad, surum)
+        return surum
+
+    def terfi_et(self, ad, surum):
+        """Sürümü aktif yap (geri almak için eski sürümü terfi ettirmek yeterli)"""
+        if surum not in self.surumler(ad):
+            raise ValueError(f"{ad} için v{surum} bulunamadı")
+        yol = os.path.join(self._klasor(ad), 'aktif.json')
+        gecici = yol + '.tmp'
+        with open(gecici, 'w', encoding='utf-8') as f:
+            json.dump({'surum': surum, 'terfi': datetime.now().isoformat(timespec='seconds')}, f)
+        os.replace(gecici, yol)
+
+    def aktif_surum(self, ad):
+        try:
+            with open(os.path.join(self._klasor(ad), 'aktif.json'), encoding='utf-8') as f:
+                return json.load(f)['surum']
+        except (OSError, ValueError, KeyError):
+            return None
+
+    def meta(self, ad, surum):
+        with open(os.path.join(self._klasor(ad, surum), 'meta.json'), encoding='utf-8') as f:
+            return json.load(f)
+
+    def model_yolu(self, ad, surum):
+        return os.path.join(self._klasor(ad, surum), 'model.keras')
+
+    def hafif_model_yolu(self, ad, surum):
+        """model_donusturme.py ile üretilmiş TFLite/ONNX dosyası (yoksa None)"""
+        for dosya in ('model.tflite', 'model.onnx'):
+            yol = os.path.join(self._klasor(ad, surum), dosya)
+            if os.path.exists(yol):
+                return yol
+        return None
+
+class YukluModel:
+    """Belleğe alınmış, ısıtılmış model sürümü (değiştirilmez; yenisiyle yer değiştirir)"""
+
+    def __init__(self, ad, surum, model, meta):
+        from model_egitimi import MinMaxOlcekleyici
+        self.ad = ad
+        self.surum = surum
+        self.model = model
+        self.meta = meta
+        self.ozellikler = meta.get('ozellikler', [])
+        olcekleyici = meta.get('olcekleyici')
+        self.olcekleyici = MinMaxOlcekleyici.sozlukten(olcekleyici) if olcekleyici else None
+
+    def tahmin(self, x, onbellek=None):
+        """Ham özellik satırları için tahmin; önbellek verilirse aynı ölçeklenmiş satır modele gitmez"""
+        x = np.atleast_2d(np.asarray(x, dtype=np.float64))
+        if self.olcekleyici is not None:
+            x = self.olcekleyici.transform(x)
+        x = x.astype(np.float32)
+        if onbellek is None:
+            return self._model_tahmini(x)
+        return onbellek.tahmin(self.ad, self.surum, x, self._model_tahmini)
+
+    def _model_tahmini(self, x):
+        return self.model.predict(x, verbose=0).ravel()
+
+class ModelSunucusu:
+    """Web işçisinde aktif model sürümlerini arka planda izler ve kesintisiz değiştirir.
+
+    Yeni sürüm ayrı iş parçacığında yüklenip örnek girdiyle ısıtılır, sonra tek
+    referans ataması ile devreye girer; eski sürümü kullanan istekler onunla biter.
+    """
+
+    def __init__(self, defter=None, kontrol_araligi=5.0, baslat=True, onbellek_boyutu=50000, hafif=True):
+        self.defter = defter or ModelKayitDefteri()
+        self.kontrol_araligi = kontrol_araligi
+        # Sürümün nicemlenmiş kopyası varsa TensorFlow yüklemeden onu kullan
+        self.hafif = hafif
+        self.modeller = {}
+        # Değişmeyen girdiler için tahminler modeli çağırmadan döner
+        self.onbellek = TahminOnbellegi(onbellek_boyutu)
+        self.hatalar = {}
+        self._durdur = threading.Event()
+        self._izleyici = None
+        if baslat:
+            self.baslat()
+
+    def baslat(self):
+        if self._izleyici is None:
+            self._izleyici = threading.Thread(target=self._izle, name="model-izleyici", daemon=True)
+            self._izleyici.start()
+
+    def durdur(self):
+        self._durdur.set()
+
+    def _izle(self):
+        while not self._durdur.is_set():
+            self.kontrol_et()
+            self._durdur.wait(self.kontrol_araligi)
+
+    def kontrol_et(self):
+        """Aktif sürümü değişen modelleri yükle ve devreye al"""
+        for ad in self.defter.adlar():
+            surum = self.defter.aktif_surum(ad)
+            mevcut = self.modeller.get(ad)
+            if surum is None or (mevcut is not None and mevcut.surum == surum) or \
+                    self.hatalar.get(ad, (None,))[0] == surum:
+                continue
+            try:
+                yuklu = self._yukle(ad, surum)
+            except Exception as e:
+                self.hatalar[ad] = (surum, str(e))
+                print(f"❌ Model yüklenemedi ({ad} v{surum}): {e}")
+                continue
+            # Sözlükte tek anahtar ataması: okuyanlar ya eskiyi ya yeniyi görür
+            self.modeller[ad] = yuklu
+            self.onbellek.gecersiz_kil(ad, surum)
+            self.hatalar.pop(ad, None)
+            print(f"🧠 Model devrede: {ad} v{surum}")
+
+    def _yukle(self, ad, surum):
+        meta = self.defter.meta(ad, surum)
+        hafif_yol = self.defter.hafif_model_yolu(ad, surum) if self.hafif else None
+        if hafif_yol is not None:
+            from model_donusturme import HafifModel
+            model = HafifModel(hafif_yol)
+        else:
+            from tensorflow.keras.models import load_model
+            model = load_model(self.defter.model_yolu(ad, surum))
+        yuklu = YukluModel(ad, surum, model, meta)
+        # Isıtma: ilk gerçek istekte grafik derleme gecikmesi yaşanmasın
+        yuklu.tahmin(np.zeros((1, model.input_shape[-1])))
+        return yuklu
+
+    def model(self, ad):
+        return self.modeller.get(ad)
+
+    def tahmin(self, model, x):
+        """Önbellekli tahmin (model: `model()` ile alınmış sürüm)"""
+        return model.tahmin(x, self.onbellek)
+
+    def ozet(self):
+        return {ad: {'surum': m.surum, 'metrikler': m.meta.get('metrikler')} for ad, m in self.modeller.items()}
+
+def main():
+    parser = argparse.ArgumentParser(description="Model kayıt defteri: sürümleri listele, terfi ettir, içe aktar")
+    parser.add_argument('--klasor', default=KAYIT_KLASORU)
+    alt = parser.add_subparsers(dest='komut', required=True)
+    alt.add_parser('liste', help="Modelleri ve sürümleri listele")
+    terfi = alt.add_parser('terfi', help="Sürümü aktif yap (geri alma için eski sürüm verilebilir)")
+    terfi.add_argument('ad')
+    terfi.add_argument('surum', type=int)
+    aktar = alt.add_parser('aktar', help="Mevcut bir .keras dosyasını yeni sürüm olarak kaydet")
+    aktar.add_argument('yol')
+    aktar.add_argument('ad')
+    aktar.add_argument('--terfi', action='store_true')
+    args = parser.parse_args()
+
+    defter = ModelKayitDefteri(args.klasor)
+    if args.komut == 'liste':
+        for ad in defter.adlar():
+            aktif = defter.aktif_surum(ad)
+            print(f"📦 {ad} (aktif: {'v' + str(aktif) if aktif else '-'})")
+            for surum in defter.surumler(ad):
+                meta = defter.meta(ad, surum)
+                mae = (meta.get('metrikler') or {}).get('mae')
+                print(f"   {'✅' if surum == aktif else '  '} v{surum}  {meta.get('kayit')}  "
+                      f"MAE: {'-' if mae is None else f'{mae:.5f}'}")
+    elif args.komut == 'terfi':
+        defter.terfi_et(args.ad, args.surum)
+        print(f"✅ {args.ad} v{args.surum} aktif")
+    else:
+        surum = defter.kaydet(args.ad, args.yol, {'kaynak': os.path.abspath(args.yol)}, terfi=args.terfi)
+        print(f"✅ {args.yol} -> {args.ad} v{surum}")
+
+if __name__ == "__main__":
+    main()
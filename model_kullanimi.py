@@ -6,21 +6,34 @@ Kaydedilen Keras Modelini Kullanma
 
 import pandas as pd
 import numpy as np
-from tensorflow.keras.models import load_model
 from sklearn.preprocessing import MinMaxScaler
+from model_kayit_defteri import ModelSunucusu, YukluModel
+
+MODEL_ADI = "Hisse_regresyon_analizi"
 
 print("=== Kaydedilen Model Kullanımı ===")
 
-# 1. Modeli yükle
+# 1. Modeli yükle: kayıt defterinde aktif sürüm varsa web ile aynı sunucu ve tahmin önbelleği
+# üzerinden (python model_kayit_defteri.py aktar Hisse_regresyon_analizi.keras Hisse_regresyon_analizi --terfi),
+# yoksa .keras dosyası doğrudan yüklenip yine aynı önbellekli yoldan kullanılır
 print("1. Model yükleniyor...")
-try:
-    model = load_model("Hisse_regresyon_analizi.keras")
-    print("✅ Model başarıyla yüklendi!")
+sunucu = ModelSunucusu(baslat=False)
+sunucu.kontrol_et()
+yuklu = sunucu.model(MODEL_ADI)
+if yuklu is not None:
+    print(f"✅ Model kayıt defterinden yüklendi: {MODEL_ADI} v{yuklu.surum}")
+else:
+    try:
+        from tensorflow.keras.models import load_model
+        yuklu = YukluModel(MODEL_ADI, 0, load_model(f"{MODEL_ADI}.keras"), {})
+        print("✅ Model başarıyla yüklendi!")
+    except Exception as e:
+        print(f"❌ Model yüklenirken hata: {e}")
+        exit()
+model = yuklu.model
+if hasattr(model, 'summary'):
     print(f"Model özeti:")
     model.summary()
-except Exception as e:
-    print(f"❌ Model yüklenirken hata: {e}")
-    exit()
 
 # 2. Örnek veri ile tahmin yap
 print("\n2. Örnek tahminler yapılıyor...")
@@ -49,10 +62,10 @@ for veri in ornek_veriler:
             norm_veri.append(deger / 20)   # Basit normalizasyon
     ornek_veriler_norm.append(norm_veri)
 
-# Tahminleri yap
+# Tahminleri yap: tüm örnekler tek toplu çağrıyla; önbellekte olan satırlar modele gitmez
 print("\n3. Tahmin sonuçları:")
-for i, (veri, norm_veri) in enumerate(zip(ornek_veriler, ornek_veriler_norm)):
-    tahmin = model.predict(np.array([norm_veri]), verbose=0)[0][0]
+tahminler = sunucu.tahmin(yuklu, np.array(ornek_veriler_norm))
+for i, (veri, tahmin) in enumerate(zip(ornek_veriler, tahminler)):
     print(f"Örnek {i+1}:")
     print(f"  Giriş verileri: {veri}")
     print(f"  Tahmin edilen kapanış: {tahmin:.2f}")
@@ -60,10 +73,14 @@ for i, (veri, norm_veri) in enumerate(zip(ornek_veriler, ornek_veriler_norm)):
 
 # 4. Model hakkında bilgi
 print("4. Model bilgileri:")
-print(f"- Model katman sayısı: {len(model.layers)}")
 print(f"- Giriş şekli: {model.input_shape}")
-print(f"- Çıkış şekli: {model.output_shape}")
-print(f"- Toplam parametre sayısı: {model.count_params():,}")
+if hasattr(model, 'layers'):
+    print(f"- Model katman sayısı: {len(model.layers)}")
+    print(f"- Çıkış şekli: {model.output_shape}")
+    print(f"- Toplam parametre sayısı: {model.count_params():,}")
+else:
+    print(f"- Hafif model ({model.tur}): {model.yol}")
+print(f"- Tahmin önbelleği: {sunucu.onbellek.istatistik()}")
 
 print("\n=== Model kullanımı tamamlandı! ===")
 print("💡 İpucu: Gerçek uygulamada scaler'ı da kaydetmeyi unutmayın!")
@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Monte Carlo Fiyat Yolu Simülasyonu (GBM ve Getiri Yeniden Örnekleme)
+Geliştiren: Çağatay Elaman
+"""
+
+import os
+import time
+import zlib
+import argparse
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+
+SIMULASYON_MODLARI = ('gbm', 'bootstrap')
+YUZDELIKLER = (5, 25, 50, 75, 95)
+# Dokunma olasılığı için varsayılan eşikler (son fiyata göre oran)
+ESIKLER = (-0.20, -0.10, -0.05, 0.05, 0.10, 0.20)
+
+def _tohum(tohum, symbol):
+    """Sembole özgü tohum: seri ve paralel çalıştırmada aynı yollar üretilir"""
+    return np.random.SeedSequence([tohum, zlib.crc32(symbol.encode())])
+
+def yollari_uret(kapanis, ufuk=60, yol_sayisi=20000, mod='gbm', tohum=42, parti=5000, pencere=252):
+    """Son fiyattan başlayan (yol_sayisi x ufuk) float32 fiyat matrisi.
+
+    gbm: log getirilerin ortalama/oynaklığı ile normal artışlar;
+    bootstrap: son `pencere` günlük log getirilerden iadeli örnekleme.
+    Bellek için yollar `parti` büyüklüğünde gruplar halinde üretilir.
+    """
+    if mod not in SIMULASYON_MODLARI:
+        raise ValueError(f"Geçersiz simülasyon modu: {mod} ({'/'.join(SIMULASYON_MODLARI)})")
+    kapanis = np.asarray(kapanis, dtype=np.float64)
+    kapanis = kapanis[~np.isnan(kapanis)]
+    getiri = np.diff(np.log(kapanis[-(pencere + 1):]))
+    if len(getiri) < 20:
+        raise ValueError("Simülasyon için yeterli geçmiş yok (en az 20 getiri)")
+
+    rng = np.random.default_rng(tohum)
+    ortalama, oynaklik = getiri.mean(), getiri.std(ddof=1)
+    yollar = np.empty((yol_sayisi, ufuk), dtype=np.float32)
+    for bas in range(0, yol_sayisi, parti):
+        n = min(parti, yol_sayisi - bas)
+        if mod == 'gbm':
+            artis = rng.normal(ortalama, oynaklik, (n, ufuk))
+        else:
+            artis = getiri[rng.integers(0, len(getiri), (n, ufuk))]
+        np.cumsum(artis, axis=1, out=artis)
+        yollar[bas:bas + n] = kapanis[-1] * np.exp(artis)
+    return kapanis[-1], yollar
+
+def yol_istatistikleri(son_fiyat, yollar, esikler=ESIKLER, yuzdelikler=YUZDELIKLER):
+    """Yüzdelik bantlar, dokunma olasılıkları ve vade sonu dağılımı"""
+    bantlar = np.percentile(yollar, yuzdelikler, axis=0)
+    esikler = np.asarray(esikler, dtype=np.float64)
+    seviyeler = son_fiyat * (1 + esikler)
+
+    # Yol boyunca en az bir kez seviyeye ulaşma: yukarı eşikler için yol maksimumu, aşağı için minimumu
+    yol_max = yollar.max(axis=1)[:, None]
+    yol_min = yollar.min(axis=1)[:, None]
+    dokunma = np.where(esikler > 0, (yol_max >= seviyeler).mean(axis=0), (yol_min <= seviyeler).mean(axis=0))
+
+    vade_getirisi = yollar[:, -1].astype(np.float64) / son_fiyat - 1
+    q05 = np.quantile(vade_getirisi, 0.05)
+    return {
+        'son_fiyat': son_fiyat,
+        'bantlar': {p: bant for p, bant in zip(yuzdelikler, bantlar)},
+        'esikler': esikler,
+        'seviyeler': seviyeler,
+        'dokunma': dokunma,
+        'beklenen_fiyat': float(yollar[:, -1].mean(dtype=np.float64)),
+        'yukselis_olasiligi': float((vade_getirisi > 0).mean()),
+        'var_95': float(-q05),
+        'cvar_95': float(-vade_getirisi[vade_getirisi <= q05].mean())
+    }
+
+def simule_et(symbol, kapanis, ufuk=60, yol_sayisi=20000, mod='gbm', tohum=42, esikler=ESIKLER):
+    """Tek sembol: yolları üret ve özetle (yol matrisi döndürülmez)"""
+    son_fiyat, yollar = yollari_uret(kapanis, ufuk, yol_sayisi, mod, _tohum(tohum, symbol))
+    sonuc = yol_istatistikleri(son_fiyat, yollar, esikler)
+    sonuc.update({'symbol': symbol, 'mod': mod, 'ufuk': ufuk, 'yol_sayisi': yol_sayisi})
+    return sonuc
+
+def _simule_et(is_):
+    symbol, kapanis, ufuk, yol_sayisi, mod, tohum, esikler = is_
+    try:
+        return simule_et(symbol, kapanis, ufuk, yol_sayisi, mod, tohum, esikler)
+    except ValueError as e:
+        return {'symbol': symbol, 'hata': str(e)}
+
+def evren_simulasyonu(veri, semboller, period='1y', ufuk=60, yol_sayisi=20000, mod='gbm', tohum=42,
+                      esikler=ESIKLER, max_workers=None):
+    """Semboller için simülasyon; veri ana süreçte okunur, hesap süreç havuzuna dağıtılır"""
+    isler = []
+    for symbol in semboller:
+        df = veri.gecmis_getir(symbol, period, '1d')
+        if df is not None and len(df):
+            isler.append((symbol, df['Close'].to_numpy(dtype=np.float64), ufuk, yol_sayisi, mod, tohum, esikler))
+    max_workers = max_workers or min(len(isler), os.cpu_count() or 1)
+    if max_workers <= 1:
+        return [_simule_et(is_) for is_ in isler]
+    with ProcessPoolExecutor(max_workers=max_workers) as havuz:
+        return list(havuz.map(_simule_et, isler))
+
+def main():
+    parser = argparse.ArgumentParser(description="Monte Carlo fiyat yolu simülasyonu (yüzdelik bantlar ve dokunma olasılıkları)")
+    parser.add_argument('semboller', nargs='*', help="örn: THYAO GARAN (boşsa depodaki tüm semboller)")
+    parser.add_argument('--mod', choices=SIMULASYON_MODLARI, default='gbm')
+    parser.add_argument('--ufuk', type=int, default=60, help="Simülasyon ufku (işlem günü)")
+    parser.add_argument('--yol', type=int, default=20000, help="Sembol başına yol sayısı")
+    parser.add_argument('--periyot', default='1y', help="Parametre tahmini için geçmiş")
+    parser.add_argument('--tohum', type=int, default=42)
+    parser.add_argument('--is-parcacigi', type=int, default=None, help="Paralel süreç sayısı (1: seri)")
+    args = parser.parse_args()
+
+    from veri_katmani import VeriKatmani
+    from makro_deposu import makro_adlari
+    veri = VeriKatmani()
+    semboller = [s if s.endswith('.IS') else f"{s.upper()}.IS" for s in args.semboller] or \
+        [f"{s}.IS" for s in veri.depo.semboller('1d') if s not in makro_adlari() and '=' not in s]
+    if not semboller:
+        print("❌ Sembol verilmedi ve depoda kayıtlı sembol yok")
+        return
+
+    bas = time.perf_counter()
+    sonuclar = evren_simulasyonu(veri, semboller, args.periyot, args.ufuk, args.yol, args.mod,
+                                 args.tohum, max_workers=args.is_parcacigi)
+    print(f"📊 {len(sonuclar)} sembol x {args.yol:,} yol x {args.ufuk} gün ({args.mod}, "
+          f"{time.perf_counter() - bas:.2f} sn)")
+
+    for sonuc in sonuclar:
+        if 'hata' in sonuc:
+            print(f"\n❌ {sonuc['symbol']}: {sonuc['hata']}")
+            continue
+        bantlar = sonuc['bantlar']
+        print(f"\n📈 {sonuc['symbol']}  son: {sonuc['son_fiyat']:.2f}  beklenen: {sonuc['beklenen_fiyat']:.2f}  "
+              f"yükseliş olasılığı: %{sonuc['yukselis_olasiligi'] * 100:.1f}")
+        print(f"   {args.ufuk}. gün bantları: " +
+              "  ".join(f"p{p}: {bant[-1]:.2f}" for p, bant in bantlar.items()))
+        print(f"   VaR95: %{sonuc['var_95'] * 100:.2f}  CVaR95: %{sonuc['cvar_95'] * 100:.2f}")
+        print("   Dokunma: " + "  ".join(f"{e:+.0%}: %{d * 100:.1f}" for e, d in zip(sonuc['esikler'], sonuc['dokunma'])))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Bellekte OHLCV Veri Tipi Politikası (float32 fiyat, int64 hacim, int64 zaman)
+Geliştiren: Çağatay Elaman
+"""
+
+import numpy as np
+import pandas as pd
+
+FIYAT_SUTUNLARI = ('Open', 'High', 'Low', 'Close')
+HACIM_SUTUNU = 'Volume'
+OHLCV_SUTUNLARI = FIYAT_SUTUNLARI + (HACIM_SUTUNU,)
+
+# Borsa fiyatları 2-3 ondalıklıdır; float32'nin ~7 anlamlı basamağı yeterli
+FIYAT_TIPI = np.float32
+HACIM_TIPI = np.int64
+# Birikimli toplamlar, varyans vb. için açıkça istenen hassas tip
+HASSAS_TIPI = np.float64
+
+def kompakt(df, ek_sutunlar=()):
+    """OHLCV çerçevesini bellek politikasına getir.
+
+    Fiyatlar float32, hacim int64 (eksik hacim 0), index saat dilimsiz
+    DatetimeIndex (içeride int64 ns) olur; OHLCV ve ek_sutunlar dışındaki
+    sütunlar (Dividends, Stock Splits ...) atılır. Zaten uygunsa kopya yapılmaz.
+    """
+    sutunlar = [c for c in OHLCV_SUTUNLARI + tuple(ek_sutunlar) if c in df.columns]
+    if list(df.columns) != sutunlar:
+        df = df[sutunlar]
+
+    tipler = {c: FIYAT_TIPI for c in FIYAT_SUTUNLARI if c in df.columns and df[c].dtype != FIYAT_TIPI}
+    if HACIM_SUTUNU in df.columns and df[HACIM_SUTUNU].dtype != HACIM_TIPI:
+        tipler[HACIM_SUTUNU] = HACIM_TIPI
+        if df[HACIM_SUTUNU].isna().any():
+            df = df.fillna({HACIM_SUTUNU: 0})
+    if tipler:
+        df = df.astype(tipler)
+
+    index = df.index
+    if isinstance(index, pd.DatetimeIndex) and (index.tz is not None or index.dtype != 'datetime64[ns]'):
+        if index.tz is not None:
+            index = index.tz_localize(None)
+        df = df.set_axis(index.as_unit('ns').rename(df.index.name or 'Date'), axis=0)
+    return df
+
+def hassas(dizi):
+    """Hassasiyet gerektiren hesaplar için float64'e açık yükseltme"""
+    return np.asarray(dizi, dtype=HASSAS_TIPI)
+
+def ondalik_geri(dizi):
+    """float32 değerleri en kısa ondalık gösterimleriyle float64'e çevir (64.16000366 -> 64.16).
+
+    Excel/JSON çıktısında float32 yuvarlama gürültüsü görünmesin diye kullanılır;
+    hesaplama için `hassas` daha hızlıdır.
+    """
+    dizi = np.asarray(dizi)
+    if dizi.dtype != np.float32:
+        return dizi
+    return dizi.astype(str).astype(HASSAS_TIPI)
+
+def zaman_ns(index):
+    """DatetimeIndex'i int64 epoch nanosaniye dizisine çevir (kopyasız görünüm)"""
+    return np.asarray(index.values).astype('datetime64[ns]').view(np.int64)
+
+def bellek_boyutu(df):
+    """Çerçevenin index dahil bellek kullanımı (bayt)"""
+    return int(df.memory_usage(index=True, deep=True).sum())
+
+def bar_basina_bayt():
+    """Politikaya göre bir OHLCV barının bayt cinsinden boyutu (zaman dahil)"""
+    return 4 * np.dtype(FIYAT_TIPI).itemsize + np.dtype(HACIM_TIPI).itemsize + 8
@@ -0,0 +1,263 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Çok Süreçli Web Dağıtımı İçin Ortak Bellek (mmap) Fiyat Paneli
+Geliştiren: Çağatay Elaman
+"""
+
+import os
+import json
+import time
+import shutil
+import argparse
+import threading
+import numpy as np
+import pandas as pd
+from datetime import datetime
+from veri_katmani import ARALIK_SANIYE, periyot_baslangici
+from ohlcv_tipleri import FIYAT_TIPI, HACIM_TIPI, OHLCV_SUTUNLARI, zaman_ns
+
+# /dev/shm varsa panel RAM'de tutulur; yoksa sayfa önbelleğindeki dosyalar paylaşılır
+VARSAYILAN_KLASOR = os.environ.get('FINANS_PANEL') or (
+    os.path.join('/dev/shm', 'finans_panel') if os.path.isdir('/dev/shm')
+    else os.path.join('Finansal_Veriler', 'Panel'))
+
+# Panel dizileri: tüm semboller uç uca eklenir, sembol i [ofset[i], ofset[i+1]) aralığındadır
+DIZILER = {
+    'zaman': np.int64,
+    'open': FIYAT_TIPI, 'high': FIYAT_TIPI, 'low': FIYAT_TIPI, 'close': FIYAT_TIPI,
+    'volume': HACIM_TIPI
+}
+SUTUN_ADLARI = dict(zip(('open', 'high', 'low', 'close', 'volume'), OHLCV_SUTUNLARI))
+
+# Yayından sonra silinmeden tutulan eski nesil sayısı (okuyan istekler bitebilsin diye)
+SAKLANAN_NESIL = 3
+
+def _meta_yolu(klasor, interval):
+    return os.path.join(klasor, f"panel_{interval}.json")
+
+def _meta_oku(klasor, interval):
+    try:
+        with open(_meta_yolu(klasor, interval), encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+def panel_yayinla(gecmisler, interval, baslangic, klasor=VARSAYILAN_KLASOR, yenileme=None):
+    """{sembol: OHLCV DataFrame} sözlüğünü yeni bir panel nesli olarak yaz ve sürümü artır.
+
+    Diziler yeni bir nesil klasörüne yazılır, ardından meta dosyası atomik olarak
+    değiştirilir; bağlı işçiler bir sonraki kontrolde yeni nesle geçer. yenileme
+    (sn) yükleyicinin yayın aralığıdır; işçiler paneli bayat saymak için kullanır.
+    """
+    eski = _meta_oku(klasor, interval)
+    surum = (eski['surum'] if eski else 0) + 1
+    nesil = f"{interval}_v{surum}"
+    hedef = os.path.join(klasor, nesil)
+    os.makedirs(hedef, exist_ok=True)
+
+    semboller = [s for s, df in gecmisler.items() if df is not None and len(df) > 0]
+    uzunluklar = [len(gecmisler[s]) for s in semboller]
+    ofsetler = np.concatenate(([0], np.cumsum(uzunluklar, dtype=np.int64)))
+    toplam = int(ofsetler[-1])
+
+    for ad, tip in DIZILER.items():
+        dizi = np.lib.format.open_memmap(os.path.join(hedef, f"{ad}.npy"), mode='w+', dtype=tip, shape=(toplam,))
+        for sembol, bas, son in zip(semboller, ofsetler[:-1], ofsetler[1:]):
+            df = gecmisler[sembol]
+            dizi[bas:son] = zaman_ns(df.index) if ad == 'zaman' else df[SUTUN_ADLARI[ad]].to_numpy()
+        dizi.flush()
+        del dizi
+    np.save(os.path.join(hedef, 'ofset.npy'), ofsetler)
+
+    meta = {
+        'surum': surum,
+        'nesil': nesil,
+        'interval': interval,
+        'baslangic': np.datetime64(baslangic, 'ns').astype(np.int64).item(),
+        'olusturma': time.time(),
+        'semboller': semboller,
+        'bar_sayisi': toplam,
+        'yenileme': yenileme
+    }
+    gecici = _meta_yolu(klasor, interval) + '.tmp'
+    with open(gecici, 'w', encoding='utf-8') as f:
+        json.dump(meta, f)
+    os.replace(gecici, _meta_yolu(klasor, interval))
+
+    _eski_nesilleri_sil(klasor, interval, surum)
+    return meta
+
+def _eski_nesilleri_sil(klasor, interval, surum):
+    """Son SAKLANAN_NESIL dışındaki nesilleri sil (eşlenmiş dosyalar açık kaldıkça geçerlidir)"""
+    onek = f"{interval}_v"
+    for ad in os.listdir(klasor):
+        if ad.startswith(onek) and ad[len(onek):].isdigit() and int(ad[len(onek):]) <= surum - SAKLANAN_NESIL:
+            shutil.rmtree(os.path.join(klasor, ad), ignore_errors=True)
+
+class _Nesil:
+    """Bir panel neslinin salt okunur eşlenmiş dizileri"""
+
+    def __init__(self, klasor, meta):
+        yol = os.path.join(klasor, meta['nesil'])
+        self.meta = meta
+        self.diziler = {ad: np.load(os.path.join(yol, f"{ad}.npy"), mmap_mode='r') for ad in DIZILER}
+        self.ofset = np.load(os.path.join(yol, 'ofset.npy'))
+        self.indeks = {sembol: i for i, sembol in enumerate(meta['semboller'])}
+
+    def pencere(self, symbol, baslangic_ns):
+        i = self.indeks.get(symbol)
+        if i is None:
+            return None
+        bas, son = int(self.ofset[i]), int(self.ofset[i + 1])
+        bas += int(np.searchsorted(self.diziler['zaman'][bas:son], baslangic_ns))
+        return {ad: dizi[bas:son] for ad, dizi in self.diziler.items()}
+
+class OrtakPanel:
+    """Web işçilerinin panele salt okunur bağlanması.
+
+    Meta dosyası en fazla `kontrol_araligi` saniyede bir kontrol edilir; sürüm
+    değiştiyse yeni nesil eşlenir. Eski neslin dizilerini tutan istekler
+    kopyasız okumaya devam eder.
+    """
+
+    def __init__(self, klasor=VARSAYILAN_KLASOR, kontrol_araligi=1.0):
+        self.klasor = klasor
+        self.kontrol_araligi = kontrol_araligi
+        self.nesiller = {}
+        self.kontroller = {}
+        self.kilit = threading.Lock()
+
+    def _nesil(self, interval):
+        simdi = time.time()
+        with self.kilit:
+            nesil = self.nesiller.get(interval)
+            if simdi - self.kontroller.get(interval, 0.0) < self.kontrol_araligi:
+                return nesil
+            self.kontroller[interval] = simdi
+
+            meta = _meta_oku(self.klasor, interval)
+            if meta is None:
+                self.nesiller.pop(interval, None)
+                return None
+            if nesil is None or nesil.meta['surum'] != meta['surum']:
+                try:
+                    nesil = _Nesil(self.klasor, meta)
+                except OSError:
+                    # Nesil yayın sırasında silinmiş olabilir; eldekiyle devam et
+                    return nesil
+                self.nesiller[interval] = nesil
+            return nesil
+
+    def surum(self, interval='1d'):
+        nesil = self._nesil(interval)
+        return nesil.meta['surum'] if nesil else None
+
+    def yenileme(self, interval='1d'):
+        """Yükleyicinin yayın aralığı (sn); tek seferlik yüklenmiş panelde None"""
+        nesil = self._nesil(interval)
+        return nesil.meta.get('yenileme') if nesil else None
+
+    def pencere(self, symbol, period='1mo', interval='1d', max_yas=None):
+        """Periyot başlangıcından itibaren sembolün kopyasız dizileri; panel kapsamıyorsa None"""
+        nesil = self._nesil(interval)
+        if nesil is None:
+            return None
+        if max_yas is not None and time.time() - nesil.meta['olusturma'] > max_yas:
+            return None
+        baslangic_ns = np.datetime64(periyot_baslangici(period), 'ns').astype(np.int64).item()
+        if baslangic_ns < nesil.meta['baslangic']:
+            return None
+        return nesil.pencere(symbol, baslangic_ns)
+
+    def ozet(self):
+        return {interval: {k: nesil.meta[k] for k in ('surum', 'olusturma', 'bar_sayisi')}
+                for interval, nesil in self.nesiller.items()}
+
+def pencere_df(pencere):
+    """Panel penceresinden kopyasız OHLCV DataFrame"""
+    index = pd.DatetimeIndex(pencere['zaman'].view('datetime64[ns]'), name='Date')
+    return pd.DataFrame({SUTUN_ADLARI[ad]: pencere[ad] for ad in SUTUN_ADLARI}, index=index, copy=False)
+
+class PanelliVeriKatmani:
+    """VeriKatmani arayüzü: önce ortak panel, kapsamıyorsa yerel VeriKatmani"""
+
+    def __init__(self, panel, veri):
+        self.panel = panel
+        self.veri = veri
+
+    @property
+    def tazelik(self):
+        return self.veri.tazelik
+
+    @property
+    def islemler(self):
+        return self.veri.islemler
+
+    def gecmis_getir(self, symbol, period='1mo', interval='1d', duzeltilmis=True):
+        # Panel düzeltilmiş barları tutar; ham barlar doğrudan veri katmanından
+        if not duzeltilmis:
+            return self.veri.gecmis_getir(symbol, period, interval, duzeltilmis=False)
+        # Yükleyici durmuşsa (iki yayın aralığı boyunca yeni nesil yoksa) bayat panel yerine
+        # yerel veri kullanılır; aralık bilinmiyorsa veri katmanının tazelik süresi esas alınır
+        yenileme = self.panel.yenileme(interval) or self.veri.tazelik[interval]
+        pencere = self.panel.pencere(symbol, period, interval, max_yas=2 * yenileme)
+        if pencere is not None and len(pencere['zaman']) > 0:
+            return pencere_df(pencere)
+        return self.veri.gecmis_getir(symbol, period, interval)
+
+def yukle(veri, semboller, period, interval, klasor=VARSAYILAN_KLASOR, yenileme=None):
+    """Sembollerin geçmişini VeriKatmani'ndan alıp paneli yayınla"""
+    bas = time.perf_counter()
+    gecmisler = {}
+    for symbol in semboller:
+        try:
+            gecmisler[symbol] = veri.gecmis_getir(symbol, period, interval)
+        except Exception as e:
+            print(f"❌ {symbol}: {e}")
+    meta = panel_yayinla(gecmisler, interval, periyot_baslangici(period), klasor, yenileme)
+    boyut = meta['bar_sayisi'] * sum(np.dtype(t).itemsize for t in DIZILER.values())
+    print(f"✅ Panel {interval} v{meta['surum']}: {len(meta['semboller'])} sembol, "
+          f"{meta['bar_sayisi']:,} bar, {boyut / 1024**2:.1f} MB ({time.perf_counter() - bas:.2f} sn)")
+    return meta
+
+def main():
+    parser = argparse.ArgumentParser(description="Web işçileri için ortak fiyat panelini doldur ve yenile")
+    parser.add_argument('semboller', nargs='*', help="örn: THYAO.IS GARAN.IS (boşsa depodaki tüm semboller)")
+    parser.add_argument('--aralik', nargs='+', default=['1d'], choices=list(ARALIK_SANIYE))
+    parser.add_argument('--periyot', default='1y', help="Panelde tutulacak geçmiş (örn: 1y, 5y)")
+    parser.add_argument('--klasor', default=VARSAYILAN_KLASOR)
+    parser.add_argument('--yenile', type=float, default=None,
+                        help="Saniye cinsinden yenileme aralığı (verilmezse bir kez yükler)")
+    parser.add_argument('--dogrula', action='store_true',
+                        help="Yayından önce depoyu işlem takvimine göre doğrula ve eksik aralıkları indir")
+    args = parser.parse_args()
+
+    from veri_katmani import VeriKatmani
+    veri = VeriKatmani()
+    semboller = args.semboller or [f"{s}.IS" for s in veri.depo.semboller('1d')]
+    if not semboller:
+        print("❌ Sembol verilmedi ve depoda kayıtlı sembol yok")
+        return
+    os.makedirs(args.klasor, exist_ok=True)
+    print(f"📂 Panel klasörü: {args.klasor}")
+    dogrulayici = None
+    if args.dogrula:
+        from veri_dogrulama import VeriDogrulayici
+        dogrulayici = VeriDogrulayici(veri)
+
+    while True:
+        for interval in args.aralik:
+            if dogrulayici is not None:
+                sorunlar = dogrulayici.dogrula(semboller, args.periyot, interval)
+                if len(sorunlar):
+                    sonuc = dogrulayici.tamamla(sorunlar, interval)
+                    print(f"🔄 {interval}: {len(sorunlar)} sorun, {sonuc['istek']} aralık yeniden indirildi ({sonuc['bar']:,} bar)")
+            yukle(veri, semboller, args.periyot, interval, args.klasor, args.yenile)
+        if args.yenile is None:
+            break
+        print(f"⏳ Sonraki yenileme: {datetime.fromtimestamp(time.time() + args.yenile).strftime('%H:%M:%S')}")
+        time.sleep(args.yenile)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,394 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Veri, Gösterge ve API Sıcak Yolları İçin Performans Ölçümleri
+Geliştiren: Çağatay Elaman
+"""
+
+import os
+import io
+import sys
+import json
+import glob
+import time
+import shutil
+import argparse
+import platform
+import tempfile
+import subprocess
+import contextlib
+import numpy as np
+import pandas as pd
+from datetime import datetime
+from veri_katmani import ARALIK_SANIYE, PERIYOT_GUN
+from ohlcv_tipleri import kompakt
+
+SONUC_KLASORU = os.path.join('Finansal_Veriler', 'Performans')
+
+# Ölçüm adı -> fonksiyon (ortam alır, zamanlanacak çağrıyı döndürür; None ise atlanır)
+OLCUMLER = {}
+
+def olcum(ad):
+    def kaydet(fonksiyon):
+        OLCUMLER[ad] = fonksiyon
+        return fonksiyon
+    return kaydet
+
+def periyot_gun(periyot):
+    """Periyot metnini gün sayısına çevir (PERIYOT_GUN + '20y' gibi yıllar)"""
+    if periyot in PERIYOT_GUN:
+        return PERIYOT_GUN[periyot]
+    if periyot.endswith('y') and periyot[:-1].isdigit():
+        return int(periyot[:-1]) * 366
+    raise ValueError(f"Geçersiz periyot: {periyot}")
+
+def zaman_ekseni(periyot, interval='1d'):
+    """Bugünde biten işlem zamanları (hafta içi; gün içi aralıklarda 10:00-18:00)"""
+    bitis = pd.Timestamp.now().normalize()
+    baslangic = bitis - pd.Timedelta(days=periyot_gun(periyot))
+    if interval == '1d':
+        return pd.bdate_range(baslangic, bitis, name='Date')
+    zaman = pd.date_range(baslangic, bitis + pd.Timedelta(days=1), freq=f"{ARALIK_SANIYE[interval]}s",
+                          inclusive='left', name='Date')
+    saat = zaman.hour + zaman.minute / 60
+    return zaman[(zaman.dayofweek < 5) & (saat >= 10) & (saat < 18)]
+
+def sentetik_ohlcv(sembol_sayisi, periyot='1y', interval='1d', tohum=42):
+    """Geometrik Brown hareketiyle {sembol: OHLCV DataFrame} üret"""
+    rng = np.random.default_rng(tohum)
+    index = zaman_ekseni(periyot, interval)
+    n = len(index)
+    oynaklik = 0.02 * np.sqrt(ARALIK_SANIYE[interval] / ARALIK_SANIYE['1d'])
+
+    getiri = rng.normal(0, oynaklik, (sembol_sayisi, n))
+    kapanis = rng.uniform(5, 500, (sembol_sayisi, 1)) * np.exp(np.cumsum(getiri, axis=1))
+    acilis = np.concatenate((kapanis[:, :1], kapanis[:, :-1]), axis=1) * (1 + rng.normal(0, oynaklik / 4, (sembol_sayisi, n)))
+    yuksek = np.maximum(acilis, kapanis) * (1 + np.abs(rng.normal(0, oynaklik / 2, (sembol_sayisi, n))))
+    dusuk = np.minimum(acilis, kapanis) * (1 - np.abs(rng.normal(0, oynaklik / 2, (sembol_sayisi, n))))
+    hacim = rng.lognormal(14, 1, (sembol_sayisi, n)).astype(np.int64)
+
+    return {
+        f"SNT{i:04d}.IS": kompakt(pd.DataFrame({
+            'Open': acilis[i], 'High': yuksek[i], 'Low': dusuk[i], 'Close': kapanis[i], 'Volume': hacim[i]
+        }, index=index))
+        for i in range(sembol_sayisi)
+    }
+
+def kayitli_ohlcv(sembol_sayisi, periyot='1y', interval='1d', depo=None):
+    """Depodaki gerçek geçmişleri tekrar oynat; sembol yetmezse döngüyle çoğalt"""
+    from gecmis_deposu import GecmisDeposu
+    depo = depo or GecmisDeposu()
+    semboller = depo.semboller(interval)
+    if not semboller:
+        raise ValueError(f"{depo.kok}/{interval} altında kayıtlı geçmiş yok (önce arsiv_sikistirma.py çalıştırın)")
+
+    baslangic = pd.Timestamp.now().normalize() - pd.Timedelta(days=periyot_gun(periyot))
+    gecmisler = {}
+    for sembol in semboller:
+        df = kompakt(depo.oku(sembol, interval, columns=['Open', 'High', 'Low', 'Close', 'Volume']))
+        # Tekrar oynatma: son barı bugüne kaydır ki periyot filtreleri gerçek gibi çalışsın
+        df = df.set_axis(df.index + (pd.Timestamp.now().normalize() - df.index[-1].normalize()), axis=0)
+        gecmisler[sembol] = df[df.index >= baslangic]
+
+    return {f"{semboller[i % len(semboller)]}_{i}.IS": gecmisler[semboller[i % len(semboller)]]
+            for i in range(sembol_sayisi)}
+
+class KayitliKaynak:
+    """VeriKatmani yerine ölçüm verisini döndüren kaynak (ağ ve disk erişimi yok)"""
+
+    def __init__(self, veri):
+        self.veri = veri
+        self.tazelik = {aralik: 10**9 for aralik in ARALIK_SANIYE}
+
+    def gecmis_getir(self, symbol, period='1mo', interval='1d'):
+        return self.veri[symbol]
+
+class Ortam:
+    """Bir ölçüm turunun verisi ve geçici çalışma klasörü"""
+
+    def __init__(self, veri, periyot, interval, gecici):
+        self.veri = veri
+        self.semboller = list(veri)
+        self.periyot = periyot
+        self.interval = interval
+        self.gecici = gecici
+
+    @contextlib.contextmanager
+    def klasorde(self, alt='calisma'):
+        """Göreli 'Finansal_Veriler' yollarını geçici klasöre yönlendir, çıktıları sustur"""
+        klasor = os.path.join(self.gecici, alt)
+        os.makedirs(klasor, exist_ok=True)
+        eski = os.getcwd()
+        os.chdir(klasor)
+        try:
+            with contextlib.redirect_stdout(io.StringIO()):
+                yield klasor
+        finally:
+            os.chdir(eski)
+
+# --- Ölçümler ---
+
+@olcum('gosterge.temel')
+def olc_gosterge_temel(ortam):
+    import gostergeler
+    return lambda: [gostergeler.hesapla(df) for df in ortam.veri.values()]
+
+@olcum('gosterge.tumu')
+def olc_gosterge_tumu(ortam):
+    import gostergeler
+    tumu = tuple(gostergeler.GOSTERGE_CIKTILARI)
+    return lambda: [gostergeler.hesapla(df, tumu) for df in ortam.veri.values()]
+
+@olcum('cekirdek.panel')
+def olc_cekirdek_panel(ortam):
+    import gosterge_cekirdekleri as cekirdek
+    # Panel için eşit uzunluk: en kısa geçmişin son barları
+    n = min(len(df) for df in ortam.veri.values())
+    if n < 2:
+        return None
+    kapanis = np.stack([df['Close'].to_numpy()[-n:] for df in ortam.veri.values()])
+    yuksek = np.stack([df['High'].to_numpy()[-n:] for df in ortam.veri.values()])
+    dusuk = np.stack([df['Low'].to_numpy()[-n:] for df in ortam.veri.values()])
+    return lambda: (cekirdek.wilder_rsi(kapanis), cekirdek.atr(yuksek, dusuk, kapanis),
+                    cekirdek.parabolic_sar(yuksek, dusuk))
+
+def _web(ortam):
+    """Veri kaynağı ölçüm verisine bağlanmış web analiz nesnesi"""
+    with ortam.klasorde('web'):
+        import web_app
+        from canli_seri import CanliSeriDeposu
+        web = web_app.FinansalAnalizWeb()
+    web.veri = KayitliKaynak(ortam.veri)
+    web.canli_seriler = CanliSeriDeposu(web.veri)
+    return web
+
+@olcum('web.teknik_analiz')
+def olc_web_teknik_analiz(ortam):
+    web = _web(ortam)
+    return lambda: [web.technical_analysis(s, ortam.periyot, ortam.interval) for s in ortam.semboller]
+
+@olcum('web.hisse_verisi')
+def olc_web_hisse_verisi(ortam):
+    web = _web(ortam)
+    return lambda: [web.get_stock_data(s, ortam.periyot, ortam.interval) for s in ortam.semboller]
+
+@olcum('web.json')
+def olc_web_json(ortam):
+    web = _web(ortam)
+    yanitlar = [web.technical_analysis(s, ortam.periyot, ortam.interval) for s in ortam.semboller]
+    return lambda: [json.dumps(yanit) for yanit in yanitlar]
+
+@olcum('kayit.excel_teknik')
+def olc_kayit_excel(ortam):
+    # Excel yazımı yavaş olduğundan en fazla 5 sembol
+    semboller = ortam.semboller[:5]
+    with ortam.klasorde('excel'):
+        from gelismis_veri_cekme import GelismisVeriCekici
+        cekici = GelismisVeriCekici()
+    cekici.veri = KayitliKaynak(ortam.veri)
+
+    def calistir():
+        with ortam.klasorde('excel'):
+            for s in semboller:
+                cekici.method4_teknik_analiz(s, ortam.periyot, ortam.interval)
+            # Arka plan yazımı da ölçüme dahil
+            cekici.aktarimlari_bekle()
+    return calistir
+
+@olcum('kayit.parquet')
+def olc_kayit_parquet(ortam):
+    from gecmis_deposu import GecmisDeposu
+    depo = GecmisDeposu(kok=os.path.join(ortam.gecici, 'Gecmis'))
+    return lambda: [depo.yaz(s, df, ortam.interval) for s, df in ortam.veri.items()]
+
+def _arsiv_hazirla(ortam, adet):
+    """Geçici klasöre düzenlenmemiş küçük Excel anlık görüntüleri yaz"""
+    klasor = os.path.join(ortam.gecici, 'arsiv')
+    if os.path.exists(klasor):
+        shutil.rmtree(klasor)
+    os.makedirs(klasor)
+    damga = datetime.now().strftime('%Y%m%d_%H%M')
+    for i, (s, df) in enumerate(list(ortam.veri.items())[:adet]):
+        df.tail(60).to_excel(os.path.join(klasor, f"{s.replace('.IS', '')}_detayli_veri_{damga}.xlsx"))
+    return klasor
+
+@olcum('duzenleme.katalog_tara')
+def olc_katalog_tara(ortam):
+    from arsiv_katalogu import ArsivKatalogu
+    klasor = _arsiv_hazirla(ortam, min(len(ortam.semboller), 50))
+    sayac = iter(range(10**9))
+    # Her turda boş veritabanıyla soğuk tarama
+    return lambda: ArsivKatalogu(kok=klasor, db_adi=f"katalog_{next(sayac)}.db").tara()
+
+@olcum('duzenleme.plan')
+def olc_duzenleme_plan(ortam):
+    klasor = _arsiv_hazirla(ortam, min(len(ortam.semboller), 50))
+    eski = os.getcwd()
+    os.chdir(klasor)
+    try:
+        from dosya_duzenleme import DosyaDuzenleyici
+        duzenleyici = DosyaDuzenleyici()
+    finally:
+        os.chdir(eski)
+
+    def calistir():
+        os.chdir(klasor)
+        try:
+            dosyalar = duzenleyici.find_excel_files()
+            hashes = {f: duzenleyici.katalog.dosya_hash(f) for f in dosyalar}
+            return duzenleyici.plan_files(dosyalar, hashes, 'atla')
+        finally:
+            os.chdir(eski)
+    return calistir
+
+@olcum('tahmin.model')
+def olc_tahmin_model(ortam):
+    try:
+        from tensorflow.keras.models import load_model
+    except ImportError:
+        return None
+    if not os.path.exists('Hisse_regresyon_analizi.keras'):
+        return None
+    model = load_model('Hisse_regresyon_analizi.keras')
+    girdi = np.random.default_rng(0).random((len(ortam.semboller), model.input_shape[-1])).astype(np.float32)
+    return lambda: model.predict(girdi, verbose=0)
+
+# --- Çalıştırma, kaydetme ve karşılaştırma ---
+
+def _ortam_bilgisi():
+    try:
+        import numba
+        numba_surumu = numba.__version__
+    except ImportError:
+        numba_surumu = None
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True,
+                                text=True, timeout=5).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        commit = None
+    return {
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'pandas': pd.__version__,
+        'numba': numba_surumu,
+        'platform': platform.platform(),
+        'islemci': os.cpu_count(),
+        'commit': commit
+    }
+
+def calistir(sembol_sayilari=(1, 10, 100), periyotlar=('1mo', '1y', '5y'), interval='1d',
+             kaynak='sentetik', secim=None, tekrar=5):
+    """Tüm ölçüm matrisini çalıştır: {'ortam': ..., 'sonuclar': {anahtar: {...}}}"""
+    sonuclar = {}
+    for periyot in periyotlar:
+        for sembol_sayisi in sembol_sayilari:
+            if kaynak == 'sentetik':
+                veri = sentetik_ohlcv(sembol_sayisi, periyot, interval)
+            else:
+                veri = kayitli_ohlcv(sembol_sayisi, periyot, interval)
+            bar_sayisi = sum(len(df) for df in veri.values())
+            print(f"\n📊 {sembol_sayisi} sembol x {periyot} ({interval}, {bar_sayisi:,} bar, {kaynak})")
+
+            gecici = tempfile.mkdtemp(prefix='performans_')
+            try:
+                ortam = Ortam(veri, periyot, interval, gecici)
+                for ad, fonksiyon in OLCUMLER.items():
+                    if secim and not any(ad.startswith(s) for s in secim):
+                        continue
+                    cagri = fonksiyon(ortam)
+                    if cagri is None:
+                        print(f"   ⏭️  {ad:<24} atlandı (bağımlılık ya da veri yok)")
+                        continue
+
+                    cagri()  # Isınma (içe aktarma, derleme, önbellek)
+                    sureler = []
+                    for _ in range(tekrar):
+                        bas = time.perf_counter()
+                        cagri()
+                        sureler.append((time.perf_counter() - bas) * 1000)
+
+                    anahtar = f"{ad}[{sembol_sayisi}x{periyot}/{interval}]"
+                    sonuclar[anahtar] = {
+                        'medyan_ms': float(np.median(sureler)),
+                        'en_az_ms': float(np.min(sureler)),
+                        'tekrar': tekrar,
+                        'sembol': sembol_sayisi,
+                        'bar': bar_sayisi
+                    }
+                    print(f"   ⏱️  {ad:<24} medyan {np.median(sureler):10.2f} ms   en az {np.min(sureler):10.2f} ms")
+            finally:
+                shutil.rmtree(gecici, ignore_errors=True)
+
+    return {'zaman': datetime.now().isoformat(timespec='seconds'), 'kaynak': kaynak,
+            'ortam': _ortam_bilgisi(), 'sonuclar': sonuclar}
+
+def kaydet(rapor, klasor=SONUC_KLASORU):
+    if not os.path.exists(klasor):
+        os.makedirs(klasor, exist_ok=True)
+    yol = os.path.join(klasor, f"olcum_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json")
+    with open(yol, 'w', encoding='utf-8') as f:
+        json.dump(rapor, f, indent=1, ensure_ascii=False)
+    return yol
+
+def son_rapor(klasor=SONUC_KLASORU, haric=None):
+    """Klasördeki en yeni ölçüm dosyası"""
+    dosyalar = sorted(f for f in glob.glob(os.path.join(klasor, 'olcum_*.json')) if f != haric)
+    return dosyalar[-1] if dosyalar else None
+
+def karsilastir(onceki, simdiki, esik=0.2):
+    """Ortak ölçümleri karşılaştır; esik oranından fazla yavaşlayanları döndür"""
+    print(f"\n📈 Karşılaştırma (eşik: %{esik * 100:.0f})")
+    print(f"   {'Ölçüm':<48}{'Önceki':>12}{'Şimdiki':>12}{'Değişim':>10}")
+    gerilemeler = []
+    ortak = [a for a in simdiki['sonuclar'] if a in onceki['sonuclar']]
+    if not ortak:
+        print("📭 Ortak ölçüm yok (sembol / periyot / aralık matrisleri farklı)")
+        return gerilemeler
+    for anahtar in ortak:
+        eski, yeni = onceki['sonuclar'][anahtar], simdiki['sonuclar'][anahtar]
+        oran = yeni['medyan_ms'] / eski['medyan_ms'] - 1 if eski['medyan_ms'] > 0 else 0.0
+        isaret = '⚠️ ' if oran > esik else ('✅' if oran < -esik else '  ')
+        print(f"{isaret} {anahtar:<48}{eski['medyan_ms']:>10.2f}ms{yeni['medyan_ms']:>10.2f}ms{oran * 100:>+9.1f}%")
+        if oran > esik:
+            gerilemeler.append(anahtar)
+
+    if gerilemeler:
+        print(f"\n❌ {len(gerilemeler)} ölçümde gerileme var")
+    else:
+        print("\n✅ Gerileme yok")
+    return gerilemeler
+
+def main():
+    parser = argparse.ArgumentParser(description="Gösterge, API, kayıt, düzenleme ve tahmin yollarının performans ölçümü")
+    parser.add_argument('--sembol', type=int, nargs='+', default=[1, 10, 100], help="Sembol sayıları (1-1000)")
+    parser.add_argument('--periyot', nargs='+', default=['1mo', '1y', '5y'], help="Periyotlar (1mo ... 20y)")
+    parser.add_argument('--aralik', default='1d', choices=list(ARALIK_SANIYE), help="Bar aralığı")
+    parser.add_argument('--kaynak', default='sentetik', choices=['sentetik', 'kayitli'],
+                        help="Sentetik veri ya da Finansal_Veriler/Gecmis altındaki geçmişin tekrarı")
+    parser.add_argument('--sadece', nargs='*', help="Yalnızca bu önekle başlayan ölçümler (örn: gosterge web)")
+    parser.add_argument('--tekrar', type=int, default=5, help="Ölçüm tekrarı")
+    parser.add_argument('--karsilastir', nargs='?', const='son', help="Önceki rapor ile karşılaştır (yol verilmezse en yenisi)")
+    parser.add_argument('--esik', type=float, default=0.2, help="Gerileme eşiği (0.2 = %%20 yavaşlama)")
+    parser.add_argument('--kaydetme', action='store_true', help="Sonuçları dosyaya yazma")
+    args = parser.parse_args()
+
+    rapor = calistir(args.sembol, args.periyot, args.aralik, args.kaynak, args.sadece, args.tekrar)
+
+    yol = None
+    if not args.kaydetme:
+        yol = kaydet(rapor)
+        print(f"\n💾 Sonuçlar kaydedildi: {yol}")
+
+    if args.karsilastir:
+        onceki_yol = son_rapor(haric=yol) if args.karsilastir == 'son' else args.karsilastir
+        if onceki_yol is None:
+            print("📭 Karşılaştırılacak önceki rapor yok")
+            return
+        with open(onceki_yol, encoding='utf-8') as f:
+            onceki = json.load(f)
+        print(f"📄 Önceki rapor: {onceki_yol} ({onceki['zaman']}, commit {onceki['ortam'].get('commit')})")
+        if karsilastir(onceki, rapor, args.esik):
+            sys.exit(1)
+
+if __name__ == "__main__":
+    main()
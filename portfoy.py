@@ -0,0 +1,227 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Portföy Analizi: Getiri, Oynaklık, VaR, Düşüş, Kayan Sharpe ve Etkin Sınır
+Geliştiren: Çağatay Elaman
+"""
+
+import time
+import argparse
+import threading
+import numpy as np
+from collections import OrderedDict
+from ohlcv_tipleri import zaman_ns
+
+YILLIK_GUN = 252
+
+class PortfoyAnalizi:
+    """Hizalanmış günlük getiri paneli üzerinde vektörel portföy hesapları.
+
+    Panel (sıralı semboller, periyot) başına veri tazeliği süresince bellekte tutulur
+    (en çok max_panel evren, en eski kullanılan atılır); aynı evren için ağırlık
+    değişiklikleri yalnızca matris çarpımı maliyetindedir.
+    """
+
+    def __init__(self, veri, tazelik=15 * 60, max_panel=32):
+        self.veri = veri
+        self.tazelik = tazelik
+        self.max_panel = max_panel
+        self.paneller = OrderedDict()
+        self.kilit = threading.Lock()
+
+    def panel(self, semboller, period='1y'):
+        """Ortak işlem günlerinde hizalanmış (zaman, getiri matrisi T x N, semboller).
+
+        Sütunlar sembollerin sıralı halindedir; dönen sembol listesi sütun sırasını verir.
+        """
+        semboller = sorted(set(semboller))
+        anahtar = (tuple(semboller), period)
+        with self.kilit:
+            kayit = self.paneller.get(anahtar)
+            if kayit is not None and time.time() - kayit[0] <= self.tazelik:
+                self.paneller.move_to_end(anahtar)
+                return kayit[1]
+
+        seriler, eksik = {}, []
+        for symbol in semboller:
+            df = self.veri.gecmis_getir(symbol, period, '1d')
+            if df is None or len(df) < 2:
+                eksik.append(symbol)
+            else:
+                seriler[symbol] = (zaman_ns(df.index), df['Close'].to_numpy(dtype=np.float64))
+        if eksik:
+            raise ValueError(f"Veri bulunamadı: {', '.join(eksik)}")
+
+        # Tüm sembollerde ortak olan günler (kesişim) üzerinden kapanış matrisi
+        ortak = seriler[semboller[0]][0]
+        for zaman, _ in seriler.values():
+            ortak = np.intersect1d(ortak, zaman, assume_unique=True)
+        if len(ortak) < 3:
+            raise ValueError("Semboller için yeterli ortak işlem günü yok")
+        kapanis = np.column_stack([fiyat[np.searchsorted(zaman, ortak)] for zaman, fiyat in seriler.values()])
+        getiri = kapanis[1:] / kapanis[:-1] - 1
+
+        sonuc = (ortak[1:], getiri, semboller)
+        with self.kilit:
+            self.paneller[anahtar] = (time.time(), sonuc)
+            self.paneller.move_to_end(anahtar)
+            while len(self.paneller) > self.max_panel:
+                self.paneller.popitem(last=False)
+        return sonuc
+
+    def analiz(self, agirliklar, period='1y', pencere=63, risksiz=0.0, sinir_orneklem=0, tohum=42):
+        """agirliklar: {sembol: ağırlık}; ağırlıklar toplamı 1 olacak şekilde ölçeklenir"""
+        zaman, getiri, semboller = self.panel(list(agirliklar), period)
+        w = np.asarray([agirliklar[s] for s in semboller], dtype=np.float64)
+        if w.sum() <= 0:
+            raise ValueError("Ağırlıkların toplamı pozitif olmalı")
+        w = w / w.sum()
+
+        sonuc = portfoy_metrikleri(getiri, w, pencere, risksiz)
+        sonuc['zaman'] = zaman
+        sonuc['semboller'] = semboller
+        sonuc['agirliklar'] = w
+        if sinir_orneklem:
+            sonuc['etkin_sinir'] = etkin_sinir(getiri, sinir_orneklem, risksiz, tohum)
+        return sonuc
+
+def _kayan(dizi, pencere):
+    """Kayan ortalama ve standart sapma (birikimli toplamlarla, O(n))"""
+    n = len(dizi)
+    ortalama = np.full(n, np.nan)
+    std = np.full(n, np.nan)
+    if n < pencere:
+        return ortalama, std
+    t1 = np.concatenate(([0.0], np.cumsum(dizi)))
+    t2 = np.concatenate(([0.0], np.cumsum(dizi * dizi)))
+    s1 = t1[pencere:] - t1[:-pencere]
+    s2 = t2[pencere:] - t2[:-pencere]
+    ortalama[pencere - 1:] = s1 / pencere
+    std[pencere - 1:] = np.sqrt(np.maximum(s2 - s1 * s1 / pencere, 0) / (pencere - 1))
+    return ortalama, std
+
+def portfoy_metrikleri(getiri, w, pencere=63, risksiz=0.0):
+    """Getiri matrisi (T x N) ve ağırlıklardan portföy metrikleri"""
+    r = getiri @ w
+    ortalama, std = r.mean(), r.std(ddof=1)
+    yillik_getiri = ortalama * YILLIK_GUN
+    yillik_oynaklik = std * np.sqrt(YILLIK_GUN)
+
+    # Tarihsel ve parametrik VaR / CVaR (günlük, pozitif kayıp olarak)
+    q95, q99 = np.quantile(r, [0.05, 0.01])
+    var = {
+        'tarihsel_95': -q95, 'tarihsel_99': -q99,
+        'parametrik_95': -(ortalama - 1.6449 * std), 'parametrik_99': -(ortalama - 2.3263 * std),
+        'cvar_95': -r[r <= q95].mean(), 'cvar_99': -r[r <= q99].mean()
+    }
+
+    kumulatif = np.cumprod(1 + r)
+    dusus = kumulatif / np.maximum.accumulate(kumulatif) - 1
+
+    kayan_ort, kayan_std = _kayan(r, pencere)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        kayan_sharpe = (kayan_ort * YILLIK_GUN - risksiz) / (kayan_std * np.sqrt(YILLIK_GUN))
+
+    # Risk katkısı: w_i * (Σw)_i / σ²
+    kovaryans = np.cov(getiri, rowvar=False).reshape(len(w), len(w))
+    marjinal = kovaryans @ w
+    varyans = w @ marjinal
+
+    return {
+        'yillik_getiri': yillik_getiri,
+        'yillik_oynaklik': yillik_oynaklik,
+        'sharpe': (yillik_getiri - risksiz) / yillik_oynaklik if yillik_oynaklik > 0 else np.nan,
+        'var': var,
+        'max_dusus': dusus.min(),
+        'toplam_getiri': kumulatif[-1] - 1,
+        'risk_katkisi': w * marjinal / varyans if varyans > 0 else np.full(len(w), np.nan),
+        'getiri': r,
+        'kumulatif': kumulatif,
+        'dusus': dusus,
+        'kayan_sharpe': kayan_sharpe
+    }
+
+def etkin_sinir(getiri, orneklem=5000, risksiz=0.0, tohum=42):
+    """Rastgele ağırlık vektörleri (Dirichlet) için getiri/oynaklık bulutu; tek matris çarpımı"""
+    rng = np.random.default_rng(tohum)
+    n = getiri.shape[1]
+    W = rng.dirichlet(np.ones(n), orneklem)
+
+    mu = getiri.mean(axis=0) * YILLIK_GUN
+    kovaryans = np.cov(getiri, rowvar=False).reshape(n, n) * YILLIK_GUN
+    getiriler = W @ mu
+    oynakliklar = np.sqrt(np.einsum('ij,ij->i', W @ kovaryans, W))
+    with np.errstate(divide='ignore', invalid='ignore'):
+        sharpe = (getiriler - risksiz) / oynakliklar
+
+    en_iyi = int(np.nanargmax(sharpe))
+    en_dusuk = int(np.argmin(oynakliklar))
+    return {
+        'getiri': getiriler, 'oynaklik': oynakliklar, 'sharpe': sharpe,
+        'max_sharpe': {'agirliklar': W[en_iyi], 'getiri': getiriler[en_iyi],
+                       'oynaklik': oynakliklar[en_iyi], 'sharpe': sharpe[en_iyi]},
+        'min_oynaklik': {'agirliklar': W[en_dusuk], 'getiri': getiriler[en_dusuk],
+                         'oynaklik': oynakliklar[en_dusuk], 'sharpe': sharpe[en_dusuk]}
+    }
+
+def agirlik_ayristir(metinler):
+    """['THYAO=0.4', 'GARAN', ...] -> {'THYAO.IS': 0.4, 'GARAN.IS': 1.0}"""
+    agirliklar = {}
+    for metin in metinler:
+        sembol, _, deger = metin.partition('=')
+        sembol = sembol.strip().upper()
+        if '.' not in sembol:
+            sembol += '.IS'
+        agirliklar[sembol] = float(deger) if deger else 1.0
+    return agirliklar
+
+def main():
+    parser = argparse.ArgumentParser(description="Portföy getirisi, risk metrikleri ve etkin sınır")
+    parser.add_argument('agirliklar', nargs='*',
+                        help="örn: THYAO=0.4 GARAN=0.3 AKBNK=0.3 (ağırlıksız: eşit; boşsa depodaki tüm semboller)")
+    parser.add_argument('--periyot', default='1y')
+    parser.add_argument('--pencere', type=int, default=63, help="Kayan Sharpe penceresi (gün)")
+    parser.add_argument('--risksiz', type=float, default=0.0, help="Yıllık risksiz getiri (örn: 0.45)")
+    parser.add_argument('--sinir', type=int, default=5000, help="Etkin sınır için rastgele portföy sayısı (0: kapalı)")
+    args = parser.parse_args()
+
+    from veri_katmani import VeriKatmani
+    from makro_deposu import makro_adlari
+    veri = VeriKatmani()
+    agirliklar = agirlik_ayristir(args.agirliklar) or \
+        {f"{s}.IS": 1.0 for s in veri.depo.semboller('1d') if s not in makro_adlari() and '=' not in s}
+    if not agirliklar:
+        print("❌ Sembol verilmedi ve depoda kayıtlı sembol yok")
+        return
+    analiz = PortfoyAnalizi(veri)
+
+    bas = time.perf_counter()
+    try:
+        sonuc = analiz.analiz(agirliklar, args.periyot, args.pencere, args.risksiz, args.sinir)
+    except ValueError as e:
+        print(f"❌ {e}")
+        return
+    sure = (time.perf_counter() - bas) * 1000
+
+    print(f"\n📊 Portföy ({args.periyot}, {len(sonuc['getiri'])} gün, {sure:.1f} ms)")
+    for sembol, w, katki in zip(sonuc['semboller'], sonuc['agirliklar'], sonuc['risk_katkisi']):
+        print(f"   {sembol:10} ağırlık %{w * 100:5.1f}   risk katkısı %{katki * 100:5.1f}")
+    print(f"\n   Yıllık getiri:    %{sonuc['yillik_getiri'] * 100:.2f}")
+    print(f"   Yıllık oynaklık:  %{sonuc['yillik_oynaklik'] * 100:.2f}")
+    print(f"   Sharpe:           {sonuc['sharpe']:.2f}")
+    print(f"   Toplam getiri:    %{sonuc['toplam_getiri'] * 100:.2f}")
+    print(f"   Maks. düşüş:      %{sonuc['max_dusus'] * 100:.2f}")
+    print(f"   Günlük VaR 95/99: %{sonuc['var']['tarihsel_95'] * 100:.2f} / %{sonuc['var']['tarihsel_99'] * 100:.2f} "
+          f"(CVaR95 %{sonuc['var']['cvar_95'] * 100:.2f})")
+
+    if 'etkin_sinir' in sonuc:
+        sinir = sonuc['etkin_sinir']
+        for baslik, nokta in (('En yüksek Sharpe', sinir['max_sharpe']), ('En düşük oynaklık', sinir['min_oynaklik'])):
+            dagilim = ', '.join(f"{s.replace('.IS', '')} %{w * 100:.0f}"
+                                for s, w in zip(sonuc['semboller'], nokta['agirliklar']))
+            print(f"\n🎯 {baslik}: getiri %{nokta['getiri'] * 100:.1f}, oynaklık %{nokta['oynaklik'] * 100:.1f}, "
+                  f"Sharpe {nokta['sharpe']:.2f}")
+            print(f"   {dagilim}")
+
+if __name__ == "__main__":
+    main()
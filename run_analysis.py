@@ -15,10 +15,11 @@ from tensorflow.keras.layers import Dense
 from sklearn.metrics import mean_absolute_error
 from sklearn.preprocessing import MinMaxScaler 
 from keras.optimizers import Adam
+from model_kayit_defteri import ModelKayitDefteri
 
 print("=== Finansal Veri Analizi ve Tahmin Projesi ===")
-    print("Geliştiren: Çağatay Elaman")
-    print()
+print("Geliştiren: Çağatay Elaman")
+print()
 
 # 1. Veri Yükleme
 print("1. Veri yükleniyor...")
@@ -92,9 +93,10 @@ print()
 print("4. Model eğitimi başlıyor...")
 
 # Veri setini hazırla
+ozellik_sutunlari = ["Min", "Max", "aof", "Hacim", "Sermaye",
+    "usd_try", "bist_100", "piyasa_degeri_tl", "halka_acık_pd_tl"]
 y_degeri = exel_verisi["Kapanış"].values
-x_degerleri = exel_verisi[[ "Min", "Max", "aof", "Hacim", "Sermaye",
-    "usd_try", "bist_100", "piyasa_degeri_tl", "halka_acık_pd_tl"]].values
+x_degerleri = exel_verisi[ozellik_sutunlari].values
 
 print(f"X değişkenleri boyutu: {x_degerleri.shape}")
 print(f"Y değişkeni boyutu: {y_degeri.shape}")
@@ -181,6 +183,20 @@ print("7. Model kaydediliyor...")
 model.save("Hisse_regresyon_analizi.keras")
 print("Model kaydedildi: Hisse_regresyon_analizi.keras")
 
+# Kayıt defterine yeni sürüm olarak ekle (önceki sürümler korunur, web kesintisiz geçer)
+defter = ModelKayitDefteri()
+surum = defter.kaydet("hisse_regresyon", "Hisse_regresyon_analizi.keras", {
+    "ozellikler": ozellik_sutunlari,
+    "olcekleyici": {
+        "en_kucuk": scaler.data_min_.tolist(),
+        "aralik": np.where(scaler.data_range_ > 0, scaler.data_range_, 1.0).tolist()
+    },
+    "metrikler": {"mae": float(mae), "egitim_mse": float(train_loss),
+                  "egitim_ornek": int(len(x_train)), "test_ornek": int(len(x_test))},
+    "veri": "dnıs.xlsx"
+}, terfi=True)
+print(f"Kayıt defterine eklendi: hisse_regresyon v{surum}")
+
 print()
 print("=== Analiz tamamlandı! ===")
 print("Sonuçlar:")
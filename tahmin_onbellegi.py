@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Özellik Vektörü Özetiyle Anahtarlanan Tahmin Önbelleği
+Geliştiren: Çağatay Elaman
+"""
+
+import hashlib
+import threading
+import numpy as np
+from collections import OrderedDict
+
+class TahminOnbellegi:
+    """(model adı, sürüm, ölçeklenmiş satırın özeti) -> tahmin; boyutu sınırlı LRU.
+
+    Her model için yalnızca güncel sürümün sonuçları saklanır. Sürüm değiştiğinde
+    `gecersiz_kil(ad, yeni_surum)` eski kayıtları atar; eski sürümle süren
+    istekler önbelleğe dokunmadan doğrudan modele gider.
+    """
+
+    def __init__(self, max_boyut=50000):
+        self.max_boyut = max_boyut
+        self.kayitlar = OrderedDict()
+        self.surumler = {}
+        self.kilit = threading.Lock()
+        self.isabet = 0
+        self.iska = 0
+
+    @staticmethod
+    def ozet(satir):
+        """float32 satırın baytlarından 128 bitlik özet"""
+        return hashlib.blake2b(np.ascontiguousarray(satir, dtype=np.float32).tobytes(), digest_size=16).digest()
+
+    def gecersiz_kil(self, ad, surum=None):
+        """Modelin kayıtlarını at (surum verilirse o sürüm dışındakileri)"""
+        with self.kilit:
+            self._gecersiz_kil(ad, surum)
+
+    def _gecersiz_kil(self, ad, surum):
+        for anahtar in [a for a in self.kayitlar if a[0] == ad and a[1] != surum]:
+            del self.kayitlar[anahtar]
+        if surum is None:
+            self.surumler.pop(ad, None)
+        else:
+            self.surumler[ad] = surum
+
+    def tahmin(self, ad, surum, x, hesapla):
+        """x (ölçeklenmiş, 2B) satırları için tahminler; yalnızca önbellekte olmayanlar tek
+        toplu çağrıyla `hesapla`ya gider"""
+        x = np.ascontiguousarray(x, dtype=np.float32)
+        with self.kilit:
+            guncel = self.surumler.setdefault(ad, surum)
+        if guncel != surum:
+            return np.asarray(hesapla(x), dtype=np.float64).ravel()
+
+        anahtarlar = [(ad, surum, self.ozet(satir)) for satir in x]
+        sonuc = np.empty(len(x), dtype=np.float64)
+        eksik = []
+
+        with self.kilit:
+            for i, anahtar in enumerate(anahtarlar):
+                deger = self.kayitlar.get(anahtar)
+                if deger is None:
+                    eksik.append(i)
+                else:
+                    self.kayitlar.move_to_end(anahtar)
+                    sonuc[i] = deger
+            self.isabet += len(x) - len(eksik)
+            self.iska += len(eksik)
+
+        if eksik:
+            hesaplanan = np.asarray(hesapla(x[eksik]), dtype=np.float64).ravel()
+            sonuc[eksik] = hesaplanan
+            with self.kilit:
+                # Hesap sürerken sürüm değiştiyse eski sonuçlar saklanmaz
+                if self.surumler.get(ad) == surum:
+                    for i, deger in zip(eksik, hesaplanan.tolist()):
+                        self.kayitlar[anahtarlar[i]] = deger
+                    while len(self.kayitlar) > self.max_boyut:
+                        self.kayitlar.popitem(last=False)
+        return sonuc
+
+    def istatistik(self):
+        with self.kilit:
+            toplam = self.isabet + self.iska
+            return {'boyut': len(self.kayitlar), 'isabet': self.isabet, 'iska': self.iska,
+                    'isabet_orani': round(self.isabet / toplam, 4) if toplam else None}
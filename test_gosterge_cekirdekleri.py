@@ -0,0 +1,32 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Gösterge Çekirdekleri: Döngü (Numba) ve NumPy Yollarının Eşdeğerliği
+Geliştiren: Çağatay Elaman
+"""
+
+import numpy as np
+import gosterge_cekirdekleri as gc
+
+def _nanli_panel(tohum=7):
+    rng = np.random.default_rng(tohum)
+    x = 100 * np.exp(np.cumsum(rng.normal(0, 0.02, (4, 300)), axis=1))
+    x[rng.random(x.shape) < 0.1] = np.nan
+    x[0, :20] = np.nan
+    x[1, 100:130] = np.nan
+    return x
+
+def test_ema_nan_esdegerligi():
+    # Döngü çekirdeği Numba yokken düz Python olarak da çalışır
+    x = _nanli_panel()
+    for alpha, min_periyot in ((2 / 13, 12), (1 / 14, 14), (0.5, 1)):
+        dongu = np.empty_like(x)
+        gc._ema_dongu(x, alpha, min_periyot, dongu)
+        np.testing.assert_allclose(gc._ema_numpy(x, alpha, min_periyot), dongu, rtol=1e-12, equal_nan=True)
+
+def test_ema_adx_nan_girdisi():
+    # Düz barlarda 0/0 -> NaN; sonraki Wilder değerleri iki yolda aynı olmalı
+    x = np.array([[1.0, 1.0, np.nan, 2.0, np.nan, np.nan, 3.0, 4.0, np.nan, 5.0]])
+    dongu = np.empty_like(x)
+    gc._ema_dongu(x, 1 / 3, 1, dongu)
+    np.testing.assert_allclose(gc._ema_numpy(x, 1 / 3, 1), dongu, rtol=1e-12, equal_nan=True)
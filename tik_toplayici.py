@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Canlı Fiyatlardan OHLCV Bar Üretimi (Tik Toplayıcı)
+Geliştiren: Çağatay Elaman
+"""
+
+import time
+import numpy as np
+import pandas as pd
+from veri_katmani import VeriKatmani, ARALIK_SANIYE
+
+class TikToplayici:
+    def __init__(self, depo=None, intervals=('1m', '5m', '15m', '1h'),
+                 max_sembol=64, kapasite=1024, toplu_yazma=200, yazma_suresi=60, veri=None):
+        # Barlar veri katmanı üzerinden yazılır; kapsam kaydı da genişler
+        self.veri = veri or VeriKatmani(depo)
+        self.depo = self.veri.depo
+        self.intervals = list(intervals)
+        self.genislikler = np.array([ARALIK_SANIYE[i] * 10**9 for i in self.intervals], dtype=np.int64)
+        self.max_sembol = max_sembol
+        self.toplu_yazma = toplu_yazma
+        self.yazma_suresi = yazma_suresi
+
+        self.semboller = {}
+        self.sembol_listesi = []
+
+        # Açık (henüz tamamlanmamış) barlar: [sembol, aralık]
+        boyut = (max_sembol, len(self.intervals))
+        self.aktif_kova = np.full(boyut, -1, dtype=np.int64)
+        self.aktif_acilis = np.zeros(boyut)
+        self.aktif_yuksek = np.zeros(boyut)
+        self.aktif_dusuk = np.zeros(boyut)
+        self.aktif_kapanis = np.zeros(boyut)
+        self.aktif_hacim = np.zeros(boyut, dtype=np.int64)
+        # İzleme bar ortasında başladıysa ilk bar eksiktir, depoya yazılmaz
+        self.aktif_kismi = np.ones(boyut, dtype=bool)
+        self.son_kumulatif_hacim = np.full(max_sembol, -1, dtype=np.int64)
+
+        # Tamamlanan barlar için halka tampon (depoya toplu yazılmayı bekler)
+        self.kapasite = kapasite
+        self.tampon_sembol = np.zeros(kapasite, dtype=np.int32)
+        self.tampon_aralik = np.zeros(kapasite, dtype=np.int32)
+        self.tampon_zaman = np.zeros(kapasite, dtype=np.int64)
+        self.tampon_ohlc = np.zeros((kapasite, 4))
+        self.tampon_hacim = np.zeros(kapasite, dtype=np.int64)
+        self.tampon_sayisi = 0
+        self.son_yazma = time.time()
+
+    def sembol_indeksi(self, symbol):
+        """Sembolü kaydet ve dizideki satırını döndür"""
+        indeks = self.semboller.get(symbol)
+        if indeks is None:
+            if len(self.semboller) >= self.max_sembol:
+                raise ValueError(f"En fazla {self.max_sembol} sembol izlenebilir")
+            indeks = len(self.semboller)
+            self.semboller[symbol] = indeks
+            self.sembol_listesi.append(symbol)
+        return indeks
+
+    def _tampona_ekle(self, satirlar, araliklar):
+        """Tamamlanan barları halka tampona kopyala, dolarsa depoya yaz"""
+        adet = len(satirlar)
+        if adet == 0:
+            return
+        if self.tampon_sayisi + adet > self.kapasite:
+            self.bosalt()
+
+        bas, son = self.tampon_sayisi, self.tampon_sayisi + adet
+        self.tampon_sembol[bas:son] = satirlar
+        self.tampon_aralik[bas:son] = araliklar
+        self.tampon_zaman[bas:son] = self.aktif_kova[satirlar, araliklar] * self.genislikler[araliklar]
+        self.tampon_ohlc[bas:son, 0] = self.aktif_acilis[satirlar, araliklar]
+        self.tampon_ohlc[bas:son, 1] = self.aktif_yuksek[satirlar, araliklar]
+        self.tampon_ohlc[bas:son, 2] = self.aktif_dusuk[satirlar, araliklar]
+        self.tampon_ohlc[bas:son, 3] = self.aktif_kapanis[satirlar, araliklar]
+        self.tampon_hacim[bas:son] = self.aktif_hacim[satirlar, araliklar]
+        self.tampon_sayisi = son
+
+    def ekle_toplu(self, semboller, fiyatlar, zaman=None, kumulatif_hacimler=None):
+        """Birden fazla sembolün aynı andaki fiyatlarını işle (her sembol bir kez)"""
+        if zaman is None:
+            zaman = pd.Timestamp.now(tz='Europe/Istanbul').tz_localize(None)
+        zaman_ns = pd.Timestamp(zaman).value
+
+        satirlar = np.array([self.sembol_indeksi(s) for s in semboller], dtype=np.int64)
+        fiyatlar = np.asarray(fiyatlar, dtype=np.float64)
+
+        # Günlük kümülatif hacimden tik hacmi (gün dönümünde sayaç sıfırlanır)
+        if kumulatif_hacimler is None:
+            hacim_farki = np.zeros(len(satirlar), dtype=np.int64)
+        else:
+            kumulatif = np.asarray(kumulatif_hacimler, dtype=np.int64)
+            onceki = self.son_kumulatif_hacim[satirlar]
+            hacim_farki = np.where(onceki < 0, 0, np.where(kumulatif >= onceki, kumulatif - onceki, kumulatif))
+            self.son_kumulatif_hacim[satirlar] = kumulatif
+
+        # Tüm aralıklar için kova numaraları: [tik, aralık]
+        kova = zaman_ns // self.genislikler[None, :]
+        kova = np.broadcast_to(kova, (len(satirlar), len(self.intervals)))
+        aktif = self.aktif_kova[satirlar]
+
+        yeni_bar = kova != aktif
+
+        # Kapanan barları (açık olanlar ve kısmi olmayanlar) tampona al
+        kapanan = yeni_bar & (aktif >= 0) & ~self.aktif_kismi[satirlar]
+        k_satir, k_aralik = np.nonzero(kapanan)
+        self._tampona_ekle(satirlar[k_satir], k_aralik)
+
+        # Yeni barları aç
+        y_satir, y_aralik = np.nonzero(yeni_bar)
+        y_sembol = satirlar[y_satir]
+        self.aktif_kismi[y_sembol, y_aralik] = self.aktif_kova[y_sembol, y_aralik] < 0
+        self.aktif_kova[y_sembol, y_aralik] = kova[y_satir, y_aralik]
+        self.aktif_acilis[y_sembol, y_aralik] = fiyatlar[y_satir]
+        self.aktif_yuksek[y_sembol, y_aralik] = fiyatlar[y_satir]
+        self.aktif_dusuk[y_sembol, y_aralik] = fiyatlar[y_satir]
+        self.aktif_hacim[y_sembol, y_aralik] = 0
+
+        # Açık barları güncelle
+        f = fiyatlar[:, None]
+        self.aktif_yuksek[satirlar] = np.maximum(self.aktif_yuksek[satirlar], f)
+        self.aktif_dusuk[satirlar] = np.minimum(self.aktif_dusuk[satirlar], f)
+        self.aktif_kapanis[satirlar] = f
+        self.aktif_hacim[satirlar] += hacim_farki[:, None]
+
+        if self.tampon_sayisi >= self.toplu_yazma or time.time() - self.son_yazma >= self.yazma_suresi:
+            self.bosalt()
+
+    def ekle(self, symbol, fiyat, zaman=None, kumulatif_hacim=None):
+        """Tek bir sembolün fiyatını işle"""
+        self.ekle_toplu([symbol], [fiyat], zaman,
+                        None if kumulatif_hacim is None else [kumulatif_hacim])
+
+    def bosalt(self):
+        """Tampondaki tamamlanmış barları depoya toplu yaz (veri katmanının kapsamı güncellenir)"""
+        adet = self.tampon_sayisi
+        self.son_yazma = time.time()
+        if adet == 0:
+            return 0
+
+        sembol = self.tampon_sembol[:adet]
+        aralik = self.tampon_aralik[:adet]
+        ohlc = self.tampon_ohlc[:adet]
+        for s, a in set(zip(sembol.tolist(), aralik.tolist())):
+            secim = (sembol == s) & (aralik == a)
+            df = pd.DataFrame({
+                'Open': ohlc[secim, 0],
+                'High': ohlc[secim, 1],
+                'Low': ohlc[secim, 2],
+                'Close': ohlc[secim, 3],
+                'Volume': self.tampon_hacim[:adet][secim]
+            }, index=pd.DatetimeIndex(self.tampon_zaman[:adet][secim].astype('datetime64[ns]'), name='Date'))
+            self.veri.canli_ekle(self.sembol_listesi[s], self.intervals[a], df)
+
+        self.tampon_sayisi = 0
+        return adet
+
+    def acik_bar(self, symbol, interval):
+        """Sembolün o aralıktaki açık (tamamlanmamış) barı"""
+        s = self.semboller.get(symbol)
+        a = self.intervals.index(interval)
+        if s is None or self.aktif_kova[s, a] < 0:
+            return None
+        return {
+            'zaman': pd.Timestamp(int(self.aktif_kova[s, a] * self.genislikler[a])),
+            'open': float(self.aktif_acilis[s, a]),
+            'high': float(self.aktif_yuksek[s, a]),
+            'low': float(self.aktif_dusuk[s, a]),
+            'close': float(self.aktif_kapanis[s, a]),
+            'volume': int(self.aktif_hacim[s, a])
+        }
@@ -0,0 +1,314 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Boşluk Duyarlı Veri Doğrulama (Eksik Seans, Tekrar, Sıfır Hacim) ve Hedefli Yeniden İndirme
+Geliştiren: Çağatay Elaman
+"""
+
+import os
+import json
+import time
+import argparse
+import threading
+import numpy as np
+import pandas as pd
+from datetime import datetime, timedelta
+from ohlcv_tipleri import FIYAT_SUTUNLARI, HACIM_SUTUNU, OHLCV_SUTUNLARI, zaman_ns
+from islem_takvimi import IslemTakvimi
+
+# Sorun türleri: yeniden indirilerek giderilebilenler ve yerelde onarılanlar
+INDIRILECEK_TURLER = ('eksik_seans', 'eksik_son', 'ic_bosluk', 'sifir_hacim', 'eksik_deger', 'fiyat_tutarsiz')
+ONARILACAK_TURLER = ('tekrar', 'sirasiz')
+SORUN_TURLERI = INDIRILECEK_TURLER + ONARILACAK_TURLER + ('tatil_bari',)
+
+def _bos_sorunlar():
+    return pd.DataFrame({'symbol': pd.Series(dtype=object), 'tur': pd.Series(dtype=object),
+                         'baslangic': pd.Series(dtype='datetime64[ns]'),
+                         'bitis': pd.Series(dtype='datetime64[ns]'), 'adet': pd.Series(dtype=np.int64)})
+
+def _ardisik_gruplar(maske, kimlik, zaman):
+    """İşaretli barları sembol içinde ardışık koşulara topla: (kimlik, ilk zaman, son zaman, adet)"""
+    idx = np.flatnonzero(maske)
+    if len(idx) == 0:
+        return idx, idx, idx, idx
+    yeni = np.ones(len(idx), dtype=bool)
+    yeni[1:] = (np.diff(idx) != 1) | (kimlik[idx[1:]] != kimlik[idx[:-1]])
+    baslar = np.flatnonzero(yeni)
+    sonlar = np.append(baslar[1:], len(idx)) - 1
+    return kimlik[idx[baslar]], zaman[idx[baslar]], zaman[idx[sonlar]], sonlar - baslar + 1
+
+def panel_dogrula(gecmisler, interval='1d', takvim=None, bitis=None, ic_esik=1.5):
+    """Tüm sembollerin barlarını tek geçişte denetle; sorun başına bir satırlık tablo döndür.
+
+    gecmisler: {sembol: OHLCV çerçevesi}. Barlar tek bir dizide uç uca eklenir ve
+    sembol kimliğiyle ayrılır; her denetim bu dizilerde vektörel bir maskedir.
+    Eksik seanslar takvimdeki işlem günü sıra numaralarının farkından bulunur.
+    bitis: bu işlem gününe kadar veri beklenir ('eksik_son'); None ise denetlenmez.
+    ic_esik: gün içi ardışık barlar arasında aralık genişliğinin bu katından büyük boşluk 'ic_bosluk'tur.
+    """
+    takvim = takvim or IslemTakvimi()
+    semboller = [s for s, df in gecmisler.items() if df is not None and len(df)]
+    if not semboller:
+        return _bos_sorunlar()
+
+    cerceveler = [gecmisler[s] for s in semboller]
+    kimlik = np.repeat(np.arange(len(semboller)), [len(df) for df in cerceveler])
+    zaman = np.concatenate([zaman_ns(df.index) for df in cerceveler])
+    fiyat = {c: np.concatenate([df[c].to_numpy(dtype=np.float64) for df in cerceveler]) for c in FIYAT_SUTUNLARI}
+    hacim = np.concatenate([df[HACIM_SUTUNU].to_numpy(dtype=np.float64) for df in cerceveler])
+    gun = zaman.astype('datetime64[ns]').astype('datetime64[D]')
+
+    ayni = np.zeros(len(zaman), dtype=bool)
+    ayni[1:] = kimlik[1:] == kimlik[:-1]
+    fark = np.zeros(len(zaman), dtype=np.int64)
+    fark[1:] = np.diff(zaman)
+    islem_gunu = takvim.islem_gunu_mu(gun)
+
+    # Hacmi hiç olmayan seriler (döviz, bazı endeksler) sıfır hacim denetiminden muaf
+    hacimli = np.bincount(kimlik, weights=(hacim > 0), minlength=len(semboller)) > 0
+    acilis, yuksek, dusuk, kapanis = (fiyat[c] for c in FIYAT_SUTUNLARI)
+    with np.errstate(invalid='ignore'):
+        eksik_deger = np.isnan(acilis) | np.isnan(yuksek) | np.isnan(dusuk) | np.isnan(kapanis) | np.isnan(hacim)
+        tutarsiz = ~eksik_deger & ((yuksek < dusuk) | (kapanis > yuksek) | (kapanis < dusuk) |
+                                   (acilis > yuksek) | (acilis < dusuk) | (dusuk <= 0))
+    maskeler = {
+        'tekrar': ayni & (fark == 0),
+        'sirasiz': ayni & (fark < 0),
+        'eksik_deger': eksik_deger,
+        'fiyat_tutarsiz': tutarsiz,
+        'sifir_hacim': hacimli[kimlik] & (hacim == 0) & islem_gunu,
+        'tatil_bari': ~islem_gunu
+    }
+    parcalar = []
+    for tur, maske in maskeler.items():
+        k, bas, bit, adet = _ardisik_gruplar(maske, kimlik, zaman)
+        parcalar.append((k, np.full(len(k), tur, dtype=object), bas, bit, adet))
+
+    if interval != '1d':
+        # Gün içi boşluk: aynı gündeki ardışık iki bar arası; adet eksik bar sayısıdır
+        from veri_katmani import ARALIK_SANIYE
+        genislik = ARALIK_SANIYE[interval] * 10**9
+        ic = np.flatnonzero(ayni & (gun == np.roll(gun, 1)) & (fark > ic_esik * genislik))
+        parcalar.append((kimlik[ic], np.full(len(ic), 'ic_bosluk', dtype=object), zaman[ic - 1] + genislik,
+                         zaman[ic] - genislik, np.rint(fark[ic] / genislik).astype(np.int64) - 1))
+
+    # Eksik seanslar: işlem günü barlarının sıra numaraları sembol içinde 1'den fazla artıyorsa
+    ig = np.flatnonzero(islem_gunu)
+    sira = takvim.sira(gun[ig])
+    ig_ayni = np.zeros(len(ig), dtype=bool)
+    ig_ayni[1:] = kimlik[ig[1:]] == kimlik[ig[:-1]]
+    atlama = np.zeros(len(ig), dtype=np.int64)
+    atlama[1:] = np.diff(sira)
+    bosluk = np.flatnonzero(ig_ayni & (atlama > 1))
+    if len(bosluk):
+        onceki, sonraki = gun[ig[bosluk - 1]], gun[ig[bosluk]]
+        parcalar.append((kimlik[ig[bosluk]], np.full(len(bosluk), 'eksik_seans', dtype=object),
+                         takvim.gun_ekle(onceki, 1).astype('datetime64[ns]').view(np.int64),
+                         takvim.gun_ekle(sonraki, -1).astype('datetime64[ns]').view(np.int64),
+                         atlama[bosluk] - 1))
+
+    if bitis is not None and len(ig):
+        # Sembolün son işlem günü barından beklenen son güne kadar eksik kalanlar
+        son = np.flatnonzero(np.append(kimlik[ig[1:]] != kimlik[ig[:-1]], True))
+        bitis_gun = np.array([np.datetime64(bitis, 'D')])
+        # Tatil günü sonraki işlem gününün sırasını alır; son beklenen işlem günü bir öncekidir
+        son_sira = takvim.sira(bitis_gun)[0] - int(not takvim.islem_gunu_mu(bitis_gun)[0])
+        eksik = son_sira - sira[son]
+        geride = son[eksik > 0]
+        if len(geride):
+            parcalar.append((kimlik[ig[geride]], np.full(len(geride), 'eksik_son', dtype=object),
+                             takvim.gun_ekle(gun[ig[geride]], 1).astype('datetime64[ns]').view(np.int64),
+                             np.full(len(geride), np.datetime64(bitis, 'ns').view(np.int64)),
+                             eksik[eksik > 0]))
+
+    parcalar = [p for p in parcalar if len(p[0])]
+    if not parcalar:
+        return _bos_sorunlar()
+    k, tur, bas, bit, adet = (np.concatenate(sutun) for sutun in zip(*parcalar))
+    sorunlar = pd.DataFrame({
+        'symbol': np.asarray(semboller, dtype=object)[k], 'tur': tur,
+        'baslangic': bas.astype('datetime64[ns]'), 'bitis': bit.astype('datetime64[ns]'),
+        'adet': adet.astype(np.int64)
+    })
+    return sorunlar.sort_values(['symbol', 'tur', 'baslangic'], kind='stable').reset_index(drop=True)
+
+def ozet(sorunlar):
+    """Sembol x sorun türü adet tablosu"""
+    if len(sorunlar) == 0:
+        return pd.DataFrame()
+    return sorunlar.pivot_table(index='symbol', columns='tur', values='adet', aggfunc='sum', fill_value=0)
+
+class VeriDogrulayici:
+    """Depodaki ham barları doğrular ve yalnızca sorunlu aralıkları yeniden indirir.
+
+    Yeniden indirmeden sonra kaynakta da bulunmayan aralıklar (işlem durdurma,
+    gerçekten sıfır hacimli seans vb.) bilinen boşluklar dosyasına yazılır ve
+    sonraki doğrulamalarda raporlanmaz; böylece aynı aralık tekrar tekrar istenmez.
+    """
+
+    def __init__(self, veri, takvim=None, bilinen_yolu=None):
+        self.veri = veri
+        self.takvim = takvim or IslemTakvimi()
+        self.bilinen_yolu = bilinen_yolu or os.path.join(veri.depo.kok, 'bilinen_bosluklar.json')
+        self.kilit = threading.Lock()
+        self.bilinen = self._bilinen_oku()
+
+    def _bilinen_oku(self):
+        if os.path.exists(self.bilinen_yolu):
+            with open(self.bilinen_yolu, encoding='utf-8') as f:
+                return json.load(f)
+        return {}
+
+    def _bilinen_yaz(self):
+        os.makedirs(os.path.dirname(self.bilinen_yolu) or '.', exist_ok=True)
+        gecici = self.bilinen_yolu + '.tmp'
+        with open(gecici, 'w', encoding='utf-8') as f:
+            json.dump(self.bilinen, f, indent=1)
+        os.replace(gecici, self.bilinen_yolu)
+
+    def _anahtar(self, symbol, interval):
+        return f"{self.veri.depo.sembol_adi(symbol)}/{interval}"
+
+    def _bilinenleri_ayikla(self, sorunlar, interval):
+        """Bilinen boşluk aralıklarının tamamen kapsadığı satırları at"""
+        if len(sorunlar) == 0 or not self.bilinen:
+            return sorunlar
+        tut = np.ones(len(sorunlar), dtype=bool)
+        for i, (symbol, bas, bit) in enumerate(zip(sorunlar['symbol'], sorunlar['baslangic'], sorunlar['bitis'])):
+            for aralik_bas, aralik_bit in self.bilinen.get(self._anahtar(symbol, interval), ()):
+                if pd.Timestamp(aralik_bas) <= bas and bit <= pd.Timestamp(aralik_bit):
+                    tut[i] = False
+                    break
+        return sorunlar[tut].reset_index(drop=True)
+
+    def depodan(self, semboller, period='1y', interval='1d'):
+        """Depodaki ham barlar (ağ erişimi yok); kayıt yoksa sembol atlanır"""
+        from veri_katmani import periyot_baslangici
+        baslangic = periyot_baslangici(period)
+        gecmisler = {}
+        for symbol in semboller:
+            df = self.veri.depo.oku(symbol, interval, columns=list(OHLCV_SUTUNLARI))
+            if df is not None and len(df):
+                gecmisler[symbol] = df[df.index >= baslangic]
+        return gecmisler
+
+    def dogrula(self, semboller, period='1y', interval='1d', son_kontrol=True):
+        """Depodaki verinin sorun tablosu (bilinen boşluklar hariç)"""
+        bitis = self.takvim.son_tamamlanan_gun() if son_kontrol else None
+        sorunlar = panel_dogrula(self.depodan(semboller, period, interval), interval, self.takvim, bitis)
+        return self._bilinenleri_ayikla(sorunlar, interval)
+
+    def onar(self, sorunlar, interval='1d'):
+        """Tekrar ve sırasız barları yerelde gider (depo normalizasyonu: sırala, son gelen kazanır)"""
+        semboller = sorted(set(sorunlar.loc[sorunlar['tur'].isin(ONARILACAK_TURLER), 'symbol']))
+        for symbol in semboller:
+            df = self.veri.depo.oku(symbol, interval)
+            if df is not None:
+                self.veri.depo.yaz(symbol, df, interval)
+        return semboller
+
+    def indirme_araliklari(self, sorunlar, birlestirme_gun=5):
+        """Sembol başına birleştirilmiş [baslangic, bitis) gün aralıkları (yakın aralıklar tek istekte)"""
+        secili = sorunlar[sorunlar['tur'].isin(INDIRILECEK_TURLER)]
+        araliklar = {}
+        for symbol, grup in secili.groupby('symbol', sort=True):
+            bas = grup['baslangic'].to_numpy().astype('datetime64[D]')
+            bit = grup['bitis'].to_numpy().astype('datetime64[D]') + 1
+            sira = np.argsort(bas, kind='stable')
+            bas, bit = bas[sira], np.maximum.accumulate(bit[sira])
+            # Önceki aralığın bitişine birlestirme_gun'den yakın başlayanlar aynı isteğe katılır
+            yeni = np.ones(len(bas), dtype=bool)
+            yeni[1:] = bas[1:] > bit[:-1] + birlestirme_gun
+            baslar = np.flatnonzero(yeni)
+            sonlar = np.append(baslar[1:], len(bas)) - 1
+            araliklar[symbol] = list(zip(bas[baslar], bit[sonlar]))
+        return araliklar
+
+    def tamamla(self, sorunlar, interval='1d', birlestirme_gun=5):
+        """Sorunlu aralıkları yeniden indir; kaynakta da giderilemeyenleri bilinen boşluklara ekle"""
+        from veri_katmani import ARALIK_GERI_LIMIT
+        self.onar(sorunlar, interval)
+        araliklar = self.indirme_araliklari(sorunlar, birlestirme_gun)
+        sinir = None
+        if interval in ARALIK_GERI_LIMIT:
+            sinir = np.datetime64(datetime.now().date() - timedelta(days=ARALIK_GERI_LIMIT[interval] - 1), 'D')
+
+        sonuc = {'istek': 0, 'bar': 0, 'hata': 0, 'atlanan': 0}
+        indirilen = {}
+        for symbol, liste in araliklar.items():
+            for bas, bit in liste:
+                if sinir is not None:
+                    if bit <= sinir:
+                        sonuc['atlanan'] += 1
+                        continue
+                    bas = max(bas, sinir)
+                try:
+                    sonuc['bar'] += self.veri.aralik_indir(symbol, interval, bas.astype(datetime), bit.astype(datetime))
+                    sonuc['istek'] += 1
+                    indirilen.setdefault(symbol, []).append((bas, bit))
+                except Exception as e:
+                    sonuc['hata'] += 1
+                    print(f"❌ {symbol} {bas} → {bit}: {e}")
+
+        # İndirilen aralıklarda kalan sorunlar kaynağın kendisinde de var demektir
+        if indirilen:
+            kalan = panel_dogrula({s: self.veri.depo.oku(s, interval, columns=list(OHLCV_SUTUNLARI))
+                                   for s in indirilen}, interval, self.takvim)
+            kalan = kalan[kalan['tur'].isin(INDIRILECEK_TURLER)]
+            with self.kilit:
+                eklendi = 0
+                for symbol, bas, bit in zip(kalan['symbol'], kalan['baslangic'], kalan['bitis']):
+                    gun_bas, gun_bit = np.datetime64(bas, 'D'), np.datetime64(bit, 'D')
+                    if any(a <= gun_bas and gun_bit < b for a, b in indirilen[symbol]):
+                        liste = self.bilinen.setdefault(self._anahtar(symbol, interval), [])
+                        kayit = [pd.Timestamp(bas).isoformat(), pd.Timestamp(bit).isoformat()]
+                        if kayit not in liste:
+                            liste.append(kayit)
+                            eklendi += 1
+                if eklendi:
+                    self._bilinen_yaz()
+            sonuc['bilinen'] = eklendi
+        return sonuc
+
+def main():
+    parser = argparse.ArgumentParser(description="Depodaki geçmişi işlem takvimine göre doğrula ve eksik aralıkları indir")
+    parser.add_argument('semboller', nargs='*', help="örn: THYAO GARAN (boşsa depodaki tüm semboller)")
+    parser.add_argument('--aralik', default='1d', help="Doğrulanacak depo aralığı (1d, 1h, 5m ...)")
+    parser.add_argument('--periyot', default='1y')
+    parser.add_argument('--tamamla', action='store_true', help="Sorunlu aralıkları yeniden indir")
+    parser.add_argument('--detay', action='store_true', help="Tüm sorun satırlarını listele")
+    args = parser.parse_args()
+
+    from veri_katmani import VeriKatmani
+    veri = VeriKatmani()
+    semboller = [s if '.' in s or '=' in s else f"{s.upper()}.IS" for s in args.semboller] or \
+        [s if '=' in s else f"{s}.IS" for s in veri.depo.semboller(args.aralik)]
+    if not semboller:
+        print("❌ Sembol verilmedi ve depoda kayıtlı sembol yok")
+        return
+
+    dogrulayici = VeriDogrulayici(veri)
+    bas = time.perf_counter()
+    sorunlar = dogrulayici.dogrula(semboller, args.periyot, args.aralik)
+    print(f"📊 {len(semboller)} sembol doğrulandı ({time.perf_counter() - bas:.2f} sn): {len(sorunlar)} sorun")
+    if len(sorunlar) == 0:
+        print("✅ Eksik seans veya anomali yok")
+        return
+
+    tablo = ozet(sorunlar)
+    print(tablo.to_string())
+    if args.detay:
+        print(sorunlar.to_string(index=False))
+
+    if args.tamamla:
+        araliklar = dogrulayici.indirme_araliklari(sorunlar)
+        print(f"\n🔄 {sum(len(a) for a in araliklar.values())} aralık yeniden indiriliyor ({len(araliklar)} sembol)")
+        sonuc = dogrulayici.tamamla(sorunlar, args.aralik)
+        print(f"✅ {sonuc['istek']} istek, {sonuc['bar']:,} bar"
+              + (f", {sonuc['atlanan']} aralık Yahoo sınırı dışında" if sonuc['atlanan'] else "")
+              + (f", {sonuc['hata']} hata" if sonuc['hata'] else ""))
+        if sonuc.get('bilinen'):
+            print(f"💾 Kaynakta da olmayan {sonuc['bilinen']} aralık bilinen boşluklara eklendi")
+
+if __name__ == "__main__":
+    main()
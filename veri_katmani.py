@@ -0,0 +1,311 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Yerel Depo Destekli Veri Katmanı (Gün İçi Aralıklar ve Yeniden Örnekleme Piramidi)
+Geliştiren: Çağatay Elaman
+"""
+
+import os
+import json
+import time
+import threading
+import numpy as np
+import pandas as pd
+import yfinance as yf
+from datetime import datetime, timedelta
+from gecmis_deposu import GecmisDeposu
+from ohlcv_tipleri import kompakt, OHLCV_SUTUNLARI
+from kurumsal_islemler import KurumsalIslemDeposu, yahoo_ham
+
+# Desteklenen aralıklar ve saniye cinsinden genişlikleri (inceden kalına)
+ARALIK_SANIYE = {
+    '1m': 60,
+    '5m': 5 * 60,
+    '15m': 15 * 60,
+    '1h': 60 * 60,
+    '1d': 24 * 60 * 60
+}
+
+# Yahoo Finance'in gün içi veriler için geriye dönük sınırı (gün)
+ARALIK_GERI_LIMIT = {
+    '1m': 7,
+    '5m': 60,
+    '15m': 60,
+    '1h': 730
+}
+
+# Periyotların gün karşılığı ('max' sınırsız)
+PERIYOT_GUN = {
+    '1d': 1, '5d': 5, '1mo': 31, '3mo': 92, '6mo': 183,
+    '1y': 366, '2y': 731, '5y': 1827, '10y': 3653
+}
+
+def periyot_baslangici(period, simdi=None):
+    """Periyot metnini (1mo, 1y, ytd, max ...) başlangıç zamanına çevir"""
+    simdi = simdi or datetime.now()
+    if period == 'max':
+        return datetime(1900, 1, 1)
+    if period == 'ytd':
+        return datetime(simdi.year, 1, 1)
+    if period in PERIYOT_GUN:
+        return (simdi - timedelta(days=PERIYOT_GUN[period])).replace(hour=0, minute=0, second=0, microsecond=0)
+    if period.endswith('d') and period[:-1].isdigit():
+        return (simdi - timedelta(days=int(period[:-1]))).replace(hour=0, minute=0, second=0, microsecond=0)
+    raise ValueError(f"Geçersiz periyot: {period}")
+
+def ohlcv_yeniden_ornekle(df, interval):
+    """OHLCV barlarını daha kalın aralığa topla (vektörel, sıralı index gerekir)"""
+    if len(df) == 0:
+        return df
+
+    genislik = ARALIK_SANIYE[interval] * 10**9
+    zaman = df.index.values.astype('datetime64[ns]').view('int64')
+    kova = zaman // genislik
+
+    # Kova değişim noktaları: her yeni barın ilk satırı
+    baslar = np.concatenate(([0], np.flatnonzero(np.diff(kova)) + 1))
+    sonlar = np.concatenate((baslar[1:] - 1, [len(kova) - 1]))
+
+    veri = {
+        'Open': df['Open'].to_numpy()[baslar],
+        'High': np.fmax.reduceat(df['High'].to_numpy(), baslar),
+        'Low': np.fmin.reduceat(df['Low'].to_numpy(), baslar),
+        'Close': df['Close'].to_numpy()[sonlar],
+        'Volume': np.add.reduceat(df['Volume'].to_numpy(), baslar)
+    }
+    index = pd.DatetimeIndex((kova[baslar] * genislik).astype('datetime64[ns]'), name='Date')
+    return pd.DataFrame(veri, index=index)
+
+class VeriKatmani:
+    def __init__(self, depo=None):
+        self.depo = depo or GecmisDeposu()
+        # Depoda ham (işlem günündeki) barlar; temettü/bölünme düzeltmesi okurken uygulanır
+        self.islemler = KurumsalIslemDeposu(os.path.join(self.depo.kok, 'Islemler'))
+
+        # Her (sembol, aralık) için indirilen kapsam ve güncelleme zamanı
+        self.kapsam_yolu = os.path.join(self.depo.kok, 'kapsam.json')
+        self.kilit = threading.Lock()
+        self.kapsam = self._kapsam_oku()
+
+        # Depodaki verinin taze sayılacağı süre (saniye)
+        self.tazelik = {
+            '1m': 60,
+            '5m': 5 * 60,
+            '15m': 15 * 60,
+            '1h': 60 * 60,
+            '1d': 15 * 60
+        }
+
+    def _kapsam_oku(self):
+        if os.path.exists(self.kapsam_yolu):
+            with open(self.kapsam_yolu, encoding='utf-8') as f:
+                return json.load(f)
+        return {}
+
+    def _kapsam_yaz(self):
+        klasor = os.path.dirname(self.kapsam_yolu)
+        if not os.path.exists(klasor):
+            os.makedirs(klasor, exist_ok=True)
+        gecici = self.kapsam_yolu + '.tmp'
+        with open(gecici, 'w', encoding='utf-8') as f:
+            json.dump(self.kapsam, f, indent=1)
+        os.replace(gecici, self.kapsam_yolu)
+
+    def _anahtar(self, symbol, interval):
+        return f"{self.depo.sembol_adi(symbol)}/{interval}"
+
+    def kapsiyor_mu(self, symbol, interval, baslangic):
+        """Depo bu aralık için istenen başlangıçtan itibaren taze veri içeriyor mu?"""
+        kayit = self.kapsam.get(self._anahtar(symbol, interval))
+        # Düzeltilmiş fiyatlarla yazılmış eski kayıtlar bir kez ham olarak yeniden indirilir
+        if kayit is None or not kayit.get('ham'):
+            return False
+        if time.time() - kayit['guncelleme'] > self.tazelik[interval]:
+            return False
+        return kayit['baslangic'] <= baslangic.isoformat()
+
+    def _bayat_son_bar(self, symbol, interval, baslangic):
+        """Ham kapsam istenen başlangıcı içeriyor da yalnızca tazeliği geçmişse son kayıtlı bar, değilse None"""
+        kayit = self.kapsam.get(self._anahtar(symbol, interval))
+        if kayit is None or not kayit.get('ham') or kayit['baslangic'] > baslangic.isoformat():
+            return None
+        df = self.depo.oku(symbol, interval, columns=['Close'])
+        return df.index[-1].to_pydatetime() if df is not None and len(df) else None
+
+    def ham_mi(self, symbol, interval='1d'):
+        """Depodaki barlar ham (işlem günü) fiyatlar mı? Kaydı olmayan ya da eski düzeltilmiş depo False"""
+        kayit = self.kapsam.get(self._anahtar(symbol, interval))
+        return bool(kayit and kayit.get('ham'))
+
+    def ham_isaretle(self, symbol, interval='1d'):
+        """Dışarıdan (arşivden) yazılan ham barları işaretle; tazelik iddia edilmez, ilk istekte indirilir"""
+        with self.kilit:
+            if not self.ham_mi(symbol, interval):
+                self.kapsam[self._anahtar(symbol, interval)] = {
+                    'baslangic': datetime.now().isoformat(), 'guncelleme': 0.0, 'ham': True}
+                self._kapsam_yaz()
+
+    def indir(self, symbol, interval, baslangic):
+        """Yahoo Finance'ten indirip depoya ekle (ham barlar + kurumsal işlem tablosu)"""
+        # Ham depo öncesinden kalan (düzeltilmiş) barlar: tüm kayıtlı geçmiş ham olarak yeniden
+        # indirilir ve dosya bununla değiştirilir; pencere dışında düzeltilmiş bar kalmaz
+        gecis = not self.ham_mi(symbol, interval) and self.depo.var_mi(symbol, interval)
+        if gecis:
+            eski = self.depo.oku(symbol, interval, columns=['Close'])
+            if eski is not None and len(eski):
+                baslangic = min(baslangic, self._sinirla(interval, eski.index[0].to_pydatetime()))
+            print(f"⚠️  {symbol} {interval}: eski düzeltilmiş geçmiş {baslangic:%Y-%m-%d} itibarıyla ham olarak yenileniyor")
+
+        ticker = yf.Ticker(symbol)
+        if interval == '1d':
+            hist = ticker.history(start=baslangic.strftime('%Y-%m-%d'), auto_adjust=False)
+        else:
+            hist = ticker.history(start=baslangic.strftime('%Y-%m-%d'), interval=interval, auto_adjust=False)
+
+        if len(hist) == 0:
+            return None
+
+        # Bölünme ölçeği geri alınır; yeni bir bölünme yalnızca işlem tablosuna satır ekler
+        ham, olaylar = yahoo_ham(hist)
+        if gecis:
+            self.depo.yaz(symbol, ham, interval)
+            birlesik = kompakt(self.depo.normalize(ham))
+        else:
+            birlesik = kompakt(self.depo.birlestir(symbol, ham, interval))
+        self.islemler.ekle(symbol, olaylar, birlesik)
+
+        with self.kilit:
+            anahtar = self._anahtar(symbol, interval)
+            eski = self.kapsam.get(anahtar)
+            yeni_baslangic = baslangic.isoformat()
+            # Eski indirme ile bu indirme arasında boşluk yoksa kapsamı genişlet
+            if eski and eski.get('ham') and eski['baslangic'] < yeni_baslangic and \
+                    datetime.fromtimestamp(eski['guncelleme']) >= baslangic:
+                yeni_baslangic = eski['baslangic']
+            self.kapsam[anahtar] = {'baslangic': yeni_baslangic, 'guncelleme': time.time(), 'ham': True}
+            self._kapsam_yaz()
+
+        return birlesik
+
+    def aralik_indir(self, symbol, interval, baslangic, bitis):
+        """Yalnızca [baslangic, bitis) aralığını indirip depoya ekle; kapsam kaydına dokunmaz.
+
+        Doğrulamada bulunan eksik seansların hedefli onarımı içindir; dönen değer gelen bar sayısıdır.
+        """
+        if not self.ham_mi(symbol, interval) and self.depo.var_mi(symbol, interval):
+            # Eski düzeltilmiş depoya ham parça eklenmez; önce tüm geçmiş ham olarak yenilenir
+            df = self.indir(symbol, interval, baslangic)
+            return 0 if df is None else len(df)
+        ticker = yf.Ticker(symbol)
+        hist = ticker.history(start=baslangic.strftime('%Y-%m-%d'), end=bitis.strftime('%Y-%m-%d'),
+                              interval=interval, auto_adjust=False)
+        if len(hist) == 0:
+            return 0
+
+        ham, olaylar = yahoo_ham(hist)
+        birlesik = kompakt(self.depo.birlestir(symbol, ham, interval))
+        self.islemler.ekle(symbol, olaylar, birlesik)
+        return len(ham)
+
+    def canli_ekle(self, symbol, interval, df):
+        """Canlı fiyatlardan üretilen (ham) barları depoya ekle ve kapsamı genişlet.
+
+        Kayıtlı kapsamla arada boşluk yoksa başlangıç korunur, yoksa kapsam ilk bardan
+        başlar; eski düzeltilmiş depoya yazılan barlar için kapsam iddia edilmez.
+        """
+        if len(df) == 0:
+            return 0
+        eski_depo = not self.ham_mi(symbol, interval) and self.depo.var_mi(symbol, interval)
+        self.depo.birlestir(symbol, df, interval)
+        if eski_depo:
+            return len(df)
+
+        ilk = df.index[0].to_pydatetime().replace(tzinfo=None)
+        with self.kilit:
+            anahtar = self._anahtar(symbol, interval)
+            eski = self.kapsam.get(anahtar)
+            yeni_baslangic = ilk.isoformat()
+            if eski and eski.get('ham') and eski['baslangic'] < yeni_baslangic and \
+                    datetime.fromtimestamp(eski['guncelleme']) >= ilk:
+                yeni_baslangic = eski['baslangic']
+            self.kapsam[anahtar] = {'baslangic': yeni_baslangic, 'guncelleme': time.time(), 'ham': True}
+            self._kapsam_yaz()
+        return len(df)
+
+    def _sinirla(self, interval, baslangic):
+        """Başlangıcı Yahoo Finance'in o aralık için izin verdiği geriye dönük sınıra çek"""
+        if interval not in ARALIK_GERI_LIMIT:
+            return baslangic
+        limit = (datetime.now() - timedelta(days=ARALIK_GERI_LIMIT[interval] - 1)).replace(
+            hour=0, minute=0, second=0, microsecond=0)
+        return max(baslangic, limit)
+
+    def kaynak_aralik_sec(self, interval, baslangic):
+        """Hedef aralığı üretebilecek en ince kaynak aralığı seç"""
+        hedef = ARALIK_SANIYE[interval]
+        gun = (datetime.now() - baslangic).days + 1
+
+        adaylar = [a for a, s in ARALIK_SANIYE.items()
+                   if a != '1d' and s <= hedef and hedef % s == 0]
+        for aday in adaylar:
+            if gun <= ARALIK_GERI_LIMIT[aday]:
+                return aday
+        return interval
+
+    def _oku(self, symbol, interval):
+        """Depodan yalnızca OHLCV sütunlarını bellek politikasıyla oku"""
+        df = self.depo.oku(symbol, interval, columns=list(OHLCV_SUTUNLARI))
+        return None if df is None else kompakt(df)
+
+    def gecmis_getir(self, symbol, period='1mo', interval='1d', duzeltilmis=True):
+        """Sembolün geçmişini getir; gün içi aralıklar en ince kayıtlı aralıktan türetilir.
+
+        Dönen çerçeve ohlcv_tipleri politikasındadır (float32 fiyat, int64 hacim).
+        duzeltilmis=True (varsayılan) temettü ve bölünmeye göre düzeltilmiş, False ham barlar döndürür.
+        """
+        df = self._gecmis(symbol, period, interval)
+        return self.islemler.duzelt(symbol, df) if duzeltilmis else df
+
+    def _gecmis(self, symbol, period, interval):
+        if interval not in ARALIK_SANIYE:
+            raise ValueError(f"Geçersiz aralık: {interval} (desteklenen: {', '.join(ARALIK_SANIYE)})")
+
+        baslangic = periyot_baslangici(period)
+
+        if interval == '1d':
+            if self.kapsiyor_mu(symbol, '1d', baslangic):
+                df = self._oku(symbol, '1d')
+            else:
+                # Kapsam yeterli ama eskiyse yalnızca son kayıtlı bardan bugüne indirilip birleştirilir
+                son_bar = self._bayat_son_bar(symbol, '1d', baslangic)
+                df = self.indir(symbol, '1d', son_bar or baslangic)
+                if df is None and son_bar is not None:
+                    df = self._oku(symbol, '1d')
+            if df is None:
+                return None
+            return df.iloc[df.index.searchsorted(baslangic):]
+
+        # Gün içi: önce depoda hedefi üretebilecek taze bir kaynak ara (inceden kalına).
+        # Kaynak istenen başlangıcı kapsamalı; yalnızca indirmede de seçilecek kaynak için
+        # Yahoo'nun geriye dönük sınırına çekilmiş başlangıç yeterlidir (daha eskisi alınamaz)
+        hedef = ARALIK_SANIYE[interval]
+        secilecek = self.kaynak_aralik_sec(interval, baslangic)
+        kaynak = None
+        for aday, saniye in ARALIK_SANIYE.items():
+            gerekli = self._sinirla(aday, baslangic) if aday == secilecek else baslangic
+            if aday != '1d' and saniye <= hedef and hedef % saniye == 0 and \
+                    self.kapsiyor_mu(symbol, aday, gerekli):
+                kaynak = aday
+                df = self._oku(symbol, aday)
+                break
+
+        if kaynak is None:
+            kaynak = secilecek
+            df = self.indir(symbol, kaynak, self._sinirla(kaynak, baslangic))
+            if df is None:
+                return None
+
+        df = df.iloc[df.index.searchsorted(baslangic):]
+        if kaynak != interval:
+            df = ohlcv_yeniden_ornekle(df, interval)
+        return df
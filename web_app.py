@@ -5,18 +5,30 @@ Finansal Veri Analiz Web Uygulaması
 Geliştiren: Çağatay Elaman
 """
 
-from flask import Flask, render_template, request, jsonify, send_file
-import pandas as pd
+from flask import Flask, render_template, request, jsonify, Response
 import numpy as np
-import yfinance as yf
-from datetime import datetime, timedelta
 import os
-import json
 import warnings
+from hisse_bilgi_onbellegi import HisseBilgiOnbellegi
+from veri_katmani import VeriKatmani
+from ortak_panel import OrtakPanel, PanelliVeriKatmani
+from canli_seri import CanliSeriDeposu, tarih_listesi, json_listesi
+from ohlcv_tipleri import hassas
+import gostergeler
+import model_egitimi
+from makro_deposu import ortak_depo
+from model_kayit_defteri import ModelSunucusu
+from portfoy import PortfoyAnalizi
+import monte_carlo
+from alarm_motoru import GunlukYayini, KuralDosyasi, SSEHedefi, kural_dogrula
+from istek_olcumu import IstekOlcumu
 warnings.filterwarnings('ignore')
 
 app = Flask(__name__)
 
+# Aşama süreleri (Server-Timing), /metrics ve ?profil=1
+olcum = IstekOlcumu(app)
+
 class FinansalAnalizWeb:
     def __init__(self):
         # Türk hisse senetleri
@@ -37,24 +49,72 @@ class FinansalAnalizWeb:
             'TUPRS': 'TUPRS.IS',      # Tüpraş
             'EREGL': 'EREGL.IS'       # Ereğli Demir Çelik
         }
+        
+        # ticker.info önbelleği (statik alanlar günlerce, fiyat saniyelerce)
+        self.bilgi_onbellegi = HisseBilgiOnbellegi()
+        
+        # Yerel depo destekli veri katmanı (gün içi aralıklar depodan türetilir);
+        # ortak_panel.py yükleyicisi çalışıyorsa tüm işçiler aynı mmap panelden okur
+        self.panel = OrtakPanel()
+        self.veri = PanelliVeriKatmani(self.panel, VeriKatmani())
+        
+        # Son barlar ve göstergeler için halka tamponlar (yakın tarihli aralıklar buradan sunulur)
+        self.canli_seriler = CanliSeriDeposu(self.veri)
+        
+        # Kayıt defterindeki aktif modeller arka planda izlenir; terfi edilen sürüm
+        # yeniden başlatmadan ve ısıtılmış olarak devreye girer
+        self.modeller = ModelSunucusu()
+        # USD/TRY ve BIST100 süreç başına bir kez getirilir; tüm tahmin istekleri aynı dizileri hizalar
+        self.makro = ortak_depo(self.veri)
+        
+        # Hizalanmış getiri paneli evren başına bellekte tutulur; ağırlık değişimi yalnızca matris çarpımı
+        self.portfoy = PortfoyAnalizi(self.veri)
+        
+        # Kurallar tek bir izleyici süreçte değerlendirilir (python alarm_motoru.py izle);
+        # işçiler yalnızca alarm günlüğünü dashboard'a (SSE) aktarır ve kural dosyasını paylaşır
+        self.alarm_yayini = SSEHedefi()
+        self.alarm_gunlugu = GunlukYayini(hedefler=[self.alarm_yayini])
+        self.alarm_gunlugu.baslat()
+        self.alarm_kurallari = KuralDosyasi()
+    
+    def format_dates(self, index, interval):
+        """Grafik etiketleri için tarihleri biçimlendir"""
+        if interval == '1d':
+            return index.strftime('%Y-%m-%d').tolist()
+        return index.strftime('%Y-%m-%d %H:%M').tolist()
     
-    def get_stock_data(self, symbol, period="1mo"):
+    def get_stock_data(self, symbol, period="1mo", interval="1d"):
         """Hisse senedi verilerini al"""
         try:
-            ticker = yf.Ticker(symbol)
-            hist = ticker.history(period=period)
+            with olcum.asama('fetch'):
+                pencere = self.canli_seriler.getir(symbol, period, interval)
+            if pencere is not None and len(pencere['zaman']) > 0:
+                with olcum.asama('format'):
+                    return {
+                        'dates': tarih_listesi(pencere['zaman'], interval),
+                        'open': json_listesi(pencere['open']),
+                        'high': json_listesi(pencere['high']),
+                        'low': json_listesi(pencere['low']),
+                        'close': json_listesi(pencere['close']),
+                        'volume': pencere['volume'].astype(np.int64).tolist(),
+                        'success': True
+                    }
             
-            if len(hist) > 0:
+            with olcum.asama('fetch'):
+                hist = self.veri.gecmis_getir(symbol, period, interval)
+            
+            if hist is not None and len(hist) > 0:
                 # Veriyi JSON formatına çevir
-                data = {
-                    'dates': hist.index.strftime('%Y-%m-%d').tolist(),
-                    'open': hist['Open'].round(2).tolist(),
-                    'high': hist['High'].round(2).tolist(),
-                    'low': hist['Low'].round(2).tolist(),
-                    'close': hist['Close'].round(2).tolist(),
-                    'volume': hist['Volume'].tolist(),
-                    'success': True
-                }
+                with olcum.asama('format'):
+                    data = {
+                        'dates': self.format_dates(hist.index, interval),
+                        'open': json_listesi(hist['Open'].to_numpy()),
+                        'high': json_listesi(hist['High'].to_numpy()),
+                        'low': json_listesi(hist['Low'].to_numpy()),
+                        'close': json_listesi(hist['Close'].to_numpy()),
+                        'volume': hist['Volume'].tolist(),
+                        'success': True
+                    }
                 return data
             else:
                 return {'success': False, 'error': 'Veri bulunamadı'}
@@ -65,8 +125,8 @@ class FinansalAnalizWeb:
     def get_stock_info(self, symbol):
         """Hisse senedi bilgilerini al"""
         try:
-            ticker = yf.Ticker(symbol)
-            info = ticker.info
+            with olcum.asama('fetch'):
+                info = self.bilgi_onbellegi.get_info(symbol)
             
             data = {
                 'symbol': symbol,
@@ -83,49 +143,59 @@ class FinansalAnalizWeb:
         except Exception as e:
             return {'success': False, 'error': str(e)}
     
-    def technical_analysis(self, symbol, period="3mo"):
-        """Teknik analiz yap"""
+    def technical_analysis(self, symbol, period="3mo", interval="1d", ekstra=()):
+        """Teknik analiz yap (ekstra: ek göstergeler, örn. ('macd', 'atr'))"""
         try:
-            ticker = yf.Ticker(symbol)
-            hist = ticker.history(period=period)
+            # Tampondaki seriler göstergeleriyle birlikte tutulur (hesap 'fetch' içinde kalır)
+            with olcum.asama('fetch'):
+                pencere = None if ekstra else self.canli_seriler.getir(symbol, period, interval)
+            if pencere is not None and len(pencere['zaman']) > 0:
+                with olcum.asama('format'):
+                    son = {alan: float(hassas(dizi[-1])) for alan, dizi in pencere.items() if alan != 'zaman'}
+                    return {
+                        'dates': tarih_listesi(pencere['zaman'], interval),
+                        'close': json_listesi(pencere['close']),
+                        'ma20': json_listesi(pencere['ma20']),
+                        'ma50': json_listesi(pencere['ma50']),
+                        'rsi': json_listesi(pencere['rsi']),
+                        'upper_band': json_listesi(pencere['upper_band']),
+                        'lower_band': json_listesi(pencere['lower_band']),
+                        'current_price': round(son['close'], 4),
+                        'current_rsi': None if np.isnan(son['rsi']) else son['rsi'],
+                        'current_ma20': None if np.isnan(son['ma20']) else son['ma20'],
+                        'current_ma50': None if np.isnan(son['ma50']) else son['ma50'],
+                        'success': True
+                    }
             
-            if len(hist) > 0:
-                close_prices = hist['Close']
-                
-                # Teknik göstergeler
-                ma20 = close_prices.rolling(window=20).mean()
-                ma50 = close_prices.rolling(window=50).mean()
-                
-                # RSI
-                delta = close_prices.diff()
-                gain = (delta.where(delta > 0, 0)).rolling(window=14).mean()
-                loss = (-delta.where(delta < 0, 0)).rolling(window=14).mean()
-                rs = gain / loss
-                rsi = 100 - (100 / (1 + rs))
-                
-                # Bollinger Bands
-                ma20_std = close_prices.rolling(window=20).std()
-                upper_band = ma20 + (ma20_std * 2)
-                lower_band = ma20 - (ma20_std * 2)
+            with olcum.asama('fetch'):
+                hist = self.veri.gecmis_getir(symbol, period, interval)
+            
+            if hist is not None and len(hist) > 0:
+                close_prices = hist['Close'].to_numpy()
                 
-                # NaN değerleri None'a çevir (JSON için gerekli)
-                def clean_nan_values(series):
-                    return [None if pd.isna(x) else x for x in series]
+                # Teknik göstergeler (MA20, MA50, RSI, Bollinger tek geçişte)
+                with olcum.asama('compute'):
+                    g = gostergeler.hesapla(hist, gostergeler.TEMEL_GOSTERGELER + tuple(ekstra))
                 
-                data = {
-                    'dates': hist.index.strftime('%Y-%m-%d').tolist(),
-                    'close': close_prices.round(2).tolist(),
-                    'ma20': clean_nan_values(ma20.round(2)),
-                    'ma50': clean_nan_values(ma50.round(2)),
-                    'rsi': clean_nan_values(rsi.round(2)),
-                    'upper_band': clean_nan_values(upper_band.round(2)),
-                    'lower_band': clean_nan_values(lower_band.round(2)),
-                    'current_price': float(close_prices.iloc[-1]),
-                    'current_rsi': float(rsi.iloc[-1]) if not pd.isna(rsi.iloc[-1]) else None,
-                    'current_ma20': float(ma20.iloc[-1]) if not pd.isna(ma20.iloc[-1]) else None,
-                    'current_ma50': float(ma50.iloc[-1]) if not pd.isna(ma50.iloc[-1]) else None,
-                    'success': True
-                }
+                # NaN temizleme ve listeye çevirme
+                with olcum.asama('format'):
+                    data = {
+                        'dates': self.format_dates(hist.index, interval),
+                        'close': json_listesi(close_prices),
+                        'ma20': json_listesi(g['ma20']),
+                        'ma50': json_listesi(g['ma50']),
+                        'rsi': json_listesi(g['rsi']),
+                        'upper_band': json_listesi(g['upper_band']),
+                        'lower_band': json_listesi(g['lower_band']),
+                        'current_price': round(float(close_prices[-1]), 4),
+                        'current_rsi': None if np.isnan(g['rsi'][-1]) else float(g['rsi'][-1]),
+                        'current_ma20': None if np.isnan(g['ma20'][-1]) else float(g['ma20'][-1]),
+                        'current_ma50': None if np.isnan(g['ma50'][-1]) else float(g['ma50'][-1]),
+                        'success': True
+                    }
+                    for gosterge in ekstra:
+                        for seri in gostergeler.GOSTERGE_CIKTILARI[gosterge]:
+                            data[seri] = json_listesi(g[seri])
                 return data
             else:
                 return {'success': False, 'error': 'Veri bulunamadı'}
@@ -133,6 +203,132 @@ class FinansalAnalizWeb:
         except Exception as e:
             return {'success': False, 'error': str(e)}
 
+    def prediction(self, symbol, interval="1d"):
+        """Sonraki bar için getiri ve fiyat tahmini (sembole özel model yoksa havuz modeli)"""
+        try:
+            # Model referansı bir kez alınır; istek sürerken yeni sürüme geçilse de bu istek eskisiyle biter
+            model = self.modeller.model(f"{symbol.replace('.IS', '')}_{interval}") or \
+                self.modeller.model(f"havuz_{interval}")
+            if model is None:
+                return {'success': False, 'error': 'Aktif model yok (model_egitimi.py --terfi ile eğitin)'}
+            
+            with olcum.asama('fetch'):
+                hist = self.veri.gecmis_getir(symbol, '1y', interval)
+                makro = self.makro.seriler('1y')
+            if hist is None or len(hist) < 60:
+                return {'success': False, 'error': 'Veri bulunamadı'}
+            
+            with olcum.asama('compute'):
+                tablo = model_egitimi.ozellik_hesapla(hist, makro, interval)
+                x = tablo[model.ozellikler].to_numpy()[-1:]
+                if np.isnan(x).any():
+                    return {'success': False, 'error': 'Son bar için özellikler eksik'}
+                getiri = float(self.modeller.tahmin(model, x)[0])
+            
+            son_fiyat = float(hassas(hist['Close'].to_numpy()[-1]))
+            return {
+                'symbol': symbol,
+                'date': str(hist.index[-1]),
+                'model': model.ad,
+                'model_version': model.surum,
+                'last_price': round(son_fiyat, 4),
+                'predicted_return': getiri,
+                'predicted_price': round(son_fiyat * (1 + getiri), 4),
+                'success': True
+            }
+        
+        except Exception as e:
+            return {'success': False, 'error': str(e)}
+
+    def portfolio(self, agirliklar=None, period="1y", pencere=63, risksiz=0.0, sinir=0):
+        """Portföy getirisi, risk metrikleri ve isteğe bağlı etkin sınır (ağırlık yoksa tüm evren eşit ağırlıklı)"""
+        try:
+            agirliklar = agirliklar or {sembol: 1.0 for sembol in self.turk_hisseleri.values()}
+            
+            with olcum.asama('compute'):
+                sonuc = self.portfoy.analiz(agirliklar, period, pencere, risksiz, min(sinir, 20000))
+            
+            data = {
+                'symbols': sonuc['semboller'],
+                'weights': json_listesi(sonuc['agirliklar'], 4),
+                'risk_contribution': json_listesi(sonuc['risk_katkisi'], 4),
+                'annual_return': round(float(sonuc['yillik_getiri']), 4),
+                'annual_volatility': round(float(sonuc['yillik_oynaklik']), 4),
+                'sharpe': round(float(sonuc['sharpe']), 4),
+                'total_return': round(float(sonuc['toplam_getiri']), 4),
+                'max_drawdown': round(float(sonuc['max_dusus']), 4),
+                'var': {ad: round(float(deger), 5) for ad, deger in sonuc['var'].items()},
+                'dates': tarih_listesi(sonuc['zaman'], '1d'),
+                'cumulative': json_listesi(sonuc['kumulatif'], 4),
+                'drawdown': json_listesi(sonuc['dusus'], 4),
+                'rolling_sharpe': json_listesi(sonuc['kayan_sharpe'], 3),
+                'success': True
+            }
+            if 'etkin_sinir' in sonuc:
+                es = sonuc['etkin_sinir']
+                data['frontier'] = {
+                    'returns': json_listesi(es['getiri'], 4),
+                    'volatility': json_listesi(es['oynaklik'], 4),
+                    'sharpe': json_listesi(es['sharpe'], 3),
+                    **{ad: {'weights': json_listesi(es[anahtar]['agirliklar'], 4),
+                            'return': round(float(es[anahtar]['getiri']), 4),
+                            'volatility': round(float(es[anahtar]['oynaklik']), 4),
+                            'sharpe': round(float(es[anahtar]['sharpe']), 4)}
+                       for ad, anahtar in (('max_sharpe', 'max_sharpe'), ('min_volatility', 'min_oynaklik'))}
+                }
+            return data
+        
+        except Exception as e:
+            return {'success': False, 'error': str(e)}
+
+    def monte_carlo(self, symbol, period="1y", ufuk=60, yol_sayisi=10000, mod="gbm"):
+        """Monte Carlo fiyat yolları: yüzdelik bantlar ve dokunma olasılıkları"""
+        try:
+            with olcum.asama('fetch'):
+                hist = self.veri.gecmis_getir(symbol, period, '1d')
+            if hist is None or len(hist) == 0:
+                return {'success': False, 'error': 'Veri bulunamadı'}
+            
+            with olcum.asama('compute'):
+                kapanis = hist['Close'].to_numpy()
+                sonuc = monte_carlo.simule_et(symbol, kapanis, min(ufuk, 252), min(yol_sayisi, 100000), mod)
+            
+            gecmis = min(len(hist), 60)
+            return {
+                'symbol': symbol,
+                'mode': mod,
+                'paths': sonuc['yol_sayisi'],
+                'horizon': sonuc['ufuk'],
+                'history_dates': self.format_dates(hist.index[-gecmis:], '1d'),
+                'history': json_listesi(kapanis[-gecmis:]),
+                'last_price': round(float(sonuc['son_fiyat']), 4),
+                'bands': {f"p{p}": json_listesi(bant) for p, bant in sonuc['bantlar'].items()},
+                'touch': [{'threshold': round(float(e), 4), 'level': round(float(seviye), 2),
+                           'probability': round(float(d), 4)}
+                          for e, seviye, d in zip(sonuc['esikler'], sonuc['seviyeler'], sonuc['dokunma'])],
+                'expected_price': round(sonuc['beklenen_fiyat'], 2),
+                'prob_up': round(sonuc['yukselis_olasiligi'], 4),
+                'var_95': round(sonuc['var_95'], 4),
+                'cvar_95': round(sonuc['cvar_95'], 4),
+                'success': True
+            }
+        
+        except Exception as e:
+            return {'success': False, 'error': str(e)}
+
+    def add_alert_rule(self, kural):
+        """Kuralı doğrula ve kaydet; izleyici süreç dosya değişikliğiyle yeni kuralı devreye alır"""
+        try:
+            kural = kural_dogrula(kural)
+            kurallar = [k for k in self.alarm_kurallari.oku() if k['id'] != kural['id']] + [kural]
+            for k in kurallar:
+                kural_dogrula(k)
+            self.alarm_kurallari.yaz(kurallar)
+            return {'rule': kural, 'success': True}
+        
+        except Exception as e:
+            return {'success': False, 'error': str(e)}
+
 # Web uygulaması instance'ı
 analiz = FinansalAnalizWeb()
 
@@ -146,9 +342,11 @@ def api_stock_data():
     """Hisse senedi verisi API"""
     symbol = request.args.get('symbol', 'THYAO.IS')
     period = request.args.get('period', '1mo')
+    interval = request.args.get('interval', '1d')
     
-    data = analiz.get_stock_data(symbol, period)
-    return jsonify(data)
+    data = analiz.get_stock_data(symbol, period, interval)
+    with olcum.asama('serialize'):
+        return jsonify(data)
 
 @app.route('/api/stock_info')
 def api_stock_info():
@@ -156,16 +354,80 @@ def api_stock_info():
     symbol = request.args.get('symbol', 'THYAO.IS')
     
     data = analiz.get_stock_info(symbol)
-    return jsonify(data)
+    with olcum.asama('serialize'):
+        return jsonify(data)
 
 @app.route('/api/technical_analysis')
 def api_technical_analysis():
     """Teknik analiz API"""
     symbol = request.args.get('symbol', 'THYAO.IS')
     period = request.args.get('period', '3mo')
+    interval = request.args.get('interval', '1d')
+    ekstra = tuple(g for g in request.args.get('indicators', '').split(',') if g)
+    
+    data = analiz.technical_analysis(symbol, period, interval, ekstra)
+    with olcum.asama('serialize'):
+        return jsonify(data)
+
+@app.route('/api/prediction')
+def api_prediction():
+    """Model tahmini API"""
+    symbol = request.args.get('symbol', 'THYAO.IS')
+    interval = request.args.get('interval', '1d')
+    
+    data = analiz.prediction(symbol, interval)
+    with olcum.asama('serialize'):
+        return jsonify(data)
+
+@app.route('/api/portfolio')
+def api_portfolio():
+    """Portföy analizi API (weights=THYAO.IS:0.4,GARAN.IS:0.6; frontier=5000)"""
+    agirliklar = {}
+    for parca in request.args.get('weights', '').split(','):
+        if parca:
+            sembol, _, deger = parca.partition(':')
+            agirliklar[sembol.strip().upper()] = float(deger) if deger else 1.0
+    period = request.args.get('period', '1y')
+    pencere = request.args.get('window', 63, type=int)
+    risksiz = request.args.get('risk_free', 0.0, type=float)
+    sinir = request.args.get('frontier', 0, type=int)
+    
+    data = analiz.portfolio(agirliklar, period, pencere, risksiz, sinir)
+    with olcum.asama('serialize'):
+        return jsonify(data)
+
+@app.route('/api/monte_carlo')
+def api_monte_carlo():
+    """Monte Carlo simülasyonu API"""
+    symbol = request.args.get('symbol', 'THYAO.IS')
+    period = request.args.get('period', '1y')
+    ufuk = request.args.get('horizon', 60, type=int)
+    yol_sayisi = request.args.get('paths', 10000, type=int)
+    mod = request.args.get('mode', 'gbm')
     
-    data = analiz.technical_analysis(symbol, period)
-    return jsonify(data)
+    data = analiz.monte_carlo(symbol, period, ufuk, yol_sayisi, mod)
+    with olcum.asama('serialize'):
+        return jsonify(data)
+
+@app.route('/api/alerts', methods=['GET', 'POST'])
+def api_alerts():
+    """Alarm kuralları ve son alarmlar; POST ile kural ekle"""
+    if request.method == 'POST':
+        return jsonify(analiz.add_alert_rule(request.get_json(silent=True) or {}))
+    return jsonify({'rules': analiz.alarm_kurallari.oku(), 'recent': list(analiz.alarm_gunlugu.son_alarmlar)[-50:],
+                    'success': True})
+
+@app.route('/api/alerts/stream')
+def api_alerts_stream():
+    """Alarm akışı (Server-Sent Events)"""
+    return Response(analiz.alarm_yayini.dinle(), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
+@app.route('/api/models')
+def api_models():
+    """Devredeki model sürümleri"""
+    return jsonify({'models': analiz.modeller.ozet(), 'cache': analiz.modeller.onbellek.istatistik(),
+                    'success': True})
 
 @app.route('/dashboard')
 def dashboard():
@@ -189,5 +451,6 @@ if __name__ == '__main__':
     
     print("🚀 Finansal Veri Analiz Web Uygulaması Başlatılıyor...")
     print("🌐 Web sitesi: http://localhost:5000")
+    print("🔔 Alarmlar için ayrı bir süreçte: python alarm_motoru.py izle")
     
     app.run(debug=True, host='0.0.0.0', port=5000)